@@ -0,0 +1,239 @@
+"""
+In-process caches for DevFolio API responses.
+
+These caches live inside a single worker process. They are only ever touched
+from the event loop, so no locking is needed.
+"""
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class VersionedLRUCache:
+    """
+    Size-capped LRU cache with TTL expiry and per-owner version invalidation.
+
+    Every `bump(owner)` advances a global generation and records it as that
+    owner's version. Readers take a `snapshot()` *before* they query the
+    database and pass it to `set`; an entry is dropped as soon as its owner
+    has been bumped past the snapshot it was built from, so a write racing
+    with the fill is never served as current. A fill read from a replica that
+    may lag behind the write can pass `settle_seconds` to `set`; it is then
+    not cached if its owner was bumped less than that long ago.
+
+    Only the `max_owners` most recently bumped owners are tracked. Forgetting
+    an owner raises a floor that every untracked owner's version defaults to,
+    so entries and fills older than the forgotten bump are treated as stale.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0, max_owners: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_owners = max_owners if max_owners is not None else max(4 * max_entries, 1024)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, str, int, float]]" = OrderedDict()
+        self._generation = 0
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        self._bumped_at: Dict[str, float] = {}
+        self._floor = 0
+        self._floor_at = float("-inf")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.unsettled = 0
+
+    def snapshot(self) -> int:
+        return self._generation
+
+    def version(self, owner: str) -> int:
+        return self._versions.get(owner, self._floor)
+
+    def bump(self, owner: str) -> int:
+        self._generation += 1
+        self._versions[owner] = self._generation
+        self._versions.move_to_end(owner)
+        self._bumped_at[owner] = time.monotonic()
+        while len(self._versions) > self.max_owners:
+            forgotten, self._floor = self._versions.popitem(last=False)
+            self._floor_at = self._bumped_at.pop(forgotten)
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, owner, snapshot, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        if self.version(owner) > snapshot:
+            del self._entries[key]
+            self.invalidations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, owner: str, snapshot: int, settle_seconds: float = 0.0) -> None:
+        if self.max_entries <= 0:
+            return
+        if self.version(owner) > snapshot:
+            # The owner changed while the value was being built; caching it
+            # would only produce an invalidation on the next lookup.
+            return
+        if settle_seconds > 0 and time.monotonic() - self._bumped_at.get(owner, self._floor_at) < settle_seconds:
+            # The value may predate the owner's last write; serve it, but don't pin it
+            self.unsettled += 1
+            return
+
+        self._entries[key] = (value, owner, snapshot, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        """Drop an entry found to be stale outside the cache (e.g. by another worker's write)."""
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "tracked_owners": len(self._versions),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "unsettled": self.unsettled,
+        }
+
+
+class TTLCache:
+    """Size-capped LRU cache whose entries expire `ttl_seconds` after they are set."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "memory_bytes_estimate": sum(
+                estimate_size(key) + estimate_size(value) for key, (value, _) in self._entries.items()
+            ),
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key starts the work; callers that arrive while it
+    is running await the same result (or exception). The shared task is
+    shielded so one cancelled caller does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.calls += 1
+        future = asyncio.ensure_future(fn())
+        # Mark the exception as retrieved even if every caller was cancelled
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def running(self, key: Hashable) -> bool:
+        """Whether a call for `key` is in flight, i.e. `do(key, ...)` would join it."""
+        return key in self._inflight
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._inflight), "calls": self.calls, "coalesced": self.coalesced}
+
+
+def estimate_size(value: Any) -> int:
+    """Rough deep size in bytes of JSON-like data (dicts, lists, strings, numbers)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
@@ -0,0 +1,136 @@
+"""
+Content-Encoding negotiation and accounting for public API responses.
+
+gzip always comes from the stdlib; brotli is used when the optional
+`brotli` package is installed and the client accepts it. Compressed
+representations get their own strong ETag (`"<etag>-gzip"`), and
+`base_etag` maps them back so conditional requests match whichever
+encoding the client cached. Streamed bodies are compressed incrementally
+with the same settings, so a streamed response and a later cache hit carry
+the same representation and ETag.
+"""
+import gzip
+import time
+import zlib
+from typing import Dict, Iterable, Iterator, Optional
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is offered without it
+    brotli = None
+
+CODING_SUFFIXES = ("-br", "-gzip")
+
+
+def supported_encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported coding from an Accept-Encoding header (br over gzip), or None."""
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def representation_etag(etag: str, encoding: Optional[str]) -> str:
+    if not encoding:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def base_etag(tag: str) -> str:
+    for suffix in CODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+class Compressor:
+    """Compresses response bodies and keeps per-encoding byte and CPU counters."""
+
+    def __init__(self, gzip_level: int = 6, brotli_quality: int = 5):
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.counters: Dict[str, Dict[str, float]] = {}
+
+    def _counter(self, encoding: str) -> Dict[str, float]:
+        counter = self.counters.get(encoding)
+        if counter is None:
+            counter = self.counters[encoding] = {
+                "compressions": 0, "cached_responses": 0, "bytes_in": 0, "bytes_out": 0, "cpu_seconds": 0.0
+            }
+        return counter
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        started = time.thread_time()
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        counter = self._counter(encoding)
+        counter["cpu_seconds"] += time.thread_time() - started
+        counter["compressions"] += 1
+        counter["bytes_in"] += len(body)
+        counter["bytes_out"] += len(compressed)
+        return compressed
+
+    def compress_stream(self, pieces: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+        """Compress a body piece by piece, yielding compressed output as the encoder releases it."""
+        if encoding == "br":
+            encoder = brotli.Compressor(quality=self.brotli_quality)
+            process, finish = encoder.process, encoder.finish
+        else:
+            encoder = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            process, finish = encoder.compress, encoder.flush
+        counter = self._counter(encoding)
+        counter["compressions"] += 1
+        for piece in pieces:
+            started = time.thread_time()
+            out = process(piece)
+            counter["cpu_seconds"] += time.thread_time() - started
+            counter["bytes_in"] += len(piece)
+            counter["bytes_out"] += len(out)
+            if out:
+                yield out
+        started = time.thread_time()
+        out = finish()
+        counter["cpu_seconds"] += time.thread_time() - started
+        counter["bytes_out"] += len(out)
+        if out:
+            yield out
+
+    def record_cached(self, encoding: str, raw_size: int, compressed_size: int) -> None:
+        """Account for a response served from already compressed bytes."""
+        counter = self._counter(encoding)
+        counter["cached_responses"] += 1
+        counter["bytes_in"] += raw_size
+        counter["bytes_out"] += compressed_size
+
+    def stats(self) -> dict:
+        encodings = {}
+        for encoding, counter in self.counters.items():
+            encodings[encoding] = {
+                **counter,
+                "cpu_seconds": round(counter["cpu_seconds"], 6),
+                "bytes_saved": counter["bytes_in"] - counter["bytes_out"],
+                "ratio": round(counter["bytes_in"] / counter["bytes_out"], 2) if counter["bytes_out"] else 0.0,
+            }
+        return {"supported": list(supported_encodings()), "encodings": encodings}
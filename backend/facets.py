@@ -0,0 +1,145 @@
+"""
+Precomputed tech-stack counters for /api/stats/tech.
+
+For every normalized tag (see search.normalize_tech) we keep the number of
+projects using it and the number of portfolios (users) with at least one
+such project, plus a per-user tag -> project count histogram. The project
+write paths call `set_project` / `remove_project`, so counts change by
+deltas and queries never unwind tech_stack in Mongo.
+
+Counts live in process memory; `reconcile` recomputes them from a scan of
+the projects collection (at startup and periodically) and reports how far
+the incremental counts had drifted, e.g. through writes handled by other
+workers. Writes counted while the scan runs are recorded and replayed onto
+the recount, which the scan may have read before or after them.
+"""
+import heapq
+import time
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from search import normalize_tech
+
+
+def project_tags(project: dict) -> FrozenSet[str]:
+    return frozenset(normalize_tech(tag) for tag in project.get("tech_stack") or [] if tag.strip())
+
+
+class TechFacets:
+    def __init__(self):
+        # project id -> (user id, version, tags) as last counted
+        self.projects: Dict[str, Tuple[str, int, FrozenSet[str]]] = {}
+        self.user_tags: Dict[str, Dict[str, int]] = {}
+        self.tag_projects: Dict[str, int] = {}
+        self.tag_users: Dict[str, int] = {}
+        # (project, None) or (None, removed project id) for writes counted while a recount scans
+        self.recorded: Optional[List[tuple]] = None
+        self.last_reconcile: Optional[dict] = None
+
+    def set_project(self, project: dict) -> None:
+        """Count a created or updated project (needs id, user_id, tech_stack and version)."""
+        version = project.get("version", 0)
+        if self.recorded is not None:
+            self.recorded.append(({
+                "id": project["id"], "user_id": project["user_id"],
+                "tech_stack": project.get("tech_stack"), "version": version
+            }, None))
+        previous = self.projects.get(project["id"])
+        if previous is not None and previous[1] > version:
+            return
+        tags = project_tags(project)
+        old_tags = previous[2] if previous is not None else frozenset()
+        self.projects[project["id"]] = (project["user_id"], version, tags)
+        for tag in old_tags - tags:
+            self._count(project["user_id"], tag, -1)
+        for tag in tags - old_tags:
+            self._count(project["user_id"], tag, 1)
+
+    def remove_project(self, project_id: str) -> None:
+        if self.recorded is not None:
+            self.recorded.append((None, project_id))
+        previous = self.projects.pop(project_id, None)
+        if previous is not None:
+            user_id, _, tags = previous
+            for tag in tags:
+                self._count(user_id, tag, -1)
+
+    def _count(self, user_id: str, tag: str, delta: int) -> None:
+        histogram = self.user_tags.setdefault(user_id, {})
+        before = histogram.get(tag, 0)
+        after = before + delta
+        if after > 0:
+            histogram[tag] = after
+        else:
+            histogram.pop(tag, None)
+            if not histogram:
+                del self.user_tags[user_id]
+        self.tag_projects[tag] = self.tag_projects.get(tag, 0) + delta
+        if before == 0 and after > 0:
+            self.tag_users[tag] = self.tag_users.get(tag, 0) + 1
+        elif before > 0 and after <= 0:
+            self.tag_users[tag] -= 1
+        for totals in (self.tag_projects, self.tag_users):
+            if totals.get(tag, 1) <= 0:
+                del totals[tag]
+
+    def top(self, k: int, by: str = "portfolios") -> list:
+        totals = self.tag_users if by == "portfolios" else self.tag_projects
+        tags = heapq.nlargest(k, totals, key=lambda tag: (totals[tag], tag))
+        return [self.tag_counts(tag) for tag in tags]
+
+    def tag_counts(self, tag: str) -> dict:
+        tag = normalize_tech(tag)
+        return {"tag": tag, "portfolios": self.tag_users.get(tag, 0), "projects": self.tag_projects.get(tag, 0)}
+
+    def user_histogram(self, user_id: str, k: Optional[int] = None) -> list:
+        histogram = self.user_tags.get(user_id, {})
+        tags = heapq.nlargest(k or len(histogram), histogram, key=lambda tag: (histogram[tag], tag))
+        return [{"tag": tag, "projects": histogram[tag]} for tag in tags]
+
+    async def reconcile(self, projects) -> dict:
+        """
+        Recount from an async iterable of projects (id, user_id, tech_stack, version) and swap
+        the result in. Writes this process counts while the scan runs are replayed onto the
+        recount in order: `set_project` keeps the newer version of a project the scan also
+        read, and a replayed removal drops one it read before the delete.
+        """
+        started = time.perf_counter()
+        fresh = TechFacets()
+        self.recorded = []
+        try:
+            async for project in projects:
+                fresh.set_project(project)
+            replayed = self.recorded
+        finally:
+            self.recorded = None
+        for project, removed_id in replayed:
+            if project is not None:
+                fresh.set_project(project)
+            else:
+                fresh.remove_project(removed_id)
+
+        report = {
+            "projects": len(fresh.projects),
+            "replayed": len(replayed),
+            "seconds": round(time.perf_counter() - started, 3),
+            "finished_at": time.time(),
+            "drifted_tags": sum(
+                1 for tag in set(self.tag_projects) | set(fresh.tag_projects)
+                if self.tag_projects.get(tag) != fresh.tag_projects.get(tag)
+                or self.tag_users.get(tag) != fresh.tag_users.get(tag)
+            ),
+        }
+        self.projects = fresh.projects
+        self.user_tags = fresh.user_tags
+        self.tag_projects = fresh.tag_projects
+        self.tag_users = fresh.tag_users
+        self.last_reconcile = report
+        return report
+
+    def stats(self) -> dict:
+        return {
+            "projects": len(self.projects),
+            "portfolios": len(self.user_tags),
+            "tags": len(self.tag_projects),
+            "last_reconcile": self.last_reconcile,
+        }
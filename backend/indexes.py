@@ -0,0 +1,136 @@
+"""
+MongoDB index definitions and bootstrap for DevFolio.
+
+`ensure_indexes` is idempotent: indexes that already exist (matched by key
+pattern, whatever their name) are left alone. With `dry_run=True` nothing is
+built and the report only lists what is missing.
+
+Run standalone to check or apply against the configured database:
+
+    python indexes.py           # build missing indexes
+    python indexes.py --check   # report only
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+INDEXES: Dict[str, List[dict]] = {
+    "users": [
+        {"keys": [("id", ASCENDING)], "name": "id_unique", "unique": True},
+        {"keys": [("email", ASCENDING)], "name": "email_unique", "unique": True},
+        {"keys": [("unique_slug", ASCENDING)], "name": "unique_slug_unique", "unique": True},
+        # New-user scans that keep each worker's slug filter current
+        {"keys": [("created_at", ASCENDING)], "name": "created_at"},
+    ],
+    "projects": [
+        {"keys": [("id", ASCENDING)], "name": "id_unique", "unique": True},
+        {"keys": [("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], "name": "user_id_created_at_id"},
+        {"keys": [("user_id", ASCENDING), ("change_seq", ASCENDING)], "name": "user_id_change_seq"},
+        # Recently written projects, read by every worker's search index sync
+        {"keys": [("updated_at", ASCENDING)], "name": "updated_at"},
+    ],
+    "achievements": [
+        {"keys": [("id", ASCENDING)], "name": "id_unique", "unique": True},
+        {"keys": [("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], "name": "user_id_created_at_id"},
+        {"keys": [("user_id", ASCENDING), ("change_seq", ASCENDING)], "name": "user_id_change_seq"},
+    ],
+    # Deleted projects/achievements, kept for the change feed
+    "tombstones": [
+        {"keys": [("user_id", ASCENDING), ("change_seq", ASCENDING)], "name": "user_id_change_seq"},
+        {"keys": [("type", ASCENDING), ("deleted_at", ASCENDING)], "name": "type_deleted_at"},
+    ],
+}
+
+
+def _key_pattern(keys) -> list:
+    return [(field, int(direction)) for field, direction in keys]
+
+
+async def ensure_indexes(db, dry_run: bool = False) -> dict:
+    """
+    Make sure every index in INDEXES exists.
+
+    Returns a report with `created` (name and build seconds), `existing`,
+    `missing` (dry run only) and `failed` (e.g. duplicate keys blocking a
+    unique index) entries, plus the total elapsed time.
+    """
+    report = {"dry_run": dry_run, "created": [], "existing": [], "missing": [], "failed": []}
+    started = time.perf_counter()
+
+    for collection_name, specs in INDEXES.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        existing_patterns = {
+            tuple(_key_pattern(info["key"])): name for name, info in existing.items()
+        }
+
+        for spec in specs:
+            entry = {"collection": collection_name, "name": spec["name"]}
+            found = existing_patterns.get(tuple(_key_pattern(spec["keys"])))
+            if found is not None:
+                report["existing"].append({**entry, "name": found})
+                continue
+            if dry_run:
+                report["missing"].append(entry)
+                continue
+
+            build_started = time.perf_counter()
+            try:
+                await collection.create_index(
+                    spec["keys"], name=spec["name"], unique=spec.get("unique", False)
+                )
+            except OperationFailure as e:
+                report["failed"].append({**entry, "error": str(e)})
+                continue
+            report["created"].append({**entry, "seconds": round(time.perf_counter() - build_started, 4)})
+
+    report["seconds"] = round(time.perf_counter() - started, 4)
+    return report
+
+
+def log_index_report(report: dict) -> None:
+    for entry in report["created"]:
+        logger.info("Built index %s.%s in %.3fs", entry["collection"], entry["name"], entry["seconds"])
+    for entry in report["missing"]:
+        logger.warning("Missing index %s.%s", entry["collection"], entry["name"])
+    for entry in report["failed"]:
+        logger.error("Could not build index %s.%s: %s", entry["collection"], entry["name"], entry["error"])
+    logger.info(
+        "Index bootstrap%s finished in %.3fs: %d created, %d existing, %d missing, %d failed",
+        " (check only)" if report["dry_run"] else "",
+        report["seconds"],
+        len(report["created"]),
+        len(report["existing"]),
+        len(report["missing"]),
+        len(report["failed"]),
+    )
+
+
+async def _main(dry_run: bool) -> int:
+    import json
+    import os
+    from pathlib import Path
+
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        report = await ensure_indexes(client[os.environ['DB_NAME']], dry_run=dry_run)
+    finally:
+        client.close()
+    print(json.dumps(report, indent=2))
+    return 1 if report["failed"] or report["missing"] else 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(asyncio.run(_main(dry_run="--check" in sys.argv[1:])))
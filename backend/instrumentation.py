@@ -0,0 +1,239 @@
+"""
+Per-request latency, payload and database-time instrumentation.
+
+`RequestMetricsMiddleware` times every HTTP request, labelled by route
+template (e.g. "/api/projects/{project_id}") so path parameters do not
+blow up label cardinality, and records the status code and response body
+size. For the duration of a request a `RequestStats` is stored in the
+`current_request` context variable; `CommandTimer`, registered with the
+Motor client as a PyMongo command listener, adds every command's round
+trip to it. Motor runs PyMongo on executor threads but copies the calling
+context into them, so a command is charged to the request that issued it.
+`PoolTimer`, a PyMongo connection pool listener, does the same for the time
+spent waiting to check a connection out of the pool (maxPoolSize reached).
+
+Requests at or above `slow_seconds` are logged with their DB breakdown:
+
+    slow request: update_project PUT /api/projects/{project_id} 200 in 1.204 s; 3 DB ops, 4.1 ms DB (find 2, update 1)
+    slow request: export_for_ai GET /api/export/{slug} 200 in 2.310 s; 2 DB ops, 3.0 ms DB (find 2); 2150.2 ms pool wait
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from pymongo import monitoring
+
+from metrics import DEFAULT_SIZE_BUCKETS, CounterFamily, HistogramFamily
+
+logger = logging.getLogger(__name__)
+
+http_request_seconds = HistogramFamily(
+    "http_request_duration_seconds", ("route", "method"), help="Request latency, first byte in to last byte out"
+)
+http_requests_total = CounterFamily("http_requests_total", ("route", "method", "status"), help="Requests handled")
+http_response_bytes = HistogramFamily(
+    "http_response_bytes", ("route",), buckets=DEFAULT_SIZE_BUCKETS, help="Response body size"
+)
+request_db_operations = CounterFamily(
+    "http_request_db_operations_total", ("route",), help="MongoDB commands issued while serving the route"
+)
+request_db_seconds = CounterFamily(
+    "http_request_db_seconds_total", ("route",), help="MongoDB round-trip time spent serving the route"
+)
+db_command_seconds = HistogramFamily("db_command_duration_seconds", ("command",), help="MongoDB command round trips")
+db_command_failures = CounterFamily("db_command_failures_total", ("command",), help="MongoDB commands that failed")
+request_pool_wait_seconds = CounterFamily(
+    "http_request_db_pool_wait_seconds_total", ("route",), help="Time spent waiting for a pooled MongoDB connection"
+)
+db_pool_wait_seconds = HistogramFamily(
+    "db_pool_checkout_wait_seconds", ("address",), help="Wait to check a connection out of the MongoDB pool"
+)
+db_pool_checkout_failures = CounterFamily(
+    "db_pool_checkout_failures_total", ("address", "reason"), help="Pool checkouts that failed (e.g. timeout)"
+)
+
+METRIC_FAMILIES = (
+    http_request_seconds, http_requests_total, http_response_bytes,
+    request_db_operations, request_db_seconds, request_pool_wait_seconds,
+    db_command_seconds, db_command_failures, db_pool_wait_seconds, db_pool_checkout_failures,
+)
+
+
+class RequestStats:
+    __slots__ = ("commands", "pool_waits")
+
+    def __init__(self):
+        # (command name, microseconds); list.append is atomic, so listener threads can share it
+        self.commands: List[Tuple[str, int]] = []
+        # Seconds each connection checkout waited for the pool
+        self.pool_waits: List[float] = []
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(micros for _, micros in self.commands) / 1e6
+
+    @property
+    def pool_wait_seconds(self) -> float:
+        return sum(self.pool_waits)
+
+    def breakdown(self) -> str:
+        counts = Counter(name for name, _ in self.commands)
+        return ", ".join(f"{name} {n}" for name, n in counts.most_common())
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Times every command and charges it to the request in the calling context, if any."""
+
+    def __init__(self):
+        # Callbacks run on Motor's executor threads; the histograms are not thread-safe on their own
+        self.lock = threading.Lock()
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        self._record(event.command_name, event.duration_micros, failed=False)
+
+    def failed(self, event) -> None:
+        self._record(event.command_name, event.duration_micros, failed=True)
+
+    def _record(self, command: str, micros: int, failed: bool) -> None:
+        stats = current_request.get()
+        if stats is not None:
+            stats.commands.append((command, micros))
+        with self.lock:
+            db_command_seconds.labels(command).observe(micros / 1e6)
+            if failed:
+                db_command_failures.labels(command).inc()
+
+
+def format_address(address) -> str:
+    host, port = address
+    return f"{host}:{port}"
+
+
+class PoolTimer(monitoring.ConnectionPoolListener):
+    """
+    Times connection checkouts and charges the wait to the request in the calling context.
+    PyMongo checks a connection out synchronously on the thread that runs the operation,
+    so the start and end events of one checkout arrive on the same thread.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def connection_check_out_started(self, event) -> None:
+        self.local.started = time.perf_counter()
+
+    def connection_checked_out(self, event) -> None:
+        waited = self._waited()
+        if waited is None:
+            return
+        stats = current_request.get()
+        if stats is not None:
+            stats.pool_waits.append(waited)
+        with self.lock:
+            db_pool_wait_seconds.labels(format_address(event.address)).observe(waited)
+
+    def connection_check_out_failed(self, event) -> None:
+        waited = self._waited()
+        stats = current_request.get()
+        if stats is not None and waited is not None:
+            stats.pool_waits.append(waited)
+        with self.lock:
+            db_pool_checkout_failures.labels(format_address(event.address), event.reason).inc()
+
+    def _waited(self) -> Optional[float]:
+        started = getattr(self.local, "started", None)
+        self.local.started = None
+        return None if started is None else time.perf_counter() - started
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        pass
+
+    def connection_checked_in(self, event) -> None:
+        pass
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses are timed to their last chunk."""
+
+    def __init__(self, app, slow_seconds: float = 1.0):
+        self.app = app
+        self.slow_seconds = slow_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status, sent = 500, 0
+
+        async def send_wrapper(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request.reset(token)
+            self._record(scope, stats, status, sent, elapsed)
+
+    def _record(self, scope, stats: RequestStats, status: int, sent: int, elapsed: float) -> None:
+        # The router writes the matched route into the scope it was handed
+        route = scope.get("route")
+        label = getattr(route, "path", None) or "unmatched"
+        method = scope["method"]
+        db_seconds = stats.db_seconds
+        pool_wait = stats.pool_wait_seconds
+
+        http_request_seconds.labels(label, method).observe(elapsed)
+        http_requests_total.labels(label, method, str(status)).inc()
+        http_response_bytes.labels(label).observe(sent)
+        if stats.commands:
+            request_db_operations.labels(label).inc(len(stats.commands))
+            request_db_seconds.labels(label).inc(db_seconds)
+        if stats.pool_waits:
+            request_pool_wait_seconds.labels(label).inc(pool_wait)
+
+        if self.slow_seconds > 0 and elapsed >= self.slow_seconds:
+            endpoint = getattr(scope.get("endpoint"), "__name__", label)
+            logger.warning(
+                "slow request: %s %s %s %d in %.3f s; %d DB ops, %.1f ms DB%s%s",
+                endpoint, method, label, status, elapsed, len(stats.commands), db_seconds * 1000,
+                f" ({stats.breakdown()})" if stats.commands else "",
+                f"; {pool_wait * 1000:.1f} ms pool wait" if pool_wait >= 0.0001 else "",
+            )
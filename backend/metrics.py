@@ -0,0 +1,150 @@
+"""
+Lightweight in-process metrics for the DevFolio API.
+
+Histograms use fixed cumulative buckets (Prometheus style) so observing a
+value is O(number of buckets) with no allocation, and quantiles are
+estimated by interpolating inside the bucket that contains them.
+`render_prometheus` writes histogram and counter families in the
+Prometheus text exposition format.
+"""
+import bisect
+from typing import Dict, Hashable, List, Sequence
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Response sizes in bytes, 256 B to 4 MiB
+DEFAULT_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations in seconds."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # One extra slot for observations above the largest bound (+Inf)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[i] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.count
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": round(self.quantile(0.50), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "p99": round(self.quantile(0.99), 6),
+            "buckets": buckets,
+        }
+
+
+class HistogramFamily:
+    """A set of LatencyHistograms keyed by a label tuple, created on first use."""
+
+    def __init__(self, name: str, label_names: Sequence[str], buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+                 help: str = ""):
+        self.name = name
+        self.label_names = tuple(label_names)
+        self.buckets = buckets
+        self.help = help
+        self.histograms: Dict[Hashable, LatencyHistogram] = {}
+
+    def labels(self, *values: str) -> LatencyHistogram:
+        histogram = self.histograms.get(values)
+        if histogram is None:
+            histogram = self.histograms[values] = LatencyHistogram(self.buckets)
+        return histogram
+
+    def snapshot(self) -> dict:
+        return {"/".join(labels): histogram.snapshot() for labels, histogram in self.histograms.items()}
+
+    def exposition(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help or self.name}", f"# TYPE {self.name} histogram"]
+        for labels, histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                cumulative += bucket_count
+                le = format_labels(self.label_names, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = format_labels(self.label_names, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {histogram.count}")
+            label_text = format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {histogram.sum}")
+            lines.append(f"{self.name}_count{label_text} {histogram.count}")
+        return lines
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class CounterFamily:
+    """A set of monotonically increasing counters keyed by a label tuple."""
+
+    def __init__(self, name: str, label_names: Sequence[str], help: str = ""):
+        self.name = name
+        self.label_names = tuple(label_names)
+        self.help = help
+        self.counters: Dict[Hashable, Counter] = {}
+
+    def labels(self, *values: str) -> Counter:
+        counter = self.counters.get(values)
+        if counter is None:
+            counter = self.counters[values] = Counter()
+        return counter
+
+    def snapshot(self) -> dict:
+        return {"/".join(labels): counter.value for labels, counter in self.counters.items()}
+
+    def exposition(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help or self.name}", f"# TYPE {self.name} counter"]
+        for labels, counter in sorted(self.counters.items()):
+            lines.append(f"{self.name}{format_labels(self.label_names, labels)} {counter.value:g}")
+        return lines
+
+
+def render_prometheus(families) -> str:
+    lines = []
+    for family in families:
+        lines.extend(family.exposition())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,137 @@
+"""
+Password hashing for DevFolio.
+
+Hashes use the stdlib scrypt KDF with a per-password random salt and are
+stored as `scrypt$<n>$<r>$<p>$<salt>$<hash>` (base64 salt/hash). The KDF
+runs in a dedicated thread pool; hashlib releases the GIL while it works,
+so the event loop keeps serving other requests during a login.
+
+Legacy hashes (bare unsalted SHA-256 hex digests) still verify, and
+`needs_rehash` flags them -- and scrypt hashes made with older cost
+parameters -- for upgrade after a successful login.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+SCHEME = "scrypt"
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+class HasherBusy(Exception):
+    """Raised when a hash could not get a concurrency slot within the queue timeout."""
+
+
+class PasswordHasher:
+    """
+    Runs scrypt in a bounded thread pool.
+
+    `max_concurrency` caps how many hashes may be queued or running at once;
+    callers beyond that wait up to `queue_timeout` seconds for a slot and then
+    get HasherBusy, so a login burst sheds load instead of building an
+    unbounded backlog of 16 MiB scrypt jobs.
+    """
+
+    def __init__(self, n: int = 2 ** 14, r: int = 8, p: int = 1, workers: int = 4,
+                 max_concurrency: int = 16, queue_timeout: float = 5.0):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.rejected = 0
+
+    # -- synchronous primitives -------------------------------------------
+
+    def _derive(self, password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        # scrypt needs ~128 * n * r bytes; leave headroom over OpenSSL's 32 MiB default
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p,
+            maxmem=256 * n * r + 1024 * 1024, dklen=KEY_BYTES
+        )
+
+    def hash_sync(self, password: str) -> str:
+        salt = os.urandom(SALT_BYTES)
+        key = self._derive(password, salt, self.n, self.r, self.p)
+        return "$".join([
+            SCHEME, str(self.n), str(self.r), str(self.p),
+            base64.b64encode(salt).decode(), base64.b64encode(key).decode()
+        ])
+
+    def verify_sync(self, password: str, stored: str) -> bool:
+        if not stored.startswith(SCHEME + "$"):
+            legacy = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(legacy, stored)
+        try:
+            _, n, r, p, salt, key = stored.split("$")
+            expected = base64.b64decode(key)
+            actual = self._derive(password, base64.b64decode(salt), int(n), int(r), int(p))
+        except ValueError:
+            return False
+        return hmac.compare_digest(actual, expected)
+
+    @property
+    def dummy_hash(self) -> str:
+        """
+        A well-formed hash at the current cost that no password matches. Verifying against it
+        costs what a real check does, so a login for an unknown email takes as long as a
+        wrong password and does not reveal whether the email is registered.
+        """
+        return "$".join([
+            SCHEME, str(self.n), str(self.r), str(self.p),
+            base64.b64encode(bytes(SALT_BYTES)).decode(), base64.b64encode(bytes(KEY_BYTES)).decode()
+        ])
+
+    def needs_rehash(self, stored: str) -> bool:
+        return not stored.startswith(f"{SCHEME}${self.n}${self.r}${self.p}$")
+
+    # -- async API ---------------------------------------------------------
+
+    async def _run(self, fn, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HasherBusy()
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.hash_sync, password)
+
+    async def verify(self, password: str, stored: str) -> bool:
+        return await self._run(self.verify_sync, password, stored)
+
+    def stats(self) -> dict:
+        return {
+            "scheme": SCHEME,
+            "n": self.n,
+            "r": self.r,
+            "p": self.p,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._slots = None
@@ -0,0 +1,252 @@
+"""
+Opt-in profiling of individual requests.
+
+A `RequestProfiler` is armed with one rule: a route template (e.g.
+"/api/export/{slug}"), optionally narrowed to a method and a slug, and a
+mode:
+
+- "cprofile" runs cProfile around the request; download it as a binary
+  .pstats file (for pstats / snakeviz) or as a text summary.
+- "sample" runs a thread that snapshots the event loop thread's stack every
+  `interval_ms` and counts identical stacks; download it as collapsed-stack
+  text, one "frame;frame;frame count" line per stack (flamegraph.pl,
+  speedscope). The sampler needs the GIL to take a sample, so while the
+  loop is busy in pure Python the effective interval is bounded below by
+  sys.getswitchinterval() (5 ms by default).
+
+Both profile the event loop thread, so while a request is being profiled
+anything else the loop runs (other requests, background tasks) shows up
+too. Only one request is profiled at a time; matches that arrive while a
+capture is running are skipped and counted. Finished profiles are kept in a
+ring buffer of the last `max_profiles`.
+
+When no rule is armed `ProfilingMiddleware` does one attribute check per
+request and otherwise passes straight through.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Deque, List, Optional, Sequence
+
+from starlette.routing import Match
+
+PROFILE_MODES = ("cprofile", "sample")
+
+
+class ProfileRule:
+    __slots__ = ("route", "routes", "path_regex", "method", "slug", "mode", "interval_ms", "remaining", "armed_at")
+
+    def __init__(self, route, method: Optional[str] = None, slug: Optional[str] = None, mode: str = "cprofile",
+                 interval_ms: float = 5.0, limit: Optional[int] = None, routes: Sequence = ()):
+        # `route` is the router's route object; its compiled path_regex does the matching. With
+        # the app's `routes` (in dispatch order), a request whose path fits the template is only
+        # profiled if the router would send it there: "/api/export/{slug}" also fits
+        # POST /api/export/batch, which the router hands to the batch route.
+        self.route = route
+        self.routes = routes
+        self.path_regex = route.path_regex
+        self.method = method.upper() if method else None
+        self.slug = slug
+        self.mode = mode
+        self.interval_ms = interval_ms
+        self.remaining = limit
+        self.armed_at = datetime.now(timezone.utc).isoformat()
+
+    def matches(self, scope) -> Optional[dict]:
+        if self.method is not None and scope["method"] != self.method:
+            return None
+        match = self.path_regex.match(scope["path"])
+        if match is None:
+            return None
+        params = match.groupdict()
+        if self.slug is not None and params.get("slug") != self.slug:
+            return None
+        if self.routes and next((r for r in self.routes if r.matches(scope)[0] == Match.FULL), None) is not self.route:
+            return None
+        return params
+
+    def describe(self) -> dict:
+        return {
+            "route": self.route.path,
+            "method": self.method,
+            "slug": self.slug,
+            "mode": self.mode,
+            "interval_ms": self.interval_ms,
+            "remaining": self.remaining,
+            "armed_at": self.armed_at,
+        }
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer and counts collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval_ms: float):
+        self.thread_id = thread_id
+        self.interval = interval_ms / 1000
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if frames:
+                self.stacks[";".join(reversed(frames))] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class StatsHolder:
+    """Feeds a stored stats dict back to pstats.Stats, which wants an object with create_stats()."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class RequestProfiler:
+    def __init__(self, max_profiles: int = 20):
+        self.rule: Optional[ProfileRule] = None
+        self.profiles: Deque[dict] = deque(maxlen=max_profiles)
+        self.active = False
+        self.captured = 0
+        self.skipped_busy = 0
+
+    def arm(self, rule: ProfileRule) -> None:
+        self.rule = rule
+
+    def disarm(self) -> None:
+        self.rule = None
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        return next((profile for profile in self.profiles if profile["id"] == profile_id), None)
+
+    def summaries(self) -> List[dict]:
+        return [{k: v for k, v in profile.items() if k != "data"} for profile in reversed(self.profiles)]
+
+    def stats(self) -> dict:
+        return {
+            "rule": self.rule.describe() if self.rule is not None else None,
+            "active": self.active,
+            "captured": self.captured,
+            "skipped_busy": self.skipped_busy,
+            "max_profiles": self.profiles.maxlen,
+        }
+
+    def claim(self, scope) -> Optional[dict]:
+        """Return path params if this request should be profiled, reserving the profiler for it."""
+        rule = self.rule
+        params = rule.matches(scope)
+        if params is None:
+            return None
+        if self.active:
+            self.skipped_busy += 1
+            return None
+        self.active = True
+        if rule.remaining is not None:
+            rule.remaining -= 1
+            if rule.remaining <= 0:
+                self.rule = None
+        return params
+
+    def store(self, rule: ProfileRule, scope, params: dict, status: int, started_at: str,
+              seconds: float, data, samples: Optional[int] = None) -> None:
+        self.active = False
+        self.captured += 1
+        self.profiles.append({
+            "id": uuid.uuid4().hex[:12],
+            "mode": rule.mode,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": rule.route.path,
+            "slug": params.get("slug"),
+            "status": status,
+            "started_at": started_at,
+            "seconds": round(seconds, 6),
+            "samples": samples,
+            "data": data,
+        })
+
+
+def render_profile(profile: dict, format: str) -> bytes:
+    """Serialize a stored profile: 'pstats' (binary) or 'text' for cprofile, 'collapsed' for sample."""
+    if format == "pstats":
+        return marshal.dumps(profile["data"])
+    if format == "text":
+        out = io.StringIO()
+        pstats.Stats(StatsHolder(profile["data"]), stream=out).sort_stats("cumulative").print_stats(60)
+        return out.getvalue().encode()
+    return profile["data"].encode()
+
+
+def profile_formats(mode: str) -> tuple:
+    return ("pstats", "text") if mode == "cprofile" else ("collapsed",)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if self.profiler.rule is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        rule = self.profiler.rule
+        params = self.profiler.claim(scope)
+        if params is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started_at = datetime.now(timezone.utc).isoformat()
+        started = time.perf_counter()
+        profile = sampler = None
+        try:
+            if rule.mode == "sample":
+                sampler = StackSampler(threading.get_ident(), rule.interval_ms)
+                sampler.start()
+            else:
+                profile = cProfile.Profile()
+                profile.enable()
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if sampler is not None:
+                sampler.stop()
+                data, samples = sampler.collapsed(), sampler.samples
+            else:
+                profile.disable()
+                profile.create_stats()
+                data, samples = profile.stats, None
+            self.profiler.store(rule, scope, params, status, started_at, time.perf_counter() - started, data, samples)
@@ -0,0 +1,104 @@
+"""
+Token-bucket rate limiting for the public endpoints.
+
+Every (limit name, client) pair has a bucket holding up to `burst` tokens
+that refills at `rate` tokens per second. A request takes one token, or is
+refused with the seconds until the next token is due (sent as
+Retry-After). Clients that send one of the configured API keys are
+limited per key, with limits multiplied by `api_key_factor`; everyone else
+is limited per IP address (behind a proxy, run uvicorn with --proxy-headers
+so that is the client's address rather than the proxy's).
+
+Buckets live in an LRU capped at `max_clients`; an evicted client simply
+starts over with a full bucket. Limits apply per worker process.
+"""
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+
+class RateLimit(NamedTuple):
+    rate: float  # tokens per second
+    burst: float  # bucket size
+
+
+def parse_limits(spec: str) -> Dict[str, RateLimit]:
+    """
+    Parse 'profile=20/60,export=10/30' (name=rate per second/burst; burst defaults to rate).
+    Raises ValueError for a rate that is not positive or a burst below one request, since
+    such a bucket would refuse every request.
+    """
+    limits = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = part.partition("=")
+        rate, _, burst = value.partition("/")
+        limit = RateLimit(float(rate), float(burst or rate))
+        if not limit.rate > 0 or not limit.burst >= 1:
+            raise ValueError(f"invalid rate limit {part!r}: rate must be > 0 and burst >= 1")
+        limits[name.strip()] = limit
+    return limits
+
+
+class RateLimiter:
+    def __init__(self, limits: Dict[str, RateLimit], api_keys: Iterable[str] = (),
+                 api_key_factor: float = 10.0, max_clients: int = 100_000):
+        self.limits = limits
+        self.api_keys = frozenset(api_keys)
+        self.api_key_factor = api_key_factor
+        self.max_clients = max_clients
+        # (limit name, client) -> [tokens, monotonic time of last refill]
+        self._buckets: "OrderedDict[Tuple[str, str], list]" = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+
+    def client_key(self, address: Optional[str], api_key: Optional[str]) -> Tuple[str, bool]:
+        """(bucket key, whether it is an API key) for a request."""
+        if api_key and api_key in self.api_keys:
+            return "key:" + api_key, True
+        return "ip:" + (address or "unknown"), False
+
+    def acquire(self, name: str, client: str, keyed: bool = False) -> float:
+        """Take a token; returns 0.0 if the request may proceed, else seconds until it may retry."""
+        limit = self.limits.get(name)
+        if limit is None:
+            return 0.0
+        rate, burst = limit
+        if keyed:
+            rate, burst = rate * self.api_key_factor, burst * self.api_key_factor
+
+        now = time.monotonic()
+        bucket = self._buckets.get((name, client))
+        if bucket is None:
+            bucket = self._buckets[(name, client)] = [burst, now]
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._buckets.move_to_end((name, client))
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            self.allowed += 1
+            return 0.0
+        self.limited += 1
+        return (1 - bucket[0]) / rate
+
+    @staticmethod
+    def retry_after(seconds: float) -> str:
+        return str(max(1, math.ceil(seconds)))
+
+    def stats(self) -> dict:
+        return {
+            "limits": {name: limit._asdict() for name, limit in self.limits.items()},
+            "api_keys": len(self.api_keys),
+            "api_key_factor": self.api_key_factor,
+            "clients": len(self._buckets),
+            "max_clients": self.max_clients,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evictions": self.evictions,
+        }
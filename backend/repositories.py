@@ -0,0 +1,767 @@
+"""
+Storage for users, projects, achievements and change-feed tombstones.
+
+Route handlers go through a storage object (`storage.users`,
+`storage.projects`, `storage.achievements`, `storage.tombstones`,
+`storage.settings`, or `storage["projects"]` by collection name) rather
+than a Motor database:
+
+- `MotorStorage` is the production engine. Every method is one Mongo
+  command or cursor, with the filters, sorts and projections the handlers
+  used to issue themselves, so the indexes in indexes.py still apply.
+- `MemoryStorage` keeps documents in dicts with per-user sorted indexes
+  and answers the same queries in process, with the same sort orders,
+  limits and unique constraints. It is not durable and only sees writes
+  made by its own process; it exists so the HTTP layer can be benchmarked
+  and exercised without a database.
+
+Both take Mongo-style projections: {"_id": 0, "title": 1} keeps only
+title, {"_id": 0, "change_seq": 0} drops change_seq. Item lists come back
+either newest first (KEYSET_SORT) or, when unsorted, in insertion order
+(Mongo's natural order).
+
+`storage.public_reads` is the storage to use for the public, read-only
+profile and export endpoints. On Mongo it can route reads to secondaries
+(see make_read_preference); writes always go to the primary whatever the
+read preference. For the memory engine, or with a primary read preference,
+it is the storage itself.
+
+Methods that return cursors (iter_*, find_by_ids, scan, snapshot,
+changes_after, created_since, updated_since, deleted_since) are plain calls whose result is used with `async for`.
+"""
+from bisect import bisect_left, insort
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+from pymongo import DeleteOne, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+
+# Newest first; id breaks ties between items created in the same instant
+KEYSET_SORT = [("created_at", -1), ("id", -1)]
+
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def make_read_preference(name: str, max_staleness: int = -1):
+    """Build a PyMongo read preference from its mode name; max_staleness -1 means no limit."""
+    if name not in READ_PREFERENCES:
+        raise ValueError(f"unknown read preference {name!r}; choose from {', '.join(READ_PREFERENCES)}")
+    if name == "primary":
+        return Primary()
+    return READ_PREFERENCES[name](max_staleness=max_staleness)
+
+
+class ItemQuery(NamedTuple):
+    """One read of a user's projects or achievements."""
+    projection: dict
+    limit: int
+    newest_first: bool = False
+    after: Optional[list] = None  # [created_at, id] to continue after, in KEYSET_SORT order
+
+
+class BulkInsert(NamedTuple):
+    doc: dict
+
+
+class BulkUpdate(NamedTuple):
+    item_id: str
+    user_id: str
+    versions: Optional[List[int]]  # expected versions (see version_condition), or None
+    fields: dict
+
+
+class BulkDelete(NamedTuple):
+    item_id: str
+    user_id: str
+    versions: Optional[List[int]]
+
+
+class BulkOutcome(NamedTuple):
+    """
+    What a bulk write did, by operation index. `errors` are write errors (an ordered batch
+    stops at the first one); `unmatched` are updates/deletes whose item was gone ('not found')
+    or at another version ('version conflict') by the time the write ran.
+    """
+    errors: List[Tuple[int, str]]
+    unmatched: Dict[int, str]
+
+
+def keyset_condition(after: Optional[list]) -> dict:
+    """Match items strictly after `after` = [created_at, id] in KEYSET_SORT order."""
+    if not after:
+        return {}
+    created_at, item_id = after
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": item_id}}
+    ]}
+
+
+def version_condition(versions: List[int]) -> dict:
+    # Items written before versioning have no version field; they count as version 0
+    if 0 in versions:
+        versions = versions + [None]
+    return {"version": {"$in": versions}}
+
+
+def owned_query(item_id: str, user_id: str, versions: Optional[List[int]] = None) -> dict:
+    query = {"id": item_id, "user_id": user_id}
+    if versions is not None:
+        query.update(version_condition(versions))
+    return query
+
+
+# ============ MOTOR ============
+
+class MotorItemRepository:
+    def __init__(self, collection):
+        self.collection = collection
+        self.name = collection.name
+
+    async def insert(self, doc: dict) -> None:
+        # insert_one adds _id to the document it is given; keep the caller's copy clean
+        await self.collection.insert_one({**doc})
+
+    async def get(self, item_id: str, user_id: str, projection: dict) -> Optional[dict]:
+        return await self.collection.find_one({"id": item_id, "user_id": user_id}, projection)
+
+    async def exists(self, item_id: str, user_id: str) -> bool:
+        return bool(await self.collection.count_documents({"id": item_id, "user_id": user_id}, limit=1))
+
+    async def update(self, item_id: str, user_id: str, fields: dict, versions: Optional[List[int]],
+                     projection: dict) -> Optional[dict]:
+        """Bump the version and $set `fields` in one write; return the post-image, or None if nothing matched."""
+        update = {"$inc": {"version": 1}}
+        if fields:
+            update["$set"] = fields
+        return await self.collection.find_one_and_update(
+            owned_query(item_id, user_id, versions),
+            update,
+            projection=projection,
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def delete(self, item_id: str, user_id: str) -> bool:
+        result = await self.collection.delete_one({"id": item_id, "user_id": user_id})
+        return result.deleted_count == 1
+
+    async def versions(self, user_id: str, item_ids: List[str]) -> Dict[str, int]:
+        versions = {}
+        async for doc in self.collection.find({"id": {"$in": item_ids}, "user_id": user_id}, {"_id": 0, "id": 1, "version": 1}):
+            versions[doc["id"]] = doc.get("version", 0)
+        return versions
+
+    async def bulk_write(self, operations: list, ordered: bool) -> BulkOutcome:
+        """
+        Run BulkInsert/BulkUpdate/BulkDelete operations in one bulk write.
+        Mongo only reports how many updates matched and deletes removed in total; when that
+        falls short of what ran, one read of the targeted items tells which ones missed.
+        """
+        requests = []
+        for op in operations:
+            if isinstance(op, BulkInsert):
+                requests.append(InsertOne({**op.doc}))
+            elif isinstance(op, BulkUpdate):
+                requests.append(UpdateOne(owned_query(op.item_id, op.user_id, op.versions),
+                                          {"$inc": {"version": 1}, "$set": op.fields}))
+            else:
+                requests.append(DeleteOne(owned_query(op.item_id, op.user_id, op.versions)))
+        try:
+            result = await self.collection.bulk_write(requests, ordered=ordered)
+            errors, matched, removed = [], result.matched_count, result.deleted_count
+        except BulkWriteError as e:
+            errors = [(error["index"], error["errmsg"]) for error in e.details.get("writeErrors", [])]
+            matched, removed = e.details.get("nMatched", 0), e.details.get("nRemoved", 0)
+        
+        ran = range(errors[0][0] if ordered and errors else len(operations))
+        failed = {index for index, _ in errors}
+        updates = [i for i in ran if i not in failed and isinstance(operations[i], BulkUpdate)]
+        deletes = [i for i in ran if i not in failed and isinstance(operations[i], BulkDelete)]
+        if matched >= len(updates) and removed >= len(deletes):
+            return BulkOutcome(errors, {})
+        return BulkOutcome(errors, await self._unmatched(operations, updates, deletes))
+
+    async def _unmatched(self, operations: list, updates: List[int], deletes: List[int]) -> Dict[int, str]:
+        """
+        Tell which updates/deletes missed: an update applied if its item now carries its fields
+        (each bulk update sets a unique change_seq), a delete if its item is gone. An item changed
+        again by another request right after this write is reported as a conflict.
+        """
+        targets = [operations[i] for i in updates + deletes]
+        projection = {"_id": 0, "id": 1}
+        for i in updates:
+            projection.update(dict.fromkeys(operations[i].fields, 1))
+        found = {}
+        async for doc in self.collection.find(
+            {"id": {"$in": [op.item_id for op in targets]}, "user_id": targets[0].user_id}, projection
+        ):
+            found[doc["id"]] = doc
+        
+        unmatched = {}
+        for i in updates:
+            doc = found.get(operations[i].item_id)
+            if doc is None:
+                unmatched[i] = "not found"
+            elif any(doc.get(key) != value for key, value in operations[i].fields.items()):
+                unmatched[i] = "version conflict"
+        # A delete whose item is gone counts as applied, even when a concurrent request removed
+        # it first (Mongo's total cannot say which); either way the item no longer exists
+        for i in deletes:
+            if operations[i].item_id in found:
+                unmatched[i] = "version conflict"
+        return unmatched
+
+    async def list_for_user(self, user_id: str, query: ItemQuery) -> List[dict]:
+        cursor = self.collection.find({"user_id": user_id, **keyset_condition(query.after)}, query.projection)
+        if query.newest_first:
+            cursor = cursor.sort(KEYSET_SORT)
+        return await cursor.limit(query.limit).to_list(query.limit)
+
+    def iter_for_user(self, user_id: str, projection: dict, batch_size: int):
+        """Every item of one user, newest first."""
+        return self.collection.find({"user_id": user_id}, projection).sort(KEYSET_SORT).batch_size(batch_size)
+
+    def iter_for_users(self, user_ids: List[str], projection: dict, batch_size: int):
+        """Every item of the given users, grouped by user_id (ascending), newest first within a user."""
+        return self.collection.find(
+            {"user_id": {"$in": user_ids}},
+            projection
+        ).sort([("user_id", 1), *KEYSET_SORT]).batch_size(batch_size)
+
+    def find_by_ids(self, item_ids: List[str], projection: dict):
+        return self.collection.find({"id": {"$in": item_ids}}, projection)
+
+    def scan(self, projection: dict, batch_size: int):
+        return self.collection.find({}, projection).batch_size(batch_size)
+
+    def updated_since(self, since: str, projection: dict, batch_size: int):
+        """Items created or updated at or after `since`, across all users."""
+        return self.collection.find({"updated_at": {"$gte": since}}, projection).batch_size(batch_size)
+
+    async def latest_timestamps(self, user_id: str) -> Tuple[Optional[str], Optional[str]]:
+        """(newest created_at, newest updated_at) among the user's items."""
+        async for row in self.collection.aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$group": {"_id": None, "created": {"$max": "$created_at"}, "updated": {"$max": "$updated_at"}}}
+        ]):
+            return row.get("created"), row.get("updated")
+        return None, None
+
+    def snapshot(self, user_id: str, until: int, projection: dict):
+        """Items whose change number is at most `until`, plus items written before the change feed existed."""
+        return self.collection.find({"user_id": user_id, "change_seq": {"$not": {"$gt": until}}}, projection)
+
+    def changes_after(self, user_id: str, since: int, until: int, limit: int, projection: dict):
+        """Items with since < change_seq <= until, lowest change number first."""
+        return self.collection.find(
+            {"user_id": user_id, "change_seq": {"$gt": since, "$lte": until}},
+            projection
+        ).sort("change_seq", 1).limit(limit)
+
+
+class MotorTombstoneRepository:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def insert_many(self, docs: List[dict]) -> None:
+        await self.collection.insert_many([{**doc} for doc in docs])
+
+    def deleted_since(self, item_type: str, since: str, batch_size: int):
+        """Tombstones of `item_type` left at or after `since`, across all users."""
+        return self.collection.find(
+            {"type": item_type, "deleted_at": {"$gte": since}}, {"_id": 0}
+        ).batch_size(batch_size)
+
+    def changes_after(self, user_id: str, since: int, until: int, limit: int):
+        return self.collection.find(
+            {"user_id": user_id, "change_seq": {"$gt": since, "$lte": until}},
+            {"_id": 0}
+        ).sort("change_seq", 1).limit(limit)
+
+
+class MotorSettingRepository:
+    """Process-independent settings (e.g. a generated JWT secret), one document per key."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def get_or_create(self, key: str, value):
+        """Return the stored value for `key`, storing `value` first if there is none yet."""
+        try:
+            doc = await self.collection.find_one_and_update(
+                {"_id": key}, {"$setOnInsert": {"value": value}},
+                upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Another process inserted it between our match and our insert
+            doc = await self.collection.find_one({"_id": key})
+        return doc["value"]
+
+
+class MotorUserRepository:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def insert(self, doc: dict) -> None:
+        await self.collection.insert_one({**doc})
+
+    async def get(self, user_id: str, projection: dict) -> Optional[dict]:
+        return await self.collection.find_one({"id": user_id}, projection)
+
+    async def get_by_email(self, email: str, projection: dict) -> Optional[dict]:
+        return await self.collection.find_one({"email": email}, projection)
+
+    async def get_by_slug(self, slug: str, projection: dict) -> Optional[dict]:
+        return await self.collection.find_one({"unique_slug": slug}, projection)
+
+    async def find_by_slugs(self, slugs: List[str], projection: dict) -> List[dict]:
+        return await self.collection.find({"unique_slug": {"$in": slugs}}, projection).to_list(len(slugs))
+
+    async def find_by_ids(self, user_ids: List[str], projection: dict) -> List[dict]:
+        return await self.collection.find({"id": {"$in": user_ids}}, projection).to_list(len(user_ids))
+
+    async def estimated_count(self) -> int:
+        return await self.collection.estimated_document_count()
+
+    def created_since(self, since: Optional[str], projection: dict, batch_size: int):
+        """Users created at or after `since` (every user if None); a cursor."""
+        query = {} if since is None else {"created_at": {"$gte": since}}
+        return self.collection.find(query, projection).batch_size(batch_size)
+
+    async def replace_password_hash(self, user_id: str, old_hash: str, new_hash: str) -> None:
+        """Swap the hash only if it is still `old_hash` (a concurrent password change wins)."""
+        await self.collection.update_one(
+            {"id": user_id, "password_hash": old_hash},
+            {"$set": {"password_hash": new_hash}}
+        )
+
+    async def bump_content_version(self, user_id: str, updated_at: str, release_seq: Optional[int] = None) -> None:
+        update = {
+            "$inc": {"content_version": 1},
+            "$max": {"content_updated_at": updated_at}
+        }
+        if release_seq is not None:
+            update["$pull"] = {"changes_pending": {"seq": release_seq}}
+        await self.collection.update_one({"id": user_id}, update)
+
+    async def init_content_version(self, user_id: str, updated_at: str) -> None:
+        """Backfill content_version/content_updated_at unless a write has set them meanwhile."""
+        await self.collection.update_one(
+            {"id": user_id, "content_version": {"$exists": False}},
+            {"$set": {"content_version": 0, "content_updated_at": updated_at}}
+        )
+
+    async def reserve_change_seqs(self, user_id: str, count: int, at: str,
+                                  stale_before: Optional[str] = None) -> Optional[int]:
+        """
+        Advance change_seq by `count` and record the reservation in changes_pending, in one
+        atomic write (an update pipeline, MongoDB 4.2+). Reservations made before `stale_before`
+        (left behind by writers that died) are dropped in the same write. Returns the first
+        reserved number, or None if there is no such user.
+        """
+        pending = {"$ifNull": ["$changes_pending", []]}
+        if stale_before is not None:
+            pending = {"$filter": {
+                "input": pending, "as": "pending", "cond": {"$gte": ["$$pending.at", {"$literal": stale_before}]}
+            }}
+        user = await self.collection.find_one_and_update(
+            {"id": user_id},
+            [
+                {"$set": {"change_seq": {"$add": [{"$ifNull": ["$change_seq", 0]}, count]}}},
+                # The pending entry's seq is computed from the new change_seq in the same write
+                {"$set": {"changes_pending": {"$concatArrays": [
+                    pending,
+                    {"$map": {
+                        "input": {"$literal": [count - 1]},
+                        "as": "back",
+                        "in": {"seq": {"$subtract": ["$change_seq", "$$back"]}, "at": {"$literal": at}}
+                    }}
+                ]}}}
+            ],
+            projection={"_id": 0, "id": 1, "change_seq": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return user["change_seq"] - count + 1 if user is not None else None
+
+    async def release_change_seq(self, user_id: str, seq: int) -> None:
+        await self.collection.update_one({"id": user_id}, {"$pull": {"changes_pending": {"seq": seq}}})
+
+
+class MotorStorage:
+    def __init__(self, db, public_read_preference=None):
+        self.db = db
+        self.users = MotorUserRepository(db.users)
+        self.projects = MotorItemRepository(db.projects)
+        self.achievements = MotorItemRepository(db.achievements)
+        self.tombstones = MotorTombstoneRepository(db.tombstones)
+        self.settings = MotorSettingRepository(db.settings)
+        self.public_reads = self
+        if public_read_preference is not None and not isinstance(public_read_preference, Primary):
+            self.public_reads = MotorStorage(db.with_options(read_preference=public_read_preference))
+
+    def __getitem__(self, collection: str):
+        return {"projects": self.projects, "achievements": self.achievements}[collection]
+
+    async def ping(self) -> None:
+        await self.db.command("ping")
+
+    async def load_user_with_items(self, slug: str, projection: dict, joins: Dict[str, ItemQuery]) -> Optional[dict]:
+        """
+        Look a user up by slug with each `joins` section attached under its collection name,
+        joined in with $lookup (projected server-side) so it takes a single round trip.
+        """
+        pipeline = [
+            {"$match": {"unique_slug": slug}},
+            {"$limit": 1},
+            {"$project": projection}
+        ]
+        for collection, query in joins.items():
+            stages = [{"$match": {"$expr": {"$eq": ["$user_id", "$$user_id"]}, **keyset_condition(query.after)}}]
+            if query.newest_first:
+                stages.append({"$sort": dict(KEYSET_SORT)})
+            stages += [{"$limit": query.limit}, {"$project": query.projection}]
+            pipeline.append({"$lookup": {
+                "from": collection,
+                "let": {"user_id": "$id"},
+                "pipeline": stages,
+                "as": collection
+            }})
+        users = await self.db.users.aggregate(pipeline).to_list(1)
+        return users[0] if users else None
+
+
+# ============ IN-MEMORY ============
+
+def clone(value):
+    if isinstance(value, list):
+        return [clone(v) for v in value]
+    if isinstance(value, dict):
+        return {k: clone(v) for k, v in value.items()}
+    return value
+
+
+def project(doc: dict, projection: Optional[dict]) -> dict:
+    """Apply a Mongo-style inclusion or exclusion projection to a copy of `doc`."""
+    if projection is None:
+        return clone(doc)
+    included = [key for key, value in projection.items() if value and key != "_id"]
+    if included:
+        return {key: clone(doc[key]) for key in included if key in doc}
+    return {key: clone(value) for key, value in doc.items() if projection.get(key, 1)}
+
+
+def remove_key(keys: list, key: tuple) -> None:
+    index = bisect_left(keys, key)
+    if index < len(keys) and keys[index] == key:
+        del keys[index]
+
+
+def matches_versions(doc: dict, versions: Optional[List[int]]) -> bool:
+    return versions is None or doc.get("version", 0) in versions
+
+
+class MemoryItemRepository:
+    """
+    Items by id, plus per user: (created_at, id) keys in ascending order (KEYSET_SORT is this
+    list read backwards), ids in insertion order, and (change_seq, id) keys in ascending order.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.docs: Dict[str, dict] = {}
+        self.by_created: Dict[str, List[Tuple[str, str]]] = {}
+        self.by_insertion: Dict[str, Dict[str, None]] = {}
+        self.by_change: Dict[str, List[Tuple[int, str]]] = {}
+
+    def _link(self, doc: dict) -> None:
+        insort(self.by_created.setdefault(doc["user_id"], []), (doc.get("created_at", ""), doc["id"]))
+        if doc.get("change_seq") is not None:
+            insort(self.by_change.setdefault(doc["user_id"], []), (doc["change_seq"], doc["id"]))
+
+    def _unlink(self, doc: dict) -> None:
+        remove_key(self.by_created.get(doc["user_id"], []), (doc.get("created_at", ""), doc["id"]))
+        if doc.get("change_seq") is not None:
+            remove_key(self.by_change.get(doc["user_id"], []), (doc["change_seq"], doc["id"]))
+
+    def _owned(self, item_id: str, user_id: str) -> Optional[dict]:
+        doc = self.docs.get(item_id)
+        return doc if doc is not None and doc["user_id"] == user_id else None
+
+    def _insert(self, doc: dict) -> None:
+        if doc["id"] in self.docs:
+            raise DuplicateKeyError(f"duplicate key: {self.name}.id {doc['id']}")
+        doc = clone(doc)
+        self.docs[doc["id"]] = doc
+        self.by_insertion.setdefault(doc["user_id"], {})[doc["id"]] = None
+        self._link(doc)
+
+    def _update(self, item_id: str, user_id: str, fields: dict, versions: Optional[List[int]]) -> Optional[dict]:
+        doc = self._owned(item_id, user_id)
+        if doc is None or not matches_versions(doc, versions):
+            return None
+        self._unlink(doc)
+        doc.update(clone(fields))
+        doc["version"] = doc.get("version", 0) + 1
+        self._link(doc)
+        return doc
+
+    def _delete(self, item_id: str, user_id: str, versions: Optional[List[int]] = None) -> bool:
+        doc = self._owned(item_id, user_id)
+        if doc is None or not matches_versions(doc, versions):
+            return False
+        self._unlink(doc)
+        del self.docs[item_id]
+        del self.by_insertion[user_id][item_id]
+        return True
+
+    async def insert(self, doc: dict) -> None:
+        self._insert(doc)
+
+    async def get(self, item_id: str, user_id: str, projection: dict) -> Optional[dict]:
+        doc = self._owned(item_id, user_id)
+        return project(doc, projection) if doc is not None else None
+
+    async def exists(self, item_id: str, user_id: str) -> bool:
+        return self._owned(item_id, user_id) is not None
+
+    async def update(self, item_id: str, user_id: str, fields: dict, versions: Optional[List[int]],
+                     projection: dict) -> Optional[dict]:
+        doc = self._update(item_id, user_id, fields, versions)
+        return project(doc, projection) if doc is not None else None
+
+    async def delete(self, item_id: str, user_id: str) -> bool:
+        return self._delete(item_id, user_id)
+
+    async def versions(self, user_id: str, item_ids: List[str]) -> Dict[str, int]:
+        owned = (self._owned(item_id, user_id) for item_id in item_ids)
+        return {doc["id"]: doc.get("version", 0) for doc in owned if doc is not None}
+
+    async def bulk_write(self, operations: list, ordered: bool) -> BulkOutcome:
+        errors, unmatched = [], {}
+        for index, op in enumerate(operations):
+            try:
+                if isinstance(op, BulkInsert):
+                    self._insert(op.doc)
+                    continue
+                if isinstance(op, BulkUpdate):
+                    applied = self._update(op.item_id, op.user_id, op.fields, op.versions) is not None
+                else:
+                    applied = self._delete(op.item_id, op.user_id, op.versions)
+                if not applied:
+                    unmatched[index] = "version conflict" if self._owned(op.item_id, op.user_id) else "not found"
+            except DuplicateKeyError as e:
+                errors.append((index, str(e)))
+                if ordered:
+                    break
+        return BulkOutcome(errors, unmatched)
+
+    def _newest_first(self, user_id: str, after: Optional[list] = None):
+        keys = self.by_created.get(user_id, [])
+        end = bisect_left(keys, tuple(after)) if after else len(keys)
+        for index in range(end - 1, -1, -1):
+            yield self.docs[keys[index][1]]
+
+    async def list_for_user(self, user_id: str, query: ItemQuery) -> List[dict]:
+        if query.newest_first:
+            docs = self._newest_first(user_id, query.after)
+        else:
+            after = tuple(query.after) if query.after else None
+            docs = (self.docs[item_id] for item_id in self.by_insertion.get(user_id, {}))
+            if after is not None:
+                docs = (doc for doc in docs if (doc.get("created_at", ""), doc["id"]) < after)
+        items = []
+        for doc in docs:
+            if len(items) >= query.limit:
+                break
+            items.append(project(doc, query.projection))
+        return items
+
+    async def iter_for_user(self, user_id: str, projection: dict, batch_size: int) -> AsyncIterator[dict]:
+        # Copy the ids first: the cursor must survive writes made while it is being read
+        for doc in list(self._newest_first(user_id)):
+            yield project(doc, projection)
+
+    async def iter_for_users(self, user_ids: List[str], projection: dict, batch_size: int) -> AsyncIterator[dict]:
+        for user_id in sorted(set(user_ids)):
+            for doc in list(self._newest_first(user_id)):
+                yield project(doc, projection)
+
+    async def find_by_ids(self, item_ids: List[str], projection: dict) -> AsyncIterator[dict]:
+        for doc in [self.docs[item_id] for item_id in item_ids if item_id in self.docs]:
+            yield project(doc, projection)
+
+    async def scan(self, projection: dict, batch_size: int) -> AsyncIterator[dict]:
+        for doc in list(self.docs.values()):
+            yield project(doc, projection)
+
+    async def updated_since(self, since: str, projection: dict, batch_size: int) -> AsyncIterator[dict]:
+        for doc in list(self.docs.values()):
+            if doc.get("updated_at", "") >= since:
+                yield project(doc, projection)
+
+    async def latest_timestamps(self, user_id: str) -> Tuple[Optional[str], Optional[str]]:
+        docs = [self.docs[item_id] for item_id in self.by_insertion.get(user_id, {})]
+        created = [doc["created_at"] for doc in docs if doc.get("created_at")]
+        updated = [doc["updated_at"] for doc in docs if doc.get("updated_at")]
+        return max(created, default=None), max(updated, default=None)
+
+    async def snapshot(self, user_id: str, until: int, projection: dict) -> AsyncIterator[dict]:
+        docs = [self.docs[item_id] for item_id in self.by_insertion.get(user_id, {})]
+        for doc in docs:
+            if doc.get("change_seq") is None or doc["change_seq"] <= until:
+                yield project(doc, projection)
+
+    async def changes_after(self, user_id: str, since: int, until: int, limit: int,
+                            projection: dict) -> AsyncIterator[dict]:
+        keys = self.by_change.get(user_id, [])
+        start, end = bisect_left(keys, (since + 1,)), bisect_left(keys, (until + 1,))
+        for _, item_id in keys[start:min(end, start + limit)]:
+            yield project(self.docs[item_id], projection)
+
+
+class MemoryTombstoneRepository:
+    def __init__(self):
+        # user id -> [(change_seq, insertion number, tombstone)] in ascending order
+        self.by_user: Dict[str, List[Tuple[int, int, dict]]] = {}
+        self.inserted = 0
+
+    async def insert_many(self, docs: List[dict]) -> None:
+        for doc in docs:
+            self.inserted += 1
+            insort(self.by_user.setdefault(doc["user_id"], []), (doc["change_seq"], self.inserted, clone(doc)))
+
+    async def deleted_since(self, item_type: str, since: str, batch_size: int) -> AsyncIterator[dict]:
+        for rows in list(self.by_user.values()):
+            for _, _, doc in list(rows):
+                if doc["type"] == item_type and doc["deleted_at"] >= since:
+                    yield clone(doc)
+
+    async def changes_after(self, user_id: str, since: int, until: int, limit: int) -> AsyncIterator[dict]:
+        rows = self.by_user.get(user_id, [])
+        start, end = bisect_left(rows, (since + 1,)), bisect_left(rows, (until + 1,))
+        for _, _, doc in rows[start:min(end, start + limit)]:
+            yield clone(doc)
+
+
+class MemorySettingRepository:
+    def __init__(self):
+        self.values: Dict[str, object] = {}
+
+    async def get_or_create(self, key: str, value):
+        return self.values.setdefault(key, value)
+
+
+class MemoryUserRepository:
+    """Users by id, with unique email and slug lookups."""
+
+    def __init__(self):
+        self.docs: Dict[str, dict] = {}
+        self.by_email: Dict[str, str] = {}
+        self.by_slug: Dict[str, str] = {}
+
+    def _find(self, index: Dict[str, str], key: str, projection: dict) -> Optional[dict]:
+        user_id = index.get(key)
+        return project(self.docs[user_id], projection) if user_id is not None else None
+
+    async def insert(self, doc: dict) -> None:
+        for field, index in (("id", self.docs), ("email", self.by_email), ("unique_slug", self.by_slug)):
+            if doc[field] in index:
+                raise DuplicateKeyError(f"duplicate key: users.{field} {doc[field]}")
+        self.docs[doc["id"]] = clone(doc)
+        self.by_email[doc["email"]] = doc["id"]
+        self.by_slug[doc["unique_slug"]] = doc["id"]
+
+    async def get(self, user_id: str, projection: dict) -> Optional[dict]:
+        doc = self.docs.get(user_id)
+        return project(doc, projection) if doc is not None else None
+
+    async def get_by_email(self, email: str, projection: dict) -> Optional[dict]:
+        return self._find(self.by_email, email, projection)
+
+    async def get_by_slug(self, slug: str, projection: dict) -> Optional[dict]:
+        return self._find(self.by_slug, slug, projection)
+
+    async def find_by_slugs(self, slugs: List[str], projection: dict) -> List[dict]:
+        return [self._find(self.by_slug, slug, projection) for slug in dict.fromkeys(slugs) if slug in self.by_slug]
+
+    async def find_by_ids(self, user_ids: List[str], projection: dict) -> List[dict]:
+        return [project(self.docs[user_id], projection) for user_id in dict.fromkeys(user_ids) if user_id in self.docs]
+
+    async def estimated_count(self) -> int:
+        return len(self.docs)
+
+    async def created_since(self, since: Optional[str], projection: dict, batch_size: int) -> AsyncIterator[dict]:
+        for doc in list(self.docs.values()):
+            if since is None or doc["created_at"] >= since:
+                yield project(doc, projection)
+
+    async def replace_password_hash(self, user_id: str, old_hash: str, new_hash: str) -> None:
+        doc = self.docs.get(user_id)
+        if doc is not None and doc.get("password_hash") == old_hash:
+            doc["password_hash"] = new_hash
+
+    async def bump_content_version(self, user_id: str, updated_at: str, release_seq: Optional[int] = None) -> None:
+        doc = self.docs.get(user_id)
+        if doc is None:
+            return
+        doc["content_version"] = doc.get("content_version", 0) + 1
+        if doc.get("content_updated_at") is None or doc["content_updated_at"] < updated_at:
+            doc["content_updated_at"] = updated_at
+        if release_seq is not None:
+            await self.release_change_seq(user_id, release_seq)
+
+    async def init_content_version(self, user_id: str, updated_at: str) -> None:
+        doc = self.docs.get(user_id)
+        if doc is not None and "content_version" not in doc:
+            doc["content_version"] = 0
+            doc["content_updated_at"] = updated_at
+
+    async def reserve_change_seqs(self, user_id: str, count: int, at: str,
+                                  stale_before: Optional[str] = None) -> Optional[int]:
+        doc = self.docs.get(user_id)
+        if doc is None:
+            return None
+        first = doc.get("change_seq", 0) + 1
+        doc["change_seq"] = first + count - 1
+        pending = doc.get("changes_pending", [])
+        if stale_before is not None:
+            pending = [p for p in pending if p["at"] >= stale_before]
+        doc["changes_pending"] = [*pending, {"seq": first, "at": at}]
+        return first
+
+    async def release_change_seq(self, user_id: str, seq: int) -> None:
+        doc = self.docs.get(user_id)
+        if doc is not None and "changes_pending" in doc:
+            doc["changes_pending"] = [p for p in doc["changes_pending"] if p["seq"] != seq]
+
+
+class MemoryStorage:
+    def __init__(self):
+        self.users = MemoryUserRepository()
+        self.projects = MemoryItemRepository("projects")
+        self.achievements = MemoryItemRepository("achievements")
+        self.tombstones = MemoryTombstoneRepository()
+        self.settings = MemorySettingRepository()
+        self.public_reads = self
+
+    def __getitem__(self, collection: str):
+        return {"projects": self.projects, "achievements": self.achievements}[collection]
+
+    async def ping(self) -> None:
+        pass
+
+    async def load_user_with_items(self, slug: str, projection: dict, joins: Dict[str, ItemQuery]) -> Optional[dict]:
+        user_id = self.users.by_slug.get(slug)
+        if user_id is None:
+            return None
+        user = project(self.users.docs[user_id], projection)
+        for collection, query in joins.items():
+            user[collection] = await self[collection].list_for_user(user_id, query)
+        return user
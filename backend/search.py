@@ -0,0 +1,289 @@
+"""
+In-process inverted index over projects for /api/search.
+
+Projects are tokenized per field (title, tech_stack, description,
+readme_content) and scored with BM25, with field weights folded into the
+term frequencies. tech_stack values are also normalized into tags
+("Node.js", "node" -> "nodejs") so they can be used as exact filters.
+
+The index is kept current by the project write paths (`add` / `remove`)
+and rebuilt from Mongo on startup; queries never touch the database.
+Writes handled by other workers arrive through periodic syncs: projects
+updated and tombstones left since `sync_since()` (the start of the last
+rebuild or sync, minus an overlap for clock skew between workers) are
+applied with the same `add` / `remove`, and `synced` moves the watermark.
+"""
+import heapq
+import math
+import re
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+[+#]*")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were with".split()
+)
+
+# Weighted term frequency per field: a title hit counts as three body hits
+FIELD_WEIGHTS = {"title": 3.0, "tech_stack": 2.0, "description": 1.5, "readme_content": 1.0}
+
+TECH_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "node": "nodejs",
+    "react.js": "react",
+    "reactjs": "react",
+    "vue.js": "vue",
+    "vuejs": "vue",
+    "next.js": "nextjs",
+    "golang": "go",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "py": "python",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def normalize_tech(tag: str) -> str:
+    tag = " ".join(tag.lower().split())
+    tag = TECH_ALIASES.get(tag, tag)
+    if tag.endswith(".js"):
+        tag = tag[:-3] + "js"
+    return TECH_ALIASES.get(tag, tag)
+
+
+class IndexedProject:
+    __slots__ = ("id", "user_id", "title", "description", "tech_stack", "created_at",
+                 "version", "tags", "terms", "length")
+
+    def __init__(self, project: dict):
+        self.id = project["id"]
+        self.user_id = project["user_id"]
+        self.title = project.get("title") or ""
+        self.description = project.get("description") or ""
+        self.tech_stack = list(project.get("tech_stack") or [])
+        self.created_at = project.get("created_at") or ""
+        self.version = project.get("version", 0)
+        self.tags = {normalize_tech(tag) for tag in self.tech_stack if tag.strip()}
+
+        terms: Dict[str, float] = {}
+        length = 0.0
+        fields = {
+            "title": self.title,
+            "tech_stack": " ".join(self.tech_stack + sorted(self.tags)),
+            "description": self.description,
+            "readme_content": project.get("readme_content") or "",
+        }
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            counts = Counter(tokenize(text))
+            for token, n in counts.items():
+                terms[token] = terms.get(token, 0.0) + weight * n
+            length += weight * sum(counts.values())
+        self.terms = terms
+        self.length = length
+
+    def summary(self, score: float) -> dict:
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "title": self.title,
+            "description": self.description,
+            "tech_stack": self.tech_stack,
+            "created_at": self.created_at,
+            "score": round(score, 4),
+        }
+
+
+class SearchIndex:
+    """
+    BM25 inverted index: term -> {project id: weighted tf}, plus tag -> {project ids}.
+    Single event loop only; every method is synchronous and cheap enough to call inline.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, sync_overlap_seconds: float = 30.0):
+        self.k1 = k1
+        self.b = b
+        self.sync_overlap = timedelta(seconds=sync_overlap_seconds)
+        self.docs: Dict[str, IndexedProject] = {}
+        self.lengths: Dict[str, float] = {}
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.tag_postings: Dict[str, Set[str]] = {}
+        self.total_length = 0.0
+        self.ready = False
+        self.rebuilding = False
+        self.removed_during_rebuild: Set[str] = set()
+        self.last_rebuild: Optional[dict] = None
+        self.watermark: Optional[str] = None  # when the last rebuild or sync started reading
+        self.last_sync: Optional[dict] = None
+        self.queries = 0
+
+    def add(self, project: dict) -> None:
+        """Index a project, replacing any older version of it."""
+        current = self.docs.get(project["id"])
+        if current is not None:
+            if current.version > project.get("version", 0):
+                return
+            self._unlink(current)
+        doc = IndexedProject(project)
+        self.docs[doc.id] = doc
+        self.lengths[doc.id] = doc.length
+        self.total_length += doc.length
+        for term, tf in doc.terms.items():
+            self.postings.setdefault(term, {})[doc.id] = tf
+        for tag in doc.tags:
+            self.tag_postings.setdefault(tag, set()).add(doc.id)
+
+    def remove(self, project_id: str) -> None:
+        if self.rebuilding:
+            # Keep a rebuild that already read this project from bringing it back
+            self.removed_during_rebuild.add(project_id)
+        doc = self.docs.pop(project_id, None)
+        if doc is not None:
+            del self.lengths[project_id]
+            self._unlink(doc)
+
+    def _unlink(self, doc: IndexedProject) -> None:
+        self.total_length -= doc.length
+        for term in doc.terms:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc.id, None)
+                if not posting:
+                    del self.postings[term]
+        for tag in doc.tags:
+            ids = self.tag_postings.get(tag)
+            if ids is not None:
+                ids.discard(doc.id)
+                if not ids:
+                    del self.tag_postings[tag]
+
+    def clear(self) -> None:
+        self.docs.clear()
+        self.lengths.clear()
+        self.postings.clear()
+        self.tag_postings.clear()
+        self.total_length = 0.0
+
+    async def rebuild(self, projects) -> dict:
+        """
+        Re-index from an async iterable of project documents (a Motor cursor).
+        Writes that land while the rebuild runs keep going through add/remove; `add`
+        ignores older versions and deleted ids are remembered until the rebuild ends.
+        """
+        started = time.perf_counter()
+        started_at = datetime.now(timezone.utc).isoformat()
+        self.rebuilding = True
+        self.removed_during_rebuild.clear()
+        loaded = 0
+        try:
+            async for project in projects:
+                if project["id"] not in self.removed_during_rebuild:
+                    self.add(project)
+                    loaded += 1
+        finally:
+            self.rebuilding = False
+            self.removed_during_rebuild.clear()
+        self.ready = True
+        self.watermark = started_at
+        self.last_rebuild = {
+            "projects": loaded,
+            "seconds": round(time.perf_counter() - started, 3),
+            "finished_at": time.time(),
+        }
+        return self.last_rebuild
+
+    def sync_since(self) -> Optional[str]:
+        """updated_at / deleted_at to read changes from, or None before the first rebuild."""
+        if self.watermark is None:
+            return None
+        return (datetime.fromisoformat(self.watermark) - self.sync_overlap).isoformat()
+
+    def synced(self, started_at: str, updated: int, removed: int, seconds: float) -> None:
+        """Record a sync that began reading at `started_at` and applied its changes."""
+        self.watermark = started_at
+        self.last_sync = {
+            "updated": updated,
+            "removed": removed,
+            "seconds": round(seconds, 4),
+            "finished_at": time.time(),
+        }
+
+    def search(self, query: str = "", tech: Iterable[str] = (), limit: int = 20,
+               offset: int = 0) -> Tuple[int, List[dict]]:
+        """
+        Return (total matches, one page of hits). Every query term is optional (OR, ranked by
+        BM25); every tech tag is required. Tag-only searches list newest projects first.
+        """
+        self.queries += 1
+        terms = list(dict.fromkeys(tokenize(query)))
+        tags = {normalize_tech(tag) for tag in tech if tag.strip()}
+
+        allowed: Optional[Set[str]] = None
+        if tags:
+            tag_sets = sorted((self.tag_postings.get(tag, set()) for tag in tags), key=len)
+            allowed = set(tag_sets[0]).intersection(*tag_sets[1:])
+            if not allowed:
+                return 0, []
+
+        wanted = offset + limit
+        if not terms:
+            if allowed is None:
+                return 0, []
+            newest = heapq.nlargest(wanted, allowed, key=lambda i: (self.docs[i].created_at, i))
+            return len(allowed), [self.docs[i].summary(0.0) for i in newest[offset:]]
+
+        scores = self._score(terms, allowed)
+        top = heapq.nlargest(wanted, scores, key=scores.__getitem__)
+        return len(scores), [self.docs[doc_id].summary(scores[doc_id]) for doc_id in top[offset:]]
+
+    def _score(self, terms: List[str], allowed: Optional[Set[str]]) -> Dict[str, float]:
+        count = len(self.docs)
+        avg_length = self.total_length / count if count else 0.0
+        k1 = self.k1
+        # tf + k1 * (1 - b + b * length / avg_length), split into a constant and a per-length part
+        base = k1 * (1 - self.b)
+        per_length = k1 * self.b / avg_length if avg_length else 0.0
+        lengths = self.lengths
+        scores: Dict[str, float] = {}
+        for term in terms:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+            boost = idf * (k1 + 1)
+            if allowed is not None and len(allowed) < len(posting):
+                # Filtered to fewer projects than the term has: walk the filter instead
+                matches = ((doc_id, posting[doc_id]) for doc_id in allowed if doc_id in posting)
+            elif allowed is not None:
+                matches = ((doc_id, tf) for doc_id, tf in posting.items() if doc_id in allowed)
+            else:
+                matches = posting.items()
+            term_scores = {
+                doc_id: boost * tf / (tf + base + per_length * lengths[doc_id]) for doc_id, tf in matches
+            }
+            # Fold the smaller score map into the larger one
+            if len(term_scores) > len(scores):
+                scores, term_scores = term_scores, scores
+            for doc_id, score in term_scores.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+        return scores
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "rebuilding": self.rebuilding,
+            "projects": len(self.docs),
+            "terms": len(self.postings),
+            "tech_tags": len(self.tag_postings),
+            "queries": self.queries,
+            "last_rebuild": self.last_rebuild,
+            "last_sync": self.last_sync,
+        }
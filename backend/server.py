@@ -1,40 +1,257 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Query, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, ValidationError
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Literal, Optional, Union
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
+import base64
 import hashlib
+import json
+import random
+import time
+from email.utils import format_datetime, parsedate_to_datetime
+import anyio
 import jwt
 import secrets
 
+try:
+    import orjson
+except ImportError:  # optional: responses fall back to the stdlib encoder
+    orjson = None
+
+from cache import SingleFlight, TTLCache, VersionedLRUCache
+from compression import Compressor, base_etag, negotiate_encoding, representation_etag
+from facets import TechFacets
+from indexes import ensure_indexes, log_index_report
+from instrumentation import METRIC_FAMILIES, CommandTimer, PoolTimer, RequestMetricsMiddleware
+from metrics import CounterFamily, HistogramFamily, render_prometheus
+from passwords import HasherBusy, PasswordHasher
+from repositories import (
+    BulkDelete, BulkInsert, BulkUpdate, ItemQuery, MemoryStorage, MotorStorage, make_read_preference
+)
+from profiling import (
+    PROFILE_MODES, ProfileRule, ProfilingMiddleware, RequestProfiler, profile_formats, render_profile
+)
+from ratelimit import RateLimit, RateLimiter, parse_limits
+from search import SearchIndex
+from slugs import SlugFilter
+from startup import Warmup
+from textexport import chunk_blocks, estimate_tokens, render_document
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Storage engine (see repositories.py): 'mongo' (Motor) or 'memory' (in-process dicts, not durable;
+# for benchmarks and tests of the HTTP layer without a database)
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo').lower()
+
+# Connection pool, timeouts and wire compression (e.g. MONGO_COMPRESSORS=zstd,snappy,zlib);
+# options left unset keep the driver default or whatever MONGO_URL specifies
+MONGO_CLIENT_OPTIONS = {
+    option: cast(os.environ[name])
+    for option, name, cast in (
+        ("minPoolSize", "MONGO_MIN_POOL_SIZE", int),
+        ("maxPoolSize", "MONGO_MAX_POOL_SIZE", int),
+        ("maxConnecting", "MONGO_MAX_CONNECTING", int),
+        ("maxIdleTimeMS", "MONGO_MAX_IDLE_TIME_MS", int),
+        ("waitQueueTimeoutMS", "MONGO_WAIT_QUEUE_TIMEOUT_MS", int),
+        ("serverSelectionTimeoutMS", "MONGO_SERVER_SELECTION_TIMEOUT_MS", int),
+        ("connectTimeoutMS", "MONGO_CONNECT_TIMEOUT_MS", int),
+        ("socketTimeoutMS", "MONGO_SOCKET_TIMEOUT_MS", int),
+        ("compressors", "MONGO_COMPRESSORS", str),
+        ("zlibCompressionLevel", "MONGO_ZLIB_COMPRESSION_LEVEL", int),
+    )
+    if os.environ.get(name)
+}
+
+# Read preference for the public profile/export reads; authenticated reads and all writes stay
+# on the primary. Max staleness (seconds, at least 90; -1 = no limit) keeps lagging secondaries out
+PUBLIC_READ_PREFERENCE = make_read_preference(
+    os.environ.get('PUBLIC_READ_PREFERENCE', 'secondaryPreferred'),
+    int(os.environ.get('PUBLIC_READ_MAX_STALENESS_SECONDS', '-1'))
+)
+
+# Created on startup by open_storage(), not at import: importing this module does no I/O, and a
+# process that forks workers after import never shares a Motor client across the fork
+client: Optional[AsyncIOMotorClient] = None
+db = None
+storage: Optional[Union[MotorStorage, MemoryStorage]] = None
 
-# JWT Configuration
-JWT_SECRET = os.environ.get('JWT_SECRET', secrets.token_hex(32))
+# Startup warm-up (see startup.py): 'background' serves liveness at once and reports ready when the
+# warm-up finishes; 'blocking' finishes it before the worker accepts connections
+STARTUP_WARMUP = os.environ.get('STARTUP_WARMUP', 'background').lower()
+warmup = Warmup(
+    retry_initial_seconds=float(os.environ.get('WARMUP_RETRY_INITIAL_SECONDS', '0.5')),
+    retry_max_seconds=float(os.environ.get('WARMUP_RETRY_MAX_SECONDS', '30'))
+)
+
+# JWT Configuration. Without JWT_SECRET a random secret is generated once and kept in the settings
+# collection during warm-up, so every worker signs and verifies tokens with the same key
+JWT_SECRET = os.environ.get('JWT_SECRET') or None
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
 
+# Authenticated-user cache: user id (JWT sub) -> user document, shared by concurrent lookups
+AUTH_USER_CACHE_MAX_ENTRIES = int(os.environ.get('AUTH_USER_CACHE_MAX_ENTRIES', '10000'))
+AUTH_USER_CACHE_TTL_SECONDS = float(os.environ.get('AUTH_USER_CACHE_TTL_SECONDS', '30'))
+auth_user_cache = TTLCache(
+    max_entries=AUTH_USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=AUTH_USER_CACHE_TTL_SECONDS
+)
+auth_user_lookups = SingleFlight()
+
+# Password hashing (scrypt cost, worker pool and backpressure)
+password_hasher = PasswordHasher(
+    n=int(os.environ.get('PASSWORD_SCRYPT_N', str(2 ** 14))),
+    r=int(os.environ.get('PASSWORD_SCRYPT_R', '8')),
+    p=int(os.environ.get('PASSWORD_SCRYPT_P', '1')),
+    workers=int(os.environ.get('PASSWORD_HASH_WORKERS', '4')),
+    max_concurrency=int(os.environ.get('PASSWORD_HASH_MAX_CONCURRENCY', '16')),
+    queue_timeout=float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT', '5'))
+)
+
+# Keyset pagination
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '100'))
+
+# Upper bound on operations in one /projects/bulk or /achievements/bulk request
+BULK_MAX_OPERATIONS = int(os.environ.get('BULK_MAX_OPERATIONS', '500'))
+
+# Index bootstrap on startup: 'apply' builds missing indexes, 'check' only reports them, 'off' skips
+INDEX_BOOTSTRAP = os.environ.get('INDEX_BOOTSTRAP', 'apply').lower()
+
+# How public profile/export reads hit Mongo: 'sequential' (user, then projects, then achievements),
+# 'aggregate' (one $lookup pipeline) or 'ab' (pick one at random per request to compare them)
+PROFILE_QUERY_MODE = os.environ.get('PROFILE_QUERY_MODE', 'sequential').lower()
+profile_query_latency = HistogramFamily(
+    "profile_query_seconds", ("endpoint", "path"), help="Public profile/export read time by query path"
+)
+
+# Requests taking at least this long are logged with their DB op breakdown (0 disables)
+SLOW_REQUEST_SECONDS = float(os.environ.get('SLOW_REQUEST_SECONDS', '1.0'))
+
+# Optional bearer token for /api/metrics (Prometheus `authorization` scrape config) and the operational
+# stats endpoints; unset leaves them open
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# On-demand request profiling: the /admin/profiling endpoints only exist when PROFILING_ADMIN_TOKEN
+# is set; PROFILING_ROUTE (with optional PROFILING_SLUG / PROFILING_MODE) arms a rule at startup
+PROFILING_ADMIN_TOKEN = os.environ.get('PROFILING_ADMIN_TOKEN', '')
+PROFILING_MAX_PROFILES = int(os.environ.get('PROFILING_MAX_PROFILES', '20'))
+request_profiler = RequestProfiler(max_profiles=PROFILING_MAX_PROFILES)
+
+# Streaming export formats read from the Motor cursor in batches of this size
+EXPORT_STREAM_BATCH_SIZE = int(os.environ.get('EXPORT_STREAM_BATCH_SIZE', '50'))
+
+# Upper bound on slugs in one POST /export/batch request
+BATCH_EXPORT_MAX_SLUGS = int(os.environ.get('BATCH_EXPORT_MAX_SLUGS', '200'))
+
+# Change feed: a reserved change number older than this is treated as abandoned (crashed writer)
+CHANGE_FEED_SETTLE_SECONDS = float(os.environ.get('CHANGE_FEED_SETTLE_SECONDS', '30'))
+
+# Markdown / plain-text exports: upper bound for max_tokens and chunk_tokens
+EXPORT_MAX_TOKENS = int(os.environ.get('EXPORT_MAX_TOKENS', '200000'))
+
+# Response compression for the public endpoints (gzip, plus brotli when installed)
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+compressor = Compressor(
+    gzip_level=int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6')),
+    brotli_quality=int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '5'))
+)
+
+# Project search index, rebuilt from Mongo on startup: 'background' (serve while it loads),
+# 'blocking' (finish before serving) or 'off'
+SEARCH_INDEX_REBUILD = os.environ.get('SEARCH_INDEX_REBUILD', 'background').lower()
+SEARCH_MAX_OFFSET = int(os.environ.get('SEARCH_MAX_OFFSET', '1000'))
+# Projects written or deleted through other workers are picked up every SEARCH_INDEX_SYNC_SECONDS
+# (0 = never; only safe with a single worker)
+SEARCH_INDEX_SYNC_SECONDS = float(os.environ.get('SEARCH_INDEX_SYNC_SECONDS', '5'))
+search_index = SearchIndex()
+
+# Tech-stack counters are kept incrementally and recounted from Mongo at startup and then
+# every TECH_FACETS_RECONCILE_SECONDS (0 = startup only)
+TECH_FACETS_RECONCILE_SECONDS = float(os.environ.get('TECH_FACETS_RECONCILE_SECONDS', '900'))
+tech_facets = TechFacets()
+
+# Bloom filter of known slugs so unknown ones 404 without a database query (see slugs.py): loaded
+# during warm-up, then new users from other workers are picked up every SLUG_FILTER_SYNC_SECONDS
+SLUG_FILTER = os.environ.get('SLUG_FILTER', 'on').lower()
+SLUG_FILTER_SYNC_SECONDS = float(os.environ.get('SLUG_FILTER_SYNC_SECONDS', '5'))
+slug_filter = SlugFilter(
+    capacity=int(os.environ.get('SLUG_FILTER_CAPACITY', '1000000')),
+    fp_rate=float(os.environ.get('SLUG_FILTER_FP_RATE', '0.01'))
+)
+# A slug the filter rejects may have been registered on another worker since the last sync: up to
+# SLUG_FILTER_MISS_LOOKUPS rejections per second are checked against the database before the 404
+SLUG_FILTER_MISS_LOOKUPS = float(os.environ.get('SLUG_FILTER_MISS_LOOKUPS', '20'))
+slug_miss_lookups = RateLimiter(
+    {"slug_miss": RateLimit(SLUG_FILTER_MISS_LOOKUPS, max(1.0, SLUG_FILTER_MISS_LOOKUPS))}
+    if SLUG_FILTER_MISS_LOOKUPS > 0 else {}
+)
+
+# Per-client token buckets for the public endpoints (see ratelimit.py): RATE_LIMITS is
+# "name=rate per second/burst,..." ('' disables); clients sending one of RATE_LIMIT_API_KEYS in
+# X-API-Key are limited per key at RATE_LIMIT_API_KEY_FACTOR times the rate, others per IP
+RATE_LIMITS = os.environ.get('RATE_LIMITS', 'profile=20/60,export=10/30,export_batch=1/5')
+rate_limiter = RateLimiter(
+    parse_limits(RATE_LIMITS),
+    api_keys=filter(None, (k.strip() for k in os.environ.get('RATE_LIMIT_API_KEYS', '').split(','))),
+    api_key_factor=float(os.environ.get('RATE_LIMIT_API_KEY_FACTOR', '10')),
+    max_clients=int(os.environ.get('RATE_LIMIT_MAX_CLIENTS', '100000'))
+)
+rate_limited_requests = CounterFamily(
+    "http_rate_limited_requests_total", ("limit", "client"), help="Requests refused with 429 by limit and client type"
+)
+
+# Identical concurrent public profile / export cache misses share one database read ('on' / 'off')
+PUBLIC_COALESCING = os.environ.get('PUBLIC_COALESCING', 'on').lower()
+public_flights = SingleFlight()
+coalesced_requests = CounterFamily(
+    "public_coalesced_requests_total", ("endpoint",),
+    help="Public requests served by joining an identical one in flight"
+)
+
+# Public profile / export response cache
+PROFILE_CACHE_MAX_ENTRIES = int(os.environ.get('PROFILE_CACHE_MAX_ENTRIES', '1024'))
+PROFILE_CACHE_TTL_SECONDS = float(os.environ.get('PROFILE_CACHE_TTL_SECONDS', '300'))
+# Public responses read from a secondary within this long of a local write to the portfolio
+# are served but not cached, so replication lag cannot pin pre-write content in the cache
+PROFILE_CACHE_SETTLE_SECONDS = float(os.environ.get('PROFILE_CACHE_SETTLE_SECONDS', '10'))
+profile_cache = VersionedLRUCache(
+    max_entries=PROFILE_CACHE_MAX_ENTRIES,
+    ttl_seconds=PROFILE_CACHE_TTL_SECONDS
+)
+
+# JSON rendering: FAST_JSON uses orjson (when installed) for every response; TRUSTED_OUTPUT lets
+# the authenticated project/achievement list routes hand their own projected documents straight
+# to the encoder, skipping response_model re-validation and jsonable_encoder (public reads are
+# already rendered once and cached, see public_entry)
+FAST_JSON = os.environ.get('FAST_JSON', 'true').lower() in ('1', 'true', 'yes') and orjson is not None
+TRUSTED_OUTPUT = os.environ.get('TRUSTED_OUTPUT', 'false').lower() in ('1', 'true', 'yes')
+FastJSONResponse = ORJSONResponse if FAST_JSON else JSONResponse
+
 # Create the main app
-app = FastAPI(title="DevFolio API", description="AI-Readable Portfolio Platform")
+app = FastAPI(
+    title="DevFolio API",
+    description="AI-Readable Portfolio Platform",
+    default_response_class=FastJSONResponse
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
 # Security
 security = HTTPBearer()
+metrics_security = HTTPBearer(auto_error=False)
 
 # ============ MODELS ============
 
@@ -87,6 +304,7 @@ class ProjectResponse(ProjectBase):
     user_id: str
     created_at: str
     updated_at: str
+    version: int = 0
 
 class AchievementBase(BaseModel):
     title: str
@@ -108,6 +326,65 @@ class AchievementResponse(AchievementBase):
     id: str
     user_id: str
     created_at: str
+    updated_at: Optional[str] = None
+    version: int = 0
+
+class ProjectPage(BaseModel):
+    items: List[ProjectResponse]
+    next_cursor: Optional[str] = None
+
+class AchievementPage(BaseModel):
+    items: List[AchievementResponse]
+    next_cursor: Optional[str] = None
+
+class BulkOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[str] = None
+    data: Optional[dict] = None
+    version: Optional[int] = None
+
+class BulkRequest(BaseModel):
+    operations: List[BulkOperation] = Field(..., min_length=1, max_length=BULK_MAX_OPERATIONS)
+    ordered: bool = True
+
+class BulkItemResult(BaseModel):
+    index: int
+    op: str
+    id: Optional[str] = None
+    status: str
+    version: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkResponse(BaseModel):
+    ordered: bool
+    created: int
+    updated: int
+    deleted: int
+    failed: int
+    skipped: int
+    results: List[BulkItemResult]
+
+class SearchOwner(BaseModel):
+    name: str
+    unique_slug: str
+
+class SearchHit(BaseModel):
+    id: str
+    title: str
+    description: str
+    tech_stack: List[str]
+    created_at: str
+    score: float
+    owner: Optional[SearchOwner] = None
+
+class SearchResponse(BaseModel):
+    query: str
+    tech: List[str]
+    total: int
+    offset: int
+    limit: int
+    index_ready: bool
+    results: List[SearchHit]
 
 class PublicProfileResponse(BaseModel):
     name: str
@@ -115,6 +392,18 @@ class PublicProfileResponse(BaseModel):
     achievements: Optional[List[AchievementResponse]] = None
     export_url: str
 
+class ProfilingRuleRequest(BaseModel):
+    route: str  # route template, e.g. "/api/export/{slug}"
+    method: Optional[str] = None
+    slug: Optional[str] = None
+    mode: Literal["cprofile", "sample"] = "cprofile"
+    interval_ms: float = Field(5.0, ge=0.5, le=1000)
+    limit: Optional[int] = Field(None, ge=1)  # disarm after this many captures
+
+class BatchExportRequest(BaseModel):
+    slugs: List[str] = Field(..., min_length=1, max_length=BATCH_EXPORT_MAX_SLUGS)
+    sections: str = "all"
+
 class AIExportResponse(BaseModel):
     user: dict
     projects: Optional[List[dict]] = None
@@ -123,11 +412,23 @@ class AIExportResponse(BaseModel):
 
 # ============ HELPERS ============
 
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+async def hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except HasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
+async def verify_password(password: str, hashed: str) -> bool:
+    try:
+        return await password_hasher.verify(password, hashed)
+    except HasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
 
-def verify_password(password: str, hashed: str) -> bool:
-    return hash_password(password) == hashed
+def signing_secret() -> str:
+    # Only unset while a worker without JWT_SECRET has not finished its warm-up
+    if JWT_SECRET is None:
+        raise HTTPException(status_code=503, detail="Service warming up, please retry", headers={"Retry-After": "1"})
+    return JWT_SECRET
 
 def create_token(user_id: str) -> str:
     expiration = datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
@@ -136,22 +437,432 @@ def create_token(user_id: str) -> str:
         "exp": expiration,
         "iat": datetime.now(timezone.utc)
     }
-    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return jwt.encode(payload, signing_secret(), algorithm=JWT_ALGORITHM)
+
+async def invalidate_user_content(user_id: str, change_seq: Optional[int] = None) -> None:
+    """
+    Call after any write to a user's projects or achievements.
+    Bumps the persisted content version used for ETags and drops cached responses; with
+    `change_seq` it also releases that change-feed reservation (see allocate_change_seqs).
+    """
+    await storage.users.bump_content_version(user_id, datetime.now(timezone.utc).isoformat(), change_seq)
+    profile_cache.bump(user_id)
+
+def change_settle_cutoff() -> str:
+    """Change-feed reservations made before this time are treated as abandoned."""
+    return (datetime.now(timezone.utc) - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)).isoformat()
+
+async def allocate_change_seqs(user_id: str, count: int = 1) -> int:
+    """
+    Reserve `count` consecutive change-feed numbers for a write and return the first.
+    Items are stamped with their number (change_seq) as they are written. Until the write
+    finishes, the reservation stays in the user's changes_pending list, and the change feed
+    never hands out a token past a number that has not landed yet. Reservations older than
+    CHANGE_FEED_SETTLE_SECONDS (their writer died before releasing them) are reclaimed here.
+    """
+    first = await storage.users.reserve_change_seqs(
+        user_id, count, datetime.now(timezone.utc).isoformat(), stale_before=change_settle_cutoff()
+    )
+    if first is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return first
+
+@asynccontextmanager
+async def recording_changes(user_id: str, count: int = 1):
+    """
+    Reserve change-feed numbers around a write. The reservation is released by
+    invalidate_user_content(user_id, seq) on success, or here if the write fails.
+    """
+    first = await allocate_change_seqs(user_id, count)
+    try:
+        yield first
+    except Exception:
+        await storage.users.release_change_seq(user_id, first)
+        raise
+
+async def record_tombstones(user_id: str, item_type: str, deletions: List[tuple]) -> None:
+    """Keep (item id, change number) records of deleted items so the change feed can report them."""
+    if not deletions:
+        return
+    now = datetime.now(timezone.utc).isoformat()
+    await storage.tombstones.insert_many([
+        {"user_id": user_id, "type": item_type, "item_id": item_id, "deleted_at": now, "change_seq": seq}
+        for item_id, seq in deletions
+    ])
 
 def generate_unique_slug(name: str) -> str:
     base_slug = name.lower().replace(" ", "-")
     unique_part = secrets.token_hex(4)
     return f"{base_slug}-{unique_part}"
 
+def item_etag(item: dict) -> str:
+    return f'"{item.get("version", 0)}"'
+
+def if_match_versions(request: Request) -> Optional[List[int]]:
+    """
+    Translate an If-Match header into the item versions it accepts.
+    Returns None when the header is absent or '*' (no precondition).
+    Items written before versioning have no version field and match "0".
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None or if_match.strip() == "*":
+        return None
+    versions = []
+    for tag in if_match.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag.isdigit():
+            versions.append(int(tag))
+    return versions
+
+async def update_owned_item(items, item_id: str, user_id: str, update_data: dict,
+                            request: Request, response: Response, label: str) -> dict:
+    """
+    Apply an owner-scoped update in a single write and return the post-image.
+    With If-Match the update only applies to the expected version: a mismatch is a 412.
+    """
+    versions = if_match_versions(request)
+    updated = await items.update(item_id, user_id, update_data, versions, ITEM_PROJECTION)
+    if not updated:
+        # Only reached on failure: tell a stale version apart from a missing item
+        if versions is not None and await items.exists(item_id, user_id):
+            raise HTTPException(status_code=412, detail=f"{label} was modified by another request")
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    
+    response.headers["ETag"] = item_etag(updated)
+    return updated
+
+class BulkItemError(Exception):
+    pass
+
+def plan_bulk_operation(operation: BulkOperation, user_id: str, existing: dict, create_model, update_model,
+                        now: str, change_seq: int) -> tuple:
+    """
+    Validate one bulk operation and turn it into a BulkInsert/BulkUpdate/BulkDelete.
+    Returns (request, result); raises BulkItemError or ValidationError for a bad item.
+    `existing` maps the user's targeted item ids to their current version.
+    """
+    if operation.op == "create":
+        item = create_model.model_validate(operation.data or {})
+        doc = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            **item.model_dump(),
+            "created_at": now,
+            "updated_at": now,
+            "version": 1,
+            "change_seq": change_seq,
+            "created_seq": change_seq
+        }
+        return BulkInsert(doc), {"id": doc["id"], "version": 1}
+    
+    if not operation.id:
+        raise BulkItemError("id is required")
+    if operation.id not in existing:
+        raise BulkItemError("not found")
+    versions = None
+    if operation.version is not None:
+        if existing[operation.id] != operation.version:
+            raise BulkItemError("version conflict")
+        versions = [operation.version]
+    
+    if operation.op == "delete":
+        return BulkDelete(operation.id, user_id, versions), {"id": operation.id}
+    
+    item = update_model.model_validate(operation.data or {})
+    update_data = {k: v for k, v in item.model_dump().items() if v is not None}
+    update_data["updated_at"] = now
+    update_data["change_seq"] = change_seq
+    return BulkUpdate(operation.id, user_id, versions, update_data), {"id": operation.id, "version": existing[operation.id] + 1}
+
+async def execute_bulk(items, bulk: BulkRequest, user_id: str, create_model, update_model) -> dict:
+    """
+    Validate every operation with the regular models and run the valid ones in one bulk write.
+    Ordered batches stop at the first failing item (later items are 'skipped'); unordered
+    batches run everything that validated and report failures per item. Each id may be
+    targeted only once per batch. An update or delete that finds its item gone or changed when
+    the write runs fails with 'not found' / 'version conflict'; as it was valid when planned,
+    it does not stop an ordered batch.
+    Operation i is recorded in the change feed as number first_seq + i.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    operations = bulk.operations
+    async with recording_changes(user_id, len(operations)) as first_seq:
+        return await run_bulk(items, bulk, user_id, create_model, update_model, now, first_seq)
+
+async def run_bulk(items, bulk: BulkRequest, user_id: str, create_model, update_model,
+                   now: str, first_seq: int) -> dict:
+    operations = bulk.operations
+    results: List[Optional[dict]] = [None] * len(operations)
+    
+    # One read resolves ownership and current versions for every targeted id
+    existing = {}
+    target_ids = [op.id for op in operations if op.op != "create" and op.id]
+    if target_ids:
+        existing = await items.versions(user_id, target_ids)
+    
+    requests, request_items, targeted = [], [], set()
+    for index, operation in enumerate(operations):
+        base = {"index": index, "op": operation.op, "id": operation.id}
+        try:
+            # Versions are checked against one read, so a second operation on an item would
+            # be planned against its version from before the first
+            if operation.op != "create" and operation.id:
+                if operation.id in targeted:
+                    raise BulkItemError("duplicate id in batch")
+                targeted.add(operation.id)
+            request, result = plan_bulk_operation(
+                operation, user_id, existing, create_model, update_model, now, first_seq + index
+            )
+        except BulkItemError as e:
+            results[index] = {**base, "status": "error", "error": str(e)}
+        except ValidationError as e:
+            detail = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            results[index] = {**base, "status": "error", "error": detail}
+        else:
+            requests.append(request)
+            request_items.append(index)
+            results[index] = {**base, **result, "status": "ok"}
+            continue
+        if bulk.ordered:
+            break
+    
+    if requests:
+        outcome = await items.bulk_write(requests, ordered=bulk.ordered)
+        # Updates/deletes that lost a race with another request since the versions were read
+        for request_index, message in [*outcome.unmatched.items(), *outcome.errors]:
+            index = request_items[request_index]
+            results[index] = {**results[index], "status": "error", "version": None, "error": message}
+        if bulk.ordered and outcome.errors:
+            # An ordered batch stops at its first write error
+            for index in request_items[outcome.errors[0][0] + 1:]:
+                results[index] = None
+    
+    summary = {"created": 0, "updated": 0, "deleted": 0, "failed": 0, "skipped": 0}
+    for index, result in enumerate(results):
+        if result is None:
+            results[index] = {"index": index, "op": operations[index].op, "id": operations[index].id, "status": "skipped"}
+            summary["skipped"] += 1
+        elif result["status"] == "error":
+            summary["failed"] += 1
+        else:
+            summary[{"create": "created", "update": "updated", "delete": "deleted"}[result["op"]]] += 1
+    
+    await record_tombstones(user_id, EXPORT_RECORD_TYPES[items.name][0], [
+        (r["id"], first_seq + r["index"]) for r in results if r["op"] == "delete" and r["status"] == "ok"
+    ])
+    
+    if summary["created"] or summary["updated"] or summary["deleted"]:
+        await invalidate_user_content(user_id, first_seq)
+    else:
+        await storage.users.release_change_seq(user_id, first_seq)
+    return {"ordered": bulk.ordered, **summary, "results": results}
+
+SEARCH_PROJECTION = {
+    "_id": 0, "id": 1, "user_id": 1, "title": 1, "description": 1, "readme_content": 1,
+    "tech_stack": 1, "created_at": 1, "version": 1
+}
+
+def index_project(project: dict) -> None:
+    """Feed a created or updated project to the in-memory search index and tech counters."""
+    search_index.add(project)
+    tech_facets.set_project(project)
+
+def unindex_project(project_id: str) -> None:
+    search_index.remove(project_id)
+    tech_facets.remove_project(project_id)
+
+async def reindex_projects(project_ids: List[str]) -> None:
+    """Re-read projects written without a full post-image (bulk writes) and index them."""
+    if not project_ids:
+        return
+    async for project in storage.projects.find_by_ids(project_ids, SEARCH_PROJECTION):
+        index_project(project)
+
+async def rebuild_search_index() -> None:
+    try:
+        report = await search_index.rebuild(storage.projects.scan(SEARCH_PROJECTION, batch_size=1000))
+    except Exception:
+        logger.exception("Search index rebuild failed")
+        return
+    logger.info("Search index rebuilt: %s projects in %ss", report["projects"], report["seconds"])
+
+async def sync_search_index() -> None:
+    """
+    Apply projects written and deleted through other workers (see SearchIndex.sync_since) to the
+    search index and tech counters. Updates are read before tombstones, so a project deleted
+    mid-pass is removed again; re-applying a project already indexed is a no-op.
+    """
+    while SEARCH_INDEX_REBUILD != "off" and SEARCH_INDEX_SYNC_SECONDS > 0:
+        await asyncio.sleep(SEARCH_INDEX_SYNC_SECONDS)
+        since = search_index.sync_since()
+        if since is None:
+            continue
+        try:
+            started, started_at = time.perf_counter(), datetime.now(timezone.utc).isoformat()
+            updated = removed = 0
+            async for project in storage.projects.updated_since(since, SEARCH_PROJECTION, 1000):
+                index_project(project)
+                updated += 1
+            async for tombstone in storage.tombstones.deleted_since("project", since, 1000):
+                unindex_project(tombstone["item_id"])
+                removed += 1
+            search_index.synced(started_at, updated, removed, time.perf_counter() - started)
+        except Exception:
+            logger.exception("Search index sync failed")
+
+TECH_FACET_PROJECTION = {"_id": 0, "id": 1, "user_id": 1, "tech_stack": 1, "version": 1}
+
+async def recount_tech_facets() -> None:
+    """Recount tech-stack facets from storage, logging any drift."""
+    try:
+        report = await tech_facets.reconcile(storage.projects.scan(TECH_FACET_PROJECTION, batch_size=1000))
+    except Exception:
+        logger.exception("Tech facet reconciliation failed")
+        return
+    if report["drifted_tags"]:
+        logger.warning("Tech facets had drifted on %s tags; recounted", report["drifted_tags"])
+
+async def reconcile_tech_facets() -> None:
+    """Recount every TECH_FACETS_RECONCILE_SECONDS; the first count is part of the warm-up."""
+    while TECH_FACETS_RECONCILE_SECONDS > 0:
+        await asyncio.sleep(TECH_FACETS_RECONCILE_SECONDS)
+        await recount_tech_facets()
+
+SLUG_FILTER_PROJECTION = {"_id": 0, "unique_slug": 1, "created_at": 1}
+
+async def rebuild_slug_filter() -> None:
+    if SLUG_FILTER == "off":
+        return
+    expected = await storage.users.estimated_count()
+    report = await slug_filter.rebuild(storage.users.created_since(None, SLUG_FILTER_PROJECTION, 5000), expected)
+    logger.info("Slug filter loaded: %s slugs in %ss", report["slugs"], report["seconds"])
+
+async def sync_slug_filter() -> None:
+    """Add slugs registered by other workers; rebuild larger once the filter is over capacity."""
+    while SLUG_FILTER != "off" and SLUG_FILTER_SYNC_SECONDS > 0:
+        await asyncio.sleep(SLUG_FILTER_SYNC_SECONDS)
+        if not slug_filter.ready:
+            continue
+        try:
+            if slug_filter.needs_resize:
+                await rebuild_slug_filter()
+            else:
+                users = storage.users.created_since(slug_filter.sync_since(), SLUG_FILTER_PROJECTION, 1000)
+                await slug_filter.sync(users)
+        except Exception:
+            logger.exception("Slug filter sync failed")
+
+def rate_limit(name: str):
+    """Dependency taking a token from the caller's `name` bucket, or refusing with 429 and Retry-After."""
+    async def take_token(request: Request, x_api_key: Optional[str] = Header(None)):
+        client, keyed = rate_limiter.client_key(request.client.host if request.client else None, x_api_key)
+        wait = rate_limiter.acquire(name, client, keyed)
+        if wait:
+            rate_limited_requests.labels(name, "api_key" if keyed else "ip").inc()
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded, retry later",
+                headers={"Retry-After": rate_limiter.retry_after(wait)}
+            )
+    return take_token
+
+async def coalesced(endpoint: str, cache_key: tuple, request: Request, build: Callable[[], Awaitable[Any]]):
+    """
+    Run `build` for a public cache miss, sharing one run between identical concurrent requests.
+    Conditional requests build on their own, since their result (a 304 or not) is per client.
+    """
+    if PUBLIC_COALESCING == "off" or is_conditional(request):
+        return await build()
+    if public_flights.running(cache_key):
+        coalesced_requests.labels(endpoint).inc()
+    return await public_flights.do(cache_key, build)
+
+def may_confirm_slug_miss() -> bool:
+    """Whether a slug the filter rejected may still be looked up (see SLUG_FILTER_MISS_LOOKUPS)."""
+    return SLUG_FILTER_MISS_LOOKUPS > 0 and not slug_miss_lookups.acquire("slug_miss", "worker")
+
+async def require_known_slug(slug: str) -> None:
+    """
+    404 for a slug the slug filter has never seen, without a database query once this
+    worker's miss lookup budget is spent.
+    """
+    if slug_filter.might_exist(slug):
+        return
+    if may_confirm_slug_miss() and await storage.users.get_by_slug(slug, {"_id": 0, "unique_slug": 1}):
+        slug_filter.recover(slug)
+        return
+    raise HTTPException(status_code=404, detail="Profile not found")
+
+def trusted(content):
+    """
+    Return `content` for FastAPI to validate and serialize as usual or, in TRUSTED_OUTPUT mode,
+    as an already rendered response. Only use this for data read through our own projections,
+    whose shape already matches the route's response model. The rendered response replaces
+    any injected Response, so headers set on one are dropped: it is only used by the
+    authenticated list routes, which set none.
+    """
+    if not TRUSTED_OUTPUT:
+        return content
+    return FastJSONResponse(content=content)
+
+# Projects/achievements as returned to their owner: change-feed bookkeeping stays internal
+ITEM_PROJECTION = {"_id": 0, "change_seq": 0, "created_seq": 0}
+
+def encode_cursor(position) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def is_position(value) -> bool:
+    return isinstance(value, list) and len(value) == 2 and all(isinstance(v, str) for v in value)
+
+async def fetch_page(items, user_id: str, limit: int, cursor: Optional[str]) -> dict:
+    after = None
+    if cursor:
+        after = decode_cursor(cursor)
+        if not is_position(after):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    # Fetch one extra item to learn whether another page exists
+    page = await items.list_for_user(user_id, ItemQuery(ITEM_PROJECTION, limit + 1, newest_first=True, after=after))
+    
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor([page[-1]["created_at"], page[-1]["id"]])
+    return {"items": page, "next_cursor": next_cursor}
+
+# Only what the authenticated routes read. None of these change after registration (user writes
+# only touch the password hash, content_version and change-feed fields), so cached copies never go
+# stale and expire by TTL alone; a route that edits them must drop the user's auth_user_cache entry
+AUTH_USER_FIELDS = {"_id": 0, "id": 1, "email": 1, "name": 1, "unique_slug": 1, "created_at": 1}
+
+async def load_auth_user(user_id: str) -> Optional[dict]:
+    user = auth_user_cache.get(user_id)
+    if user is not None:
+        return user
+    
+    user = await auth_user_lookups.do(
+        user_id,
+        lambda: storage.users.get(user_id, AUTH_USER_FIELDS)
+    )
+    if user:
+        auth_user_cache.set(user_id, user)
+    return user
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = jwt.decode(token, signing_secret(), algorithms=[JWT_ALGORITHM])
         user_id = payload.get("sub")
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token")
         
-        user = await db.users.find_one({"id": user_id}, {"_id": 0})
+        user = await load_auth_user(user_id)
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
         return user
@@ -165,7 +876,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 @api_router.post("/auth/register", response_model=TokenResponse)
 async def register(user_data: UserCreate):
     # Check if email exists
-    existing = await db.users.find_one({"email": user_data.email})
+    existing = await storage.users.get_by_email(user_data.email, {"_id": 0, "id": 1})
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
@@ -173,19 +884,23 @@ async def register(user_data: UserCreate):
     unique_slug = generate_unique_slug(user_data.name)
     
     # Ensure slug is unique
-    while await db.users.find_one({"unique_slug": unique_slug}):
+    while await storage.users.get_by_slug(unique_slug, {"_id": 0, "id": 1}):
         unique_slug = generate_unique_slug(user_data.name)
     
+    now = datetime.now(timezone.utc).isoformat()
     user_doc = {
         "id": user_id,
         "email": user_data.email,
         "name": user_data.name,
-        "password_hash": hash_password(user_data.password),
+        "password_hash": await hash_password(user_data.password),
         "unique_slug": unique_slug,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": now,
+        "content_version": 0,
+        "content_updated_at": now
     }
     
-    await db.users.insert_one(user_doc)
+    await storage.users.insert(user_doc)
+    slug_filter.add(unique_slug)
     
     token = create_token(user_id)
     user_response = UserResponse(
@@ -200,10 +915,18 @@ async def register(user_data: UserCreate):
 
 @api_router.post("/auth/login", response_model=TokenResponse)
 async def login(credentials: UserLogin):
-    user = await db.users.find_one({"email": credentials.email}, {"_id": 0})
-    if not user or not verify_password(credentials.password, user["password_hash"]):
+    user = await storage.users.get_by_email(credentials.email, {"_id": 0})
+    # Unknown emails are checked against a dummy hash so they cost as much as a wrong password
+    stored_hash = user["password_hash"] if user else password_hasher.dummy_hash
+    if not await verify_password(credentials.password, stored_hash) or not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
+    # Upgrade legacy SHA-256 hashes (or scrypt hashes with an outdated cost) while we have the password
+    if password_hasher.needs_rehash(user["password_hash"]):
+        await storage.users.replace_password_hash(
+            user["id"], user["password_hash"], await hash_password(credentials.password)
+        )
+    
     token = create_token(user["id"])
     user_response = UserResponse(
         id=user["id"],
@@ -232,58 +955,93 @@ async def create_project(project: ProjectCreate, current_user: dict = Depends(ge
     project_id = str(uuid.uuid4())
     now = datetime.now(timezone.utc).isoformat()
     
-    project_doc = {
-        "id": project_id,
-        "user_id": current_user["id"],
-        **project.model_dump(),
-        "created_at": now,
-        "updated_at": now
-    }
-    
-    await db.projects.insert_one(project_doc)
+    async with recording_changes(current_user["id"]) as change_seq:
+        project_doc = {
+            "id": project_id,
+            "user_id": current_user["id"],
+            **project.model_dump(),
+            "created_at": now,
+            "updated_at": now,
+            "version": 1,
+            "change_seq": change_seq,
+            "created_seq": change_seq
+        }
+        await storage.projects.insert(project_doc)
+    index_project(project_doc)
+    await invalidate_user_content(current_user["id"], change_seq)
     
-    return ProjectResponse(**{k: v for k, v in project_doc.items() if k != "_id"})
+    return ProjectResponse(**project_doc)
 
-@api_router.get("/projects", response_model=List[ProjectResponse])
-async def get_projects(current_user: dict = Depends(get_current_user)):
-    projects = await db.projects.find(
-        {"user_id": current_user["id"]}, 
-        {"_id": 0}
-    ).sort("created_at", -1).to_list(100)
-    return projects
+@api_router.post("/projects/bulk", response_model=BulkResponse)
+async def bulk_projects(bulk: BulkRequest, current_user: dict = Depends(get_current_user)):
+    """
+    Create, update and delete many projects in one request.
+    Each operation is {op: 'create'|'update'|'delete', id?, data?, version?}; data is validated
+    as ProjectCreate/ProjectUpdate and version works like If-Match on PUT.
+    """
+    result = await execute_bulk(storage.projects, bulk, current_user["id"], ProjectCreate, ProjectUpdate)
+    written = [r for r in result["results"] if r["status"] == "ok"]
+    for r in written:
+        if r["op"] == "delete":
+            unindex_project(r["id"])
+    await reindex_projects([r["id"] for r in written if r["op"] != "delete"])
+    return result
 
-@api_router.get("/projects/{project_id}", response_model=ProjectResponse)
-async def get_project(project_id: str, current_user: dict = Depends(get_current_user)):
-    project = await db.projects.find_one(
-        {"id": project_id, "user_id": current_user["id"]},
-        {"_id": 0}
+@api_router.get("/projects", response_model=Union[List[ProjectResponse], ProjectPage])
+async def get_projects(
+    current_user: dict = Depends(get_current_user),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """
+    Without `limit`/`cursor` this returns a plain list (first 100) as before.
+    With either, it returns {items, next_cursor}; pass next_cursor back to get the next page.
+    """
+    if limit is not None or cursor is not None:
+        return trusted(await fetch_page(storage.projects, current_user["id"], limit or MAX_PAGE_SIZE, cursor))
+    
+    projects = await storage.projects.list_for_user(
+        current_user["id"], ItemQuery(ITEM_PROJECTION, 100, newest_first=True)
     )
+    return trusted(projects)
+
+@api_router.get("/projects/{project_id}", response_model=ProjectResponse)
+async def get_project(project_id: str, response: Response, current_user: dict = Depends(get_current_user)):
+    project = await storage.projects.get(project_id, current_user["id"], ITEM_PROJECTION)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    response.headers["ETag"] = item_etag(project)
     return project
 
 @api_router.put("/projects/{project_id}", response_model=ProjectResponse)
-async def update_project(project_id: str, project_update: ProjectUpdate, current_user: dict = Depends(get_current_user)):
-    existing = await db.projects.find_one({"id": project_id, "user_id": current_user["id"]})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
+async def update_project(
+    project_id: str,
+    project_update: ProjectUpdate,
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    """Send If-Match with the project's ETag (its version) to get a 412 instead of overwriting a newer edit."""
     update_data = {k: v for k, v in project_update.model_dump().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.projects.update_one(
-        {"id": project_id},
-        {"$set": update_data}
-    )
-    
-    updated = await db.projects.find_one({"id": project_id}, {"_id": 0})
+    async with recording_changes(current_user["id"]) as change_seq:
+        updated = await update_owned_item(
+            storage.projects, project_id, current_user["id"], {**update_data, "change_seq": change_seq},
+            request, response, "Project"
+        )
+    index_project(updated)
+    await invalidate_user_content(current_user["id"], change_seq)
     return updated
 
 @api_router.delete("/projects/{project_id}")
 async def delete_project(project_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.projects.delete_one({"id": project_id, "user_id": current_user["id"]})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Project not found")
+    async with recording_changes(current_user["id"]) as change_seq:
+        if not await storage.projects.delete(project_id, current_user["id"]):
+            raise HTTPException(status_code=404, detail="Project not found")
+        await record_tombstones(current_user["id"], "project", [(project_id, change_seq)])
+    unindex_project(project_id)
+    await invalidate_user_content(current_user["id"], change_seq)
     return {"message": "Project deleted"}
 
 # ============ ACHIEVEMENT ROUTES ============
@@ -293,108 +1051,410 @@ async def create_achievement(achievement: AchievementCreate, current_user: dict
     achievement_id = str(uuid.uuid4())
     now = datetime.now(timezone.utc).isoformat()
     
-    achievement_doc = {
-        "id": achievement_id,
-        "user_id": current_user["id"],
-        **achievement.model_dump(),
-        "created_at": now
-    }
-    
-    await db.achievements.insert_one(achievement_doc)
+    async with recording_changes(current_user["id"]) as change_seq:
+        achievement_doc = {
+            "id": achievement_id,
+            "user_id": current_user["id"],
+            **achievement.model_dump(),
+            "created_at": now,
+            "updated_at": now,
+            "version": 1,
+            "change_seq": change_seq,
+            "created_seq": change_seq
+        }
+        await storage.achievements.insert(achievement_doc)
+    await invalidate_user_content(current_user["id"], change_seq)
     
-    return AchievementResponse(**{k: v for k, v in achievement_doc.items() if k != "_id"})
+    return AchievementResponse(**achievement_doc)
 
-@api_router.get("/achievements", response_model=List[AchievementResponse])
-async def get_achievements(current_user: dict = Depends(get_current_user)):
-    achievements = await db.achievements.find(
-        {"user_id": current_user["id"]},
-        {"_id": 0}
-    ).sort("created_at", -1).to_list(100)
-    return achievements
+@api_router.post("/achievements/bulk", response_model=BulkResponse)
+async def bulk_achievements(bulk: BulkRequest, current_user: dict = Depends(get_current_user)):
+    """
+    Create, update and delete many achievements in one request.
+    Each operation is {op: 'create'|'update'|'delete', id?, data?, version?}; data is validated
+    as AchievementCreate/AchievementUpdate and version works like If-Match on PUT.
+    """
+    return await execute_bulk(storage.achievements, bulk, current_user["id"], AchievementCreate, AchievementUpdate)
 
-@api_router.get("/achievements/{achievement_id}", response_model=AchievementResponse)
-async def get_achievement(achievement_id: str, current_user: dict = Depends(get_current_user)):
-    achievement = await db.achievements.find_one(
-        {"id": achievement_id, "user_id": current_user["id"]},
-        {"_id": 0}
+@api_router.get("/achievements", response_model=Union[List[AchievementResponse], AchievementPage])
+async def get_achievements(
+    current_user: dict = Depends(get_current_user),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """
+    Without `limit`/`cursor` this returns a plain list (first 100) as before.
+    With either, it returns {items, next_cursor}; pass next_cursor back to get the next page.
+    """
+    if limit is not None or cursor is not None:
+        return trusted(await fetch_page(storage.achievements, current_user["id"], limit or MAX_PAGE_SIZE, cursor))
+    
+    achievements = await storage.achievements.list_for_user(
+        current_user["id"], ItemQuery(ITEM_PROJECTION, 100, newest_first=True)
     )
+    return trusted(achievements)
+
+@api_router.get("/achievements/{achievement_id}", response_model=AchievementResponse)
+async def get_achievement(achievement_id: str, response: Response, current_user: dict = Depends(get_current_user)):
+    achievement = await storage.achievements.get(achievement_id, current_user["id"], ITEM_PROJECTION)
     if not achievement:
         raise HTTPException(status_code=404, detail="Achievement not found")
+    response.headers["ETag"] = item_etag(achievement)
     return achievement
 
 @api_router.put("/achievements/{achievement_id}", response_model=AchievementResponse)
-async def update_achievement(achievement_id: str, achievement_update: AchievementUpdate, current_user: dict = Depends(get_current_user)):
-    existing = await db.achievements.find_one({"id": achievement_id, "user_id": current_user["id"]})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Achievement not found")
-    
+async def update_achievement(
+    achievement_id: str,
+    achievement_update: AchievementUpdate,
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    """Send If-Match with the achievement's ETag (its version) to get a 412 instead of overwriting a newer edit."""
     update_data = {k: v for k, v in achievement_update.model_dump().items() if v is not None}
+    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.achievements.update_one(
-        {"id": achievement_id},
-        {"$set": update_data}
-    )
-    
-    updated = await db.achievements.find_one({"id": achievement_id}, {"_id": 0})
+    async with recording_changes(current_user["id"]) as change_seq:
+        updated = await update_owned_item(
+            storage.achievements, achievement_id, current_user["id"], {**update_data, "change_seq": change_seq},
+            request, response, "Achievement"
+        )
+    await invalidate_user_content(current_user["id"], change_seq)
     return updated
 
 @api_router.delete("/achievements/{achievement_id}")
 async def delete_achievement(achievement_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.achievements.delete_one({"id": achievement_id, "user_id": current_user["id"]})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Achievement not found")
+    async with recording_changes(current_user["id"]) as change_seq:
+        if not await storage.achievements.delete(achievement_id, current_user["id"]):
+            raise HTTPException(status_code=404, detail="Achievement not found")
+        await record_tombstones(current_user["id"], "achievement", [(achievement_id, change_seq)])
+    await invalidate_user_content(current_user["id"], change_seq)
     return {"message": "Achievement deleted"}
 
 # ============ PUBLIC PROFILE & AI EXPORT ============
 
-@api_router.get("/profile/{slug}")
-async def get_public_profile(slug: str, sections: str = "all"):
+PUBLIC_USER_FIELDS = {
+    "_id": 0, "id": 1, "name": 1, "unique_slug": 1, "created_at": 1,
+    "content_version": 1, "content_updated_at": 1
+}
+PROFILE_PROJECTIONS = {
+    "projects": {**ITEM_PROJECTION, "user_id": 0},
+    "achievements": {**ITEM_PROJECTION, "user_id": 0}
+}
+EXPORT_PROJECTIONS = {
+    "projects": {
+        "_id": 0, "title": 1, "description": 1, "readme_content": 1, "tech_stack": 1,
+        "github_link": 1, "live_demo_link": 1, "created_at": 1
+    },
+    "achievements": {"_id": 0, "title": 1, "description": 1, "date": 1, "certificate_link": 1}
+}
+
+def requested_collections(sections: str) -> List[str]:
+    collections = []
+    if sections in ["all", "projects"]:
+        collections.append("projects")
+    if sections in ["all", "achievements"]:
+        collections.append("achievements")
+    return collections
+
+def public_page(limit: Optional[int], cursor: Optional[str]) -> Optional[dict]:
     """
-    Get public profile by unique slug.
-    sections: 'all', 'projects', 'achievements'
+    Pagination state for the public endpoints, or None for the legacy unpaginated read.
+    The cursor maps each section that still has items to its last [created_at, id];
+    a section missing from a cursor is exhausted.
     """
-    user = await db.users.find_one({"unique_slug": slug}, {"_id": 0, "password_hash": 0})
-    if not user:
-        raise HTTPException(status_code=404, detail="Profile not found")
-    
-    response = {
-        "name": user["name"],
-        "unique_slug": user["unique_slug"]
+    if limit is None and cursor is None:
+        return None
+    after = None
+    if cursor:
+        after = decode_cursor(cursor)
+        if not isinstance(after, dict) or not all(
+            key in ("projects", "achievements") and is_position(value) for key, value in after.items()
+        ):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"limit": limit or MAX_PAGE_SIZE, "after": after}
+
+def is_exhausted(collection: str, page: Optional[dict]) -> bool:
+    return page is not None and page["after"] is not None and collection not in page["after"]
+
+def page_projection(projection: dict, page: Optional[dict]) -> dict:
+    # Inclusion projections must keep the keyset fields so the next cursor can be built
+    if page is not None and 1 in projection.values():
+        return {**projection, "id": 1, "created_at": 1}
+    return projection
+
+def section_queries(sections: str, projections: dict, page: Optional[dict]) -> dict:
+    """
+    The item read for each requested section that is not exhausted: the first 100 in natural
+    order for the legacy unpaginated read, else a page size + 1 keyset page (see trim_page).
+    """
+    queries = {}
+    for collection in requested_collections(sections):
+        if is_exhausted(collection, page):
+            continue
+        if page is None:
+            queries[collection] = ItemQuery(projections[collection], 100)
+        else:
+            after = page["after"].get(collection) if page["after"] else None
+            queries[collection] = ItemQuery(
+                page_projection(projections[collection], page), page["limit"] + 1, newest_first=True, after=after
+            )
+    return queries
+
+def trim_page(content: dict, page: dict) -> Optional[str]:
+    """Cut each section back to the page size and return the cursor for the next page."""
+    positions = {}
+    for collection, items in content.items():
+        if len(items) > page["limit"]:
+            del items[page["limit"]:]
+            positions[collection] = [items[-1]["created_at"], items[-1]["id"]]
+    return encode_cursor(positions) if positions else None
+
+def is_conditional(request: Request) -> bool:
+    return bool(request.headers.get("if-none-match") or request.headers.get("if-modified-since"))
+
+def choose_query_path(request: Request) -> str:
+    path = PROFILE_QUERY_MODE
+    if path == "ab":
+        path = random.choice(("sequential", "aggregate"))
+    # A conditional request is usually answered by a 304 from the user document alone,
+    # so joining the content up front would be wasted work
+    if path == "aggregate" and is_conditional(request):
+        return "sequential"
+    return path
+
+async def load_public_user(slug: str, sections: str, projections: dict, query_path: str,
+                           page: Optional[dict] = None) -> Optional[dict]:
+    """
+    Look up a public user by slug.
+    On the 'aggregate' path the requested sections are joined in with the user (with $lookup
+    on Mongo) so the whole portfolio comes back in a single round trip.
+    """
+    reads = storage.public_reads
+    if query_path != "aggregate":
+        return await reads.users.get_by_slug(slug, PUBLIC_USER_FIELDS)
+    return await reads.load_user_with_items(slug, PUBLIC_USER_FIELDS, section_queries(sections, projections, page))
+
+async def load_sections(user: dict, sections: str, projections: dict, page: Optional[dict] = None) -> dict:
+    """
+    Return the requested sections, reusing lists already joined by the aggregate path.
+    When paginating, each section holds up to page size + 1 items (see trim_page).
+    """
+    content = {}
+    queries = section_queries(sections, projections, page)
+    for collection in requested_collections(sections):
+        if collection in user:
+            content[collection] = user.pop(collection)
+        elif collection not in queries:
+            content[collection] = []
+        else:
+            items = storage.public_reads[collection]
+            content[collection] = await items.list_for_user(user["id"], queries[collection])
+    return content
+
+def export_project(p: dict) -> dict:
+    return {
+        "title": p["title"],
+        "description": p["description"],
+        "readme_content": p.get("readme_content", ""),
+        "tech_stack": p.get("tech_stack", []),
+        "github_link": p.get("github_link", ""),
+        "live_demo_link": p.get("live_demo_link", ""),
+        "created_at": p.get("created_at", "")
     }
+
+def export_achievement(a: dict) -> dict:
+    return {
+        "title": a["title"],
+        "description": a["description"],
+        "date": a.get("date", ""),
+        "certificate_link": a.get("certificate_link", "")
+    }
+
+async def load_content_validator(user: dict) -> dict:
+    """
+    Return the content version and last write time of a user's portfolio.
+    Both live on the user document (see invalidate_user_content), so the slug lookup
+    already carries them. Users created before they existed are backfilled once from
+    the newest project/achievement timestamps.
+    """
+    if "content_version" in user:
+        return {
+            "version": user["content_version"],
+            "updated_at": user.get("content_updated_at") or user["created_at"]
+        }
     
-    if sections in ["all", "projects"]:
-        projects = await db.projects.find(
-            {"user_id": user["id"]},
-            {"_id": 0, "user_id": 0}
-        ).to_list(100)
-        response["projects"] = projects
+    latest = user["created_at"]
+    reads = storage.public_reads
+    for items in (reads.projects, reads.achievements):
+        created, updated = await items.latest_timestamps(user["id"])
+        latest = max(ts for ts in (latest, created, updated) if ts)
     
-    if sections in ["all", "achievements"]:
-        achievements = await db.achievements.find(
-            {"user_id": user["id"]},
-            {"_id": 0, "user_id": 0}
-        ).to_list(100)
-        response["achievements"] = achievements
+    # Only backfill if no write has initialised the fields in the meantime
+    await storage.users.init_content_version(user["id"], latest)
+    return {"version": 0, "updated_at": latest}
+
+async def profile_validators(user: dict, *variant: str) -> tuple:
+    """Return the (ETag, Last-Modified) pair for one representation of a user's portfolio."""
+    validator = await load_content_validator(user)
+    content = json.dumps([
+        user["id"], user["name"], user["unique_slug"],
+        validator["version"], validator["updated_at"], *variant
+    ])
+    etag = '"' + hashlib.sha256(content.encode()).hexdigest()[:32] + '"'
+    last_modified = format_datetime(
+        datetime.fromisoformat(validator["updated_at"]).astimezone(timezone.utc),
+        usegmt=True
+    )
+    return etag, last_modified
+
+def is_not_modified(request: Request, etag: str, last_modified: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(base_etag(tag.removeprefix("W/")) == etag for tag in tags)
     
-    return response
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return since.tzinfo is not None and parsedate_to_datetime(last_modified) <= since
+    return False
+
+def validator_headers(etag: str, last_modified: str) -> dict:
+    return {"ETag": etag, "Last-Modified": last_modified, "Cache-Control": "no-cache"}
 
-@api_router.get("/export/{slug}")
-async def export_for_ai(slug: str, sections: str = "all", format: str = "json"):
+def not_modified_response(request: Request, etag: str, last_modified: str) -> Optional[Response]:
+    """Return a bodiless 304 if the client's copy is still current, else None."""
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=validator_headers(etag, last_modified))
+    return None
+
+def public_entry(user: dict, etag: str, last_modified: str, content: dict) -> dict:
+    """Render a public representation once; compressed variants are added to it on demand."""
+    return {
+        "etag": etag,
+        "last_modified": last_modified,
+        "content_version": user.get("content_version", 0),
+        "encoded": {"identity": FastJSONResponse(content).body}
+    }
+
+async def current_cache_entry(cache_key: tuple, slug: str) -> Optional[dict]:
     """
-    AI-readable export endpoint.
-    sections: 'all', 'projects', 'achievements'
-    format: 'json' (default)
+    Return the cached representation under `cache_key` if the portfolio has not changed since.
+    Local writes drop entries via profile_cache.bump, but a write handled by another worker
+    only shows in the persisted content_version, so each hit costs one projected user read.
+    """
+    cached = profile_cache.get(cache_key)
+    if cached is None:
+        return None
     
-    This endpoint returns structured data optimized for AI consumption.
+    user = await storage.public_reads.users.get_by_slug(slug, {"_id": 0, "content_version": 1})
+    if user is None or user.get("content_version", 0) != cached["content_version"]:
+        profile_cache.discard(cache_key)
+        return None
+    return cached
+
+def cache_public_entry(cache_key: tuple, entry: dict, user_id: str, snapshot: int) -> None:
+    """Cache a public representation (see PROFILE_CACHE_SETTLE_SECONDS for reads from secondaries)."""
+    settle = PROFILE_CACHE_SETTLE_SECONDS if storage.public_reads is not storage else 0.0
+    profile_cache.set(cache_key, entry, user_id, snapshot, settle_seconds=settle)
+
+def encoded_response(request: Request, entry: dict) -> Response:
+    """
+    Send a rendered public representation, compressed when the client accepts it and the body
+    is at least COMPRESSION_MIN_BYTES. Compressed bytes are stored on the (cached) entry, so
+    repeated hits never recompress.
+    """
+    identity = entry["encoded"]["identity"]
+    media_type = entry.get("media_type", "application/json")
+    headers = {
+        **validator_headers(entry["etag"], entry["last_modified"]),
+        "Vary": "Accept-Encoding",
+        **entry.get("headers", {})
+    }
+    encoding = None
+    if len(identity) >= COMPRESSION_MIN_BYTES:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is None:
+        return Response(identity, media_type=media_type, headers=headers)
+    
+    body = entry["encoded"].get(encoding)
+    if body is None:
+        body = entry["encoded"][encoding] = compressor.compress(identity, encoding)
+    else:
+        compressor.record_cached(encoding, len(identity), len(body))
+    headers["Content-Encoding"] = encoding
+    headers["ETag"] = representation_etag(entry["etag"], encoding)
+    return Response(body, media_type=media_type, headers=headers)
+
+@api_router.get("/profile/{slug}", dependencies=[Depends(rate_limit("profile"))])
+async def get_public_profile(
+    slug: str,
+    request: Request,
+    sections: str = "all",
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """
+    Get public profile by unique slug.
+    sections: 'all', 'projects', 'achievements'
+    limit/cursor: optional keyset pagination (newest first); the response then carries next_cursor
+    Supports conditional requests via If-None-Match / If-Modified-Since and gzip/br compression.
+    Rate limited per client (429 with Retry-After).
     """
-    user = await db.users.find_one({"unique_slug": slug}, {"_id": 0, "password_hash": 0})
+    await require_known_slug(slug)
+    page = public_page(limit, cursor)
+    cache_key = ("profile", slug, sections, limit, cursor)
+    cached = await current_cache_entry(cache_key, slug)
+    if cached is not None:
+        not_modified = not_modified_response(request, cached["etag"], cached["last_modified"])
+        return not_modified or encoded_response(request, cached)
+    
+    result = await coalesced("profile", cache_key, request, lambda: build_public_profile(
+        request, cache_key, slug, sections, limit, cursor, page
+    ))
+    return result if isinstance(result, Response) else encoded_response(request, result)
+
+async def build_public_profile(request: Request, cache_key: tuple, slug: str, sections: str,
+                               limit: Optional[int], cursor: Optional[str], page: Optional[dict]):
+    """Read and cache a public profile; returns the cache entry, or a 304 for a current conditional request."""
+    # Snapshot before any read so a concurrent write is never cached as current
+    snapshot = profile_cache.snapshot()
+    query_path = choose_query_path(request)
+    started = time.perf_counter()
+    user = await load_public_user(slug, sections, PROFILE_PROJECTIONS, query_path, page)
     if not user:
         raise HTTPException(status_code=404, detail="Profile not found")
     
+    etag, last_modified = await profile_validators(user, "profile", sections, str(limit), cursor or "")
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified:
+        return not_modified
+    
+    content = await load_sections(user, sections, PROFILE_PROJECTIONS, page)
+    profile_query_latency.labels("profile", query_path).observe(time.perf_counter() - started)
+    
+    profile_data = {
+        "name": user["name"],
+        "unique_slug": user["unique_slug"]
+    }
+    if page is not None:
+        profile_data["next_cursor"] = trim_page(content, page)
+    profile_data.update(content)
+    
+    entry = public_entry(user, etag, last_modified, profile_data)
+    cache_public_entry(cache_key, entry, user["id"], snapshot)
+    return entry
+
+def assemble_export(user: dict, sections: str, format: str, content: dict) -> dict:
+    """Build the JSON export document from the raw project/achievement documents."""
     export_data = {
         "user": {
             "name": user["name"],
-            "profile_url": f"/profile/{slug}"
+            "profile_url": f"/profile/{user['unique_slug']}"
         },
         "metadata": {
             "exported_at": datetime.now(timezone.utc).isoformat(),
@@ -404,46 +1464,620 @@ async def export_for_ai(slug: str, sections: str = "all", format: str = "json"):
         }
     }
     
-    if sections in ["all", "projects"]:
-        projects = await db.projects.find(
-            {"user_id": user["id"]},
-            {"_id": 0, "user_id": 0}
-        ).to_list(100)
-        export_data["projects"] = [{
-            "title": p["title"],
-            "description": p["description"],
-            "readme_content": p.get("readme_content", ""),
-            "tech_stack": p.get("tech_stack", []),
-            "github_link": p.get("github_link", ""),
-            "live_demo_link": p.get("live_demo_link", ""),
-            "created_at": p.get("created_at", "")
-        } for p in projects]
+    if "projects" in content:
+        projects = content["projects"]
+        export_data["projects"] = [export_project(p) for p in projects]
         export_data["metadata"]["total_projects"] = len(projects)
     
-    if sections in ["all", "achievements"]:
-        achievements = await db.achievements.find(
-            {"user_id": user["id"]},
-            {"_id": 0, "user_id": 0}
-        ).to_list(100)
-        export_data["achievements"] = [{
-            "title": a["title"],
-            "description": a["description"],
-            "date": a.get("date", ""),
-            "certificate_link": a.get("certificate_link", "")
-        } for a in achievements]
+    if "achievements" in content:
+        achievements = content["achievements"]
+        export_data["achievements"] = [export_achievement(a) for a in achievements]
         export_data["metadata"]["total_achievements"] = len(achievements)
     
     return export_data
 
+# Streaming export: one record per line (ndjson) or per array element (json-array)
+STREAMING_EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json-array": "application/json"
+}
+EXPORT_RECORD_TYPES = {
+    "projects": ("project", export_project),
+    "achievements": ("achievement", export_achievement)
+}
+
+async def export_records(user: dict, slug: str, sections: str, format: str) -> AsyncIterator[dict]:
+    """
+    Yield the export as a metadata record, one record per project/achievement read straight
+    off the storage cursor (newest first, the same order for ndjson and json-array), and a
+    closing summary record with the totals.
+    Memory stays bounded by EXPORT_STREAM_BATCH_SIZE whatever the portfolio size.
+    """
+    yield {
+        "type": "metadata",
+        "user": {"name": user["name"], "profile_url": f"/profile/{slug}"},
+        "metadata": {
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+            "sections_included": sections,
+            "format": format,
+            "version": "1.0"
+        }
+    }
+    
+    totals = {}
+    for collection in requested_collections(sections):
+        record_type, render = EXPORT_RECORD_TYPES[collection]
+        cursor = storage.public_reads[collection].iter_for_user(
+            user["id"], EXPORT_PROJECTIONS[collection], EXPORT_STREAM_BATCH_SIZE
+        )
+        count = 0
+        async for doc in cursor:
+            count += 1
+            yield {"type": record_type, **render(doc)}
+        totals[f"total_{collection}"] = count
+    
+    yield {"type": "summary", **totals}
+
+async def encode_ndjson(records: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    async for record in records:
+        yield (json.dumps(record) + "\n").encode()
+
+async def encode_json_array(records: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    separator = b"["
+    async for record in records:
+        yield separator + json.dumps(record).encode()
+        separator = b","
+    yield b"]" if separator == b"," else b"[]"
+
+async def stream_export(slug: str, request: Request, sections: str, format: str) -> Response:
+    user = await storage.public_reads.users.get_by_slug(slug, PUBLIC_USER_FIELDS)
+    if not user:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    etag, last_modified = await profile_validators(user, "export", sections, format)
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    headers["X-Export-Sections"] = sections
+    headers["X-Export-Version"] = "1.0"
+    encode = encode_ndjson if format == "ndjson" else encode_json_array
+    return StreamingResponse(
+        encode(export_records(user, slug, sections, format)),
+        media_type=STREAMING_EXPORT_FORMATS[format],
+        headers=headers
+    )
+
+# Text exports for LLM context windows, rendered by textexport.render_document
+TEXT_EXPORT_FORMATS = {
+    "markdown": "text/markdown; charset=utf-8",
+    "text": "text/plain; charset=utf-8"
+}
+
+def chunk_etag(etag: str, chunk: int) -> str:
+    return f'{etag[:-1]}.{chunk}"'
+
+async def load_export_items(user: dict, sections: str) -> dict:
+    """Read every requested item (no 100-item cap) in export shape, newest first."""
+    content = {}
+    for collection in requested_collections(sections):
+        _, render = EXPORT_RECORD_TYPES[collection]
+        cursor = storage.public_reads[collection].iter_for_user(
+            user["id"], EXPORT_PROJECTIONS[collection], EXPORT_STREAM_BATCH_SIZE
+        )
+        content[collection] = [render(doc) async for doc in cursor]
+    return content
+
+async def stream_and_cache(head: List[bytes], blocks, encoding: Optional[str], cache_key: tuple, entry: dict,
+                           user_id: str, snapshot) -> AsyncIterator[bytes]:
+    """
+    Send rendered blocks as they are produced (compressed with `encoding` when set); once the
+    last one is out, cache the identity body and the bytes sent, so hits serve the same
+    representation under the same ETag.
+    """
+    identity, sent = [], []
+    
+    def rendered():
+        yield from head
+        for block in blocks:
+            data = block.encode()
+            identity.append(data)
+            yield data
+    
+    body = compressor.compress_stream(rendered(), encoding) if encoding else rendered()
+    for data in body:
+        sent.append(data)
+        yield data
+    entry["encoded"] = {"identity": b"".join(head + identity)}
+    if encoding:
+        entry["encoded"][encoding] = b"".join(sent)
+    cache_public_entry(cache_key, entry, user_id, snapshot)
+
+def text_export_chunk(request: Request, entry: dict, chunk: int) -> Response:
+    if chunk >= len(entry["chunks"]):
+        raise HTTPException(status_code=404, detail=f"Chunk {chunk} not found ({len(entry['chunks'])} chunks)")
+    entry = entry["chunks"][chunk]
+    return not_modified_response(request, entry["etag"], entry["last_modified"]) or encoded_response(request, entry)
+
+async def text_export(slug: str, request: Request, sections: str, format: str,
+                      max_tokens: Optional[int], chunk: Optional[int], chunk_tokens: int) -> Response:
+    """
+    Markdown / plain-text export. The whole document is streamed block by block (compressed as
+    it goes when the client accepts it); with `chunk` it is split into pieces of at most
+    `chunk_tokens` and only piece number `chunk` is sent.
+    Rendered output is cached per portfolio version (whole body, or every chunk at once).
+    """
+    media_type = TEXT_EXPORT_FORMATS[format]
+    chunked = chunk is not None
+    cache_key = ("export", slug, sections, format, max_tokens, chunk_tokens if chunked else None)
+    cached = await current_cache_entry(cache_key, slug)
+    if cached is not None:
+        if chunked:
+            return text_export_chunk(request, cached, chunk)
+        return not_modified_response(request, cached["etag"], cached["last_modified"]) or encoded_response(request, cached)
+    
+    # Snapshot before any read so a concurrent write is never cached as current
+    snapshot = profile_cache.snapshot()
+    user = await storage.public_reads.users.get_by_slug(slug, PUBLIC_USER_FIELDS)
+    if not user:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    etag, last_modified = await profile_validators(
+        user, "export", sections, format, str(max_tokens), str(chunk_tokens) if chunked else ""
+    )
+    not_modified = not_modified_response(request, chunk_etag(etag, chunk) if chunked else etag, last_modified)
+    if not_modified:
+        return not_modified
+    
+    content = await load_export_items(user, sections)
+    blocks = render_document(user["name"], f"/profile/{slug}", sections, content, format, max_tokens)
+    if not chunked:
+        entry = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_version": user.get("content_version", 0),
+            "media_type": media_type
+        }
+        # Render up to COMPRESSION_MIN_BYTES first: a shorter document is sent whole, exactly as
+        # a cache hit would be, and a longer one is streamed with the encoding a hit would use
+        head, size = [], 0
+        for block in blocks:
+            head.append(block.encode())
+            size += len(head[-1])
+            if size >= COMPRESSION_MIN_BYTES:
+                break
+        else:
+            entry["encoded"] = {"identity": b"".join(head)}
+            cache_public_entry(cache_key, entry, user["id"], snapshot)
+            return encoded_response(request, entry)
+        
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        headers = {**validator_headers(representation_etag(etag, encoding), last_modified), "Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return StreamingResponse(
+            stream_and_cache(head, blocks, encoding, cache_key, entry, user["id"], snapshot),
+            media_type=media_type,
+            headers=headers
+        )
+    
+    chunks = chunk_blocks(blocks, chunk_tokens)
+    entry = {"etag": etag, "last_modified": last_modified, "content_version": user.get("content_version", 0), "chunks": [
+        {
+            "etag": chunk_etag(etag, index),
+            "last_modified": last_modified,
+            "media_type": media_type,
+            "headers": {
+                "X-Export-Chunk": str(index),
+                "X-Export-Chunk-Count": str(len(chunks)),
+                "X-Export-Tokens": str(estimate_tokens(text))
+            },
+            "encoded": {"identity": text.encode()}
+        }
+        for index, text in enumerate(chunks)
+    ]}
+    cache_public_entry(cache_key, entry, user["id"], snapshot)
+    return text_export_chunk(request, entry, chunk)
+
+@api_router.get("/export/{slug}", dependencies=[Depends(rate_limit("export"))])
+async def export_for_ai(
+    slug: str,
+    request: Request,
+    sections: str = "all",
+    format: str = "json",
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    max_tokens: Optional[int] = Query(None, ge=50, le=EXPORT_MAX_TOKENS),
+    chunk: Optional[int] = Query(None, ge=0),
+    chunk_tokens: int = Query(2000, ge=100, le=EXPORT_MAX_TOKENS)
+):
+    """
+    AI-readable export endpoint.
+    sections: 'all', 'projects', 'achievements'
+    format: 'json' (default), 'ndjson' / 'json-array' to stream every item as a record,
+            or 'markdown' / 'text' for compact text aimed at LLM context windows (others are a 400)
+    limit/cursor: optional keyset pagination (newest first); the response then carries next_cursor
+    max_tokens (markdown/text): approximate budget; readmes are cut or summarized to fit
+    chunk/chunk_tokens (markdown/text): return piece `chunk` of the document split into
+            pieces of at most chunk_tokens (see the X-Export-Chunk-Count header); max_tokens
+            or chunk with any other format is a 400
+    
+    This endpoint returns structured data optimized for AI consumption.
+    Supports conditional requests via If-None-Match / If-Modified-Since and gzip/br compression.
+    exported_at is the time this representation was assembled, so it is stable while cached.
+    Rate limited per client (429 with Retry-After).
+    """
+    if format != "json" and format not in STREAMING_EXPORT_FORMATS and format not in TEXT_EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown export format: {format}")
+    if format not in TEXT_EXPORT_FORMATS and (chunk is not None or max_tokens is not None):
+        raise HTTPException(status_code=400, detail="chunk and max_tokens only apply to markdown/text formats")
+    await require_known_slug(slug)
+    if format in STREAMING_EXPORT_FORMATS:
+        if limit is not None or cursor is not None:
+            raise HTTPException(status_code=400, detail="Streaming formats do not support pagination")
+        return await stream_export(slug, request, sections, format)
+    if format in TEXT_EXPORT_FORMATS:
+        if limit is not None or cursor is not None:
+            raise HTTPException(status_code=400, detail="Text formats use chunk/chunk_tokens instead of limit/cursor")
+        return await text_export(slug, request, sections, format, max_tokens, chunk, chunk_tokens)
+    
+    page = public_page(limit, cursor)
+    cache_key = ("export", slug, sections, format, limit, cursor)
+    cached = await current_cache_entry(cache_key, slug)
+    if cached is not None:
+        not_modified = not_modified_response(request, cached["etag"], cached["last_modified"])
+        return not_modified or encoded_response(request, cached)
+    
+    result = await coalesced("export", cache_key, request, lambda: build_json_export(
+        request, cache_key, slug, sections, format, limit, cursor, page
+    ))
+    return result if isinstance(result, Response) else encoded_response(request, result)
+
+async def build_json_export(request: Request, cache_key: tuple, slug: str, sections: str, format: str,
+                            limit: Optional[int], cursor: Optional[str], page: Optional[dict]):
+    """Read and cache a JSON export; returns the cache entry, or a 304 for a current conditional request."""
+    # Snapshot before any read so a concurrent write is never cached as current
+    snapshot = profile_cache.snapshot()
+    query_path = choose_query_path(request)
+    started = time.perf_counter()
+    user = await load_public_user(slug, sections, EXPORT_PROJECTIONS, query_path, page)
+    if not user:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    etag, last_modified = await profile_validators(user, "export", sections, format, str(limit), cursor or "")
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified:
+        return not_modified
+    
+    content = await load_sections(user, sections, EXPORT_PROJECTIONS, page)
+    profile_query_latency.labels("export", query_path).observe(time.perf_counter() - started)
+    next_cursor = trim_page(content, page) if page is not None else None
+    
+    export_data = assemble_export(user, sections, format, content)
+    if page is not None:
+        export_data["next_cursor"] = next_cursor
+    
+    entry = public_entry(user, etag, last_modified, export_data)
+    cache_public_entry(cache_key, entry, user["id"], snapshot)
+    return entry
+
+async def batch_export_records(users: List[dict], missing: List[str], sections: str) -> AsyncIterator[dict]:
+    """
+    Yield one export record per user, then a summary. Each requested section is read with a
+    single $in query sorted by user_id; walking those cursors side by side completes one user
+    at a time, so a user's record goes out as soon as their last item has arrived.
+    """
+    for slug in missing:
+        yield {"type": "missing", "slug": slug}
+    
+    users = sorted(users, key=lambda u: u["id"])
+    user_ids = [u["id"] for u in users]
+    cursors, heads = {}, {}
+    for collection in requested_collections(sections):
+        cursors[collection] = storage.public_reads[collection].iter_for_users(
+            user_ids, {**EXPORT_PROJECTIONS[collection], "user_id": 1}, EXPORT_STREAM_BATCH_SIZE
+        )
+        heads[collection] = await anext(cursors[collection], None)
+    
+    for user in users:
+        content = {}
+        for collection, cursor in cursors.items():
+            items, doc = [], heads[collection]
+            while doc is not None and doc["user_id"] == user["id"]:
+                items.append(doc)
+                doc = await anext(cursor, None)
+            heads[collection] = doc
+            content[collection] = items
+        yield {"type": "export", "slug": user["unique_slug"], **assemble_export(user, sections, "json", content)}
+    
+    yield {"type": "summary", "requested": len(users) + len(missing), "exported": len(users), "missing": missing}
+
+@api_router.post("/export/batch", dependencies=[Depends(rate_limit("export_batch"))])
+async def batch_export(batch: BatchExportRequest):
+    """
+    Export many portfolios in one request: {slugs: [...], sections: 'all'|'projects'|'achievements'}.
+    Streams NDJSON: a {"type": "missing", "slug"} line per unknown slug, a {"type": "export",
+    "slug", ...} line per portfolio (same shape as the JSON export, every item included) and a
+    closing {"type": "summary"} line. Costs one users query plus one query per section.
+    """
+    slugs = list(dict.fromkeys(batch.slugs))
+    rejected = {slug for slug in slugs if not slug_filter.might_exist(slug)}
+    known = [slug for slug in slugs if slug not in rejected or may_confirm_slug_miss()]
+    users = await storage.public_reads.users.find_by_slugs(known, PUBLIC_USER_FIELDS) if known else []
+    found = {u["unique_slug"] for u in users}
+    for slug in found & rejected:
+        slug_filter.recover(slug)
+    missing = [slug for slug in slugs if slug not in found]
+    return StreamingResponse(
+        encode_ndjson(batch_export_records(users, missing, batch.sections)),
+        media_type=STREAMING_EXPORT_FORMATS["ndjson"],
+        headers={"X-Export-Missing": str(len(missing))}
+    )
+
+# Change feed: every write stamps the items it touches with a per-user change number
+# (change_seq, see allocate_change_seqs); deletes leave a tombstone carrying theirs
+CHANGE_PROJECTIONS = {
+    collection: {**projection, "id": 1, "created_at": 1, "updated_at": 1, "change_seq": 1, "created_seq": 1}
+    for collection, projection in EXPORT_PROJECTIONS.items()
+}
+
+def encode_change_token(seq: int) -> str:
+    return encode_cursor({"seq": seq})
+
+def decode_change_token(token: str) -> int:
+    position = decode_cursor(token)
+    if not isinstance(position, dict) or not isinstance(position.get("seq"), int) or position["seq"] < 0:
+        raise HTTPException(status_code=400, detail="Invalid change token")
+    return position["seq"]
+
+def change_horizon(user: dict) -> int:
+    """
+    Highest change number below which every write has landed. Numbers are reserved before
+    their write, so a write still in flight holds the horizon back until it finishes (or is
+    older than CHANGE_FEED_SETTLE_SECONDS, i.e. its writer died; the next reservation for the
+    user drops it for good, see allocate_change_seqs).
+    """
+    cutoff = change_settle_cutoff()
+    pending = [p["seq"] for p in user.get("changes_pending", []) if p["at"] >= cutoff]
+    return min(pending) - 1 if pending else user.get("change_seq", 0)
+
+def item_change(collection: str, doc: dict, since: Optional[int]) -> dict:
+    record_type, render = EXPORT_RECORD_TYPES[collection]
+    created = since is None or doc.get("created_seq", 0) > since
+    return {
+        "type": record_type,
+        "op": "created" if created else "updated",
+        "id": doc["id"],
+        "updated_at": doc.get("updated_at") or doc["created_at"],
+        "item": render(doc)
+    }
+
+@api_router.get("/export/{slug}/changes", dependencies=[Depends(rate_limit("export"))])
+async def export_changes(
+    slug: str,
+    since: Optional[str] = None,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """
+    Projects and achievements created, updated or deleted after `since`, oldest change first.
+    Without `since` this is a snapshot of every current item (no deletes) to start a mirror
+    from. Pass next_token back as `since` to continue; has_more means call again right away.
+    Each query walks the (user_id, change_seq) indexes, so its cost follows the delta.
+    """
+    await require_known_slug(slug)
+    user = await storage.users.get_by_slug(slug, {"_id": 0, "id": 1, "change_seq": 1, "changes_pending": 1})
+    if not user:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    since_seq = decode_change_token(since) if since else None
+    horizon = max(change_horizon(user), since_seq or 0)
+    
+    if since_seq is None:
+        # Items written before the change feed existed have no change_seq; include them
+        changes = []
+        for collection in ("projects", "achievements"):
+            async for doc in storage[collection].snapshot(user["id"], horizon, CHANGE_PROJECTIONS[collection]):
+                changes.append(item_change(collection, doc, None))
+        return {"since": None, "next_token": encode_change_token(horizon), "has_more": False, "changes": changes}
+    
+    # The lowest `limit` + 1 numbers of each source, merged, cover every change up to the cut
+    rows = []
+    for collection in ("projects", "achievements"):
+        changed = storage[collection].changes_after(user["id"], since_seq, horizon, limit + 1, CHANGE_PROJECTIONS[collection])
+        async for doc in changed:
+            rows.append((doc["change_seq"], item_change(collection, doc, since_seq)))
+    async for tombstone in storage.tombstones.changes_after(user["id"], since_seq, horizon, limit + 1):
+        rows.append((tombstone["change_seq"], {
+            "type": tombstone["type"],
+            "op": "deleted",
+            "id": tombstone["item_id"],
+            "updated_at": tombstone["deleted_at"]
+        }))
+    rows.sort(key=lambda row: row[0])
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_seq = rows[-1][0] if has_more else horizon
+    return {
+        "since": since,
+        "next_token": encode_change_token(next_seq),
+        "has_more": has_more,
+        "changes": [change for _, change in rows]
+    }
+
+# ============ SEARCH ============
+
+@api_router.get("/search", response_model=SearchResponse)
+async def search_projects(
+    q: str = "",
+    tech: str = "",
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=SEARCH_MAX_OFFSET)
+):
+    """
+    Search public projects by text (title, description, readme, tech stack) and/or tech tags.
+    `tech` is comma-separated and every tag must match ('node.js' and 'nodejs' are the same tag).
+    Results are ranked by BM25, or newest first for a tech-only search.
+    """
+    tags = [tag.strip() for tag in tech.split(",") if tag.strip()]
+    if not q.strip() and not tags:
+        raise HTTPException(status_code=400, detail="Provide a query (q) or at least one tech tag")
+    
+    total, hits = search_index.search(q, tags, limit=limit, offset=offset)
+    owners = {}
+    user_ids = list({hit["user_id"] for hit in hits})
+    if user_ids:
+        for user in await storage.users.find_by_ids(user_ids, {"_id": 0, "id": 1, "name": 1, "unique_slug": 1}):
+            owners[user["id"]] = {"name": user["name"], "unique_slug": user["unique_slug"]}
+    
+    return {
+        "query": q,
+        "tech": tags,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "index_ready": search_index.ready,
+        "results": [{**hit, "owner": owners.get(hit["user_id"])} for hit in hits]
+    }
+
+# ============ PROFILING ============
+
+async def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    if not PROFILING_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, PROFILING_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def make_profile_rule(spec: ProfilingRuleRequest) -> ProfileRule:
+    route = next((r for r in app.routes if getattr(r, "path", None) == spec.route), None)
+    if route is None:
+        raise HTTPException(status_code=400, detail=f"Unknown route: {spec.route}")
+    if spec.slug is not None and "{slug}" not in route.path:
+        raise HTTPException(status_code=400, detail="slug can only narrow routes with a {slug} parameter")
+    return ProfileRule(route, method=spec.method, slug=spec.slug, mode=spec.mode,
+                       interval_ms=spec.interval_ms, limit=spec.limit, routes=app.routes)
+
+@api_router.get("/admin/profiling", dependencies=[Depends(require_admin_token)])
+async def profiling_status():
+    return {**request_profiler.stats(), "profiles": request_profiler.summaries()}
+
+@api_router.put("/admin/profiling", dependencies=[Depends(require_admin_token)])
+async def arm_profiling(spec: ProfilingRuleRequest):
+    """Profile requests matching `route` (and `method` / `slug`), replacing any previous rule."""
+    request_profiler.arm(make_profile_rule(spec))
+    return request_profiler.stats()
+
+@api_router.delete("/admin/profiling", dependencies=[Depends(require_admin_token)])
+async def disarm_profiling():
+    request_profiler.disarm()
+    return request_profiler.stats()
+
+@api_router.get("/admin/profiling/{profile_id}", dependencies=[Depends(require_admin_token)])
+async def download_profile(profile_id: str, format: Optional[Literal["pstats", "text", "collapsed"]] = None):
+    """Download a captured profile: cprofile captures as pstats (default) or text, samples as collapsed stacks."""
+    profile = request_profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found (it may have been rotated out)")
+    formats = profile_formats(profile["mode"])
+    format = format or formats[0]
+    if format not in formats:
+        raise HTTPException(status_code=400, detail=f"{profile['mode']} profiles download as {', '.join(formats)}")
+    media_type = "application/octet-stream" if format == "pstats" else "text/plain; charset=utf-8"
+    extension = {"pstats": "pstats", "text": "txt", "collapsed": "folded"}[format]
+    return Response(
+        content=render_profile(profile, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.{extension}"'},
+    )
+
 # ============ HEALTH CHECK ============
 
+async def require_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(metrics_security)):
+    if not METRICS_TOKEN:
+        return
+    if credentials is None or not secrets.compare_digest(credentials.credentials, METRICS_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+
 @api_router.get("/")
 async def root():
     return {"message": "DevFolio API is running", "version": "1.0"}
 
 @api_router.get("/health")
 async def health():
-    return {"status": "healthy"}
+    """Liveness (answering at all) and readiness (warm-up finished) side by side."""
+    return {"status": "healthy", "live": True, "ready": warmup.ready, "warmup": warmup.status()}
+
+@api_router.get("/health/live")
+async def liveness():
+    return {"status": "alive"}
+
+@api_router.get("/health/ready")
+async def readiness():
+    """503 until the warm-up has finished, so a load balancer only routes to warm workers."""
+    if not warmup.ready:
+        return FastJSONResponse({"status": "warming", **warmup.status()}, status_code=503, headers={"Retry-After": "1"})
+    return {"status": "ready", **warmup.status()}
+
+@api_router.get("/cache/stats", dependencies=[Depends(require_metrics_token)])
+async def cache_stats():
+    return {
+        "profile_cache": profile_cache.stats(),
+        "auth_user_cache": {**auth_user_cache.stats(), "lookups": auth_user_lookups.stats()}
+    }
+
+@api_router.get("/stats/password-hashing", dependencies=[Depends(require_metrics_token)])
+async def password_hashing_stats():
+    return password_hasher.stats()
+
+@api_router.get("/stats/search", dependencies=[Depends(require_metrics_token)])
+async def search_stats():
+    return search_index.stats()
+
+@api_router.get("/stats/tech")
+async def tech_stats(
+    k: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    by: Literal["portfolios", "projects"] = "portfolios",
+    tag: Optional[str] = None,
+    slug: Optional[str] = None
+):
+    """
+    Tech-stack counts from the in-memory facets. By default the top `k` tags by number of
+    portfolios (or projects) using them; `tag` gives one tag's counts and `slug` one
+    profile's tag histogram.
+    """
+    if slug is not None:
+        await require_known_slug(slug)
+        user = await storage.users.get_by_slug(slug, {"_id": 0, "id": 1})
+        if not user:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return {"slug": slug, "tags": tech_facets.user_histogram(user["id"], k)}
+    if tag is not None:
+        return tech_facets.tag_counts(tag)
+    return {"by": by, "top": tech_facets.top(k, by), **tech_facets.stats()}
+
+@api_router.get("/stats/slug-filter", dependencies=[Depends(require_metrics_token)])
+async def slug_filter_stats():
+    return {**slug_filter.stats(), "miss_lookups_per_second": SLUG_FILTER_MISS_LOOKUPS}
+
+@api_router.get("/stats/rate-limits", dependencies=[Depends(require_metrics_token)])
+async def rate_limit_stats():
+    return {**rate_limiter.stats(), "coalescing": public_flights.stats()}
+
+@api_router.get("/stats/compression", dependencies=[Depends(require_metrics_token)])
+async def compression_stats():
+    return {"min_bytes": COMPRESSION_MIN_BYTES, **compressor.stats()}
+
+@api_router.get("/stats/profile-queries", dependencies=[Depends(require_metrics_token)])
+async def profile_query_stats():
+    return {"mode": PROFILE_QUERY_MODE, "latency": profile_query_latency.snapshot()}
+
+@api_router.get("/metrics", dependencies=[Depends(require_metrics_token)])
+async def prometheus_metrics():
+    """Request, DB command, profile query, rate limit and coalescing metrics in the Prometheus text format."""
+    return Response(
+        content=render_prometheus((*METRIC_FAMILIES, profile_query_latency, rate_limited_requests, coalesced_requests)),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -455,6 +2089,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ProfilingMiddleware, profiler=request_profiler)
+# Added last so it is outermost and times CORS and error handling too
+app.add_middleware(RequestMetricsMiddleware, slow_seconds=SLOW_REQUEST_SECONDS)
 
 # Configure logging
 logging.basicConfig(
@@ -463,6 +2100,97 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+# ============ STARTUP ============
+
+def open_storage():
+    """
+    Create the storage engine from the environment, unless one is installed already
+    (the benchmark harness puts its own in place before requests start).
+    """
+    global client, db, storage
+    if storage is not None:
+        return storage
+    if STORAGE_BACKEND == 'memory':
+        storage = MemoryStorage()
+        return storage
+    client = AsyncIOMotorClient(
+        os.environ['MONGO_URL'], event_listeners=[CommandTimer(), PoolTimer()], **MONGO_CLIENT_OPTIONS
+    )
+    db = client[os.environ['DB_NAME']]
+    storage = MotorStorage(db, PUBLIC_READ_PREFERENCE)
+    return storage
+
+def arm_profiling_from_env():
+    route = os.environ.get('PROFILING_ROUTE')
+    if not route:
+        return
+    mode = os.environ.get('PROFILING_MODE', 'cprofile').lower()
+    if mode not in PROFILE_MODES:
+        raise RuntimeError(f"PROFILING_MODE must be one of {', '.join(PROFILE_MODES)}")
+    spec = ProfilingRuleRequest(route=route, slug=os.environ.get('PROFILING_SLUG') or None, mode=mode)
+    request_profiler.arm(make_profile_rule(spec))
+    logger.info("Request profiling armed for %s", request_profiler.rule.describe())
+
+async def ping_database():
+    # Also opens the first pooled connection, so the first request does not pay for it
+    await storage.ping()
+
+async def resolve_jwt_secret():
+    global JWT_SECRET
+    if JWT_SECRET is None:
+        logger.warning("JWT_SECRET is not set; using the generated secret stored in the settings collection")
+        JWT_SECRET = await storage.settings.get_or_create("jwt_secret", secrets.token_hex(32))
+
+async def bootstrap_indexes():
+    if INDEX_BOOTSTRAP == "off" or STORAGE_BACKEND == "memory":
+        return
+    report = await ensure_indexes(db, dry_run=INDEX_BOOTSTRAP == "check")
+    log_index_report(report)
+
+async def bootstrap_search_index():
+    if SEARCH_INDEX_REBUILD == "off":
+        search_index.ready = True
+        return
+    if SEARCH_INDEX_REBUILD == "blocking":
+        await rebuild_search_index()
+    else:
+        app.state.search_rebuild = asyncio.create_task(rebuild_search_index())
+
+async def load_streaming_backend():
+    # The first StreamingResponse would otherwise import anyio's asyncio backend mid-request
+    await anyio.sleep(0)
+
+warmup.add("database", ping_database)
+warmup.add("jwt_secret", resolve_jwt_secret)
+warmup.add("indexes", bootstrap_indexes)
+warmup.add("search_index", bootstrap_search_index)
+warmup.add("tech_facets", recount_tech_facets)
+warmup.add("slug_filter", rebuild_slug_filter)
+warmup.add("streaming", load_streaming_backend)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    open_storage()
+    arm_profiling_from_env()
+    app.state.warmup = asyncio.create_task(warmup.run())
+    if STARTUP_WARMUP == "blocking":
+        await app.state.warmup
+    app.state.tech_facet_reconciliation = asyncio.create_task(reconcile_tech_facets())
+    app.state.slug_filter_sync = asyncio.create_task(sync_slug_filter())
+    app.state.search_index_sync = asyncio.create_task(sync_search_index())
+    try:
+        yield
+    finally:
+        background = (
+            app.state.warmup, app.state.tech_facet_reconciliation, app.state.slug_filter_sync,
+            app.state.search_index_sync
+        )
+        for task in (*background, getattr(app.state, "search_rebuild", None)):
+            if task is not None:
+                task.cancel()
+        if client is not None:
+            client.close()
+        password_hasher.shutdown()
+
+# Assigned here rather than passed to FastAPI() because it runs the steps defined above
+app.router.lifespan_context = lifespan
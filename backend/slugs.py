@@ -0,0 +1,178 @@
+"""
+Bloom filter of known profile slugs for the public endpoints.
+
+Scrapers probe many slugs that do not exist; with the filter those get
+their 404 without a database round trip. `SlugFilter.rebuild` loads every
+slug on startup, `add` records slugs registered by this process, and `sync`
+picks up slugs registered by other workers (users created since the last
+sync, re-reading an overlap window to absorb clock skew and the gap
+between a user's created_at and its insert).
+
+A Bloom filter never forgets a slug it was given, so a filter miss is only
+wrong for a profile registered on another worker since this worker's last
+sync. Callers confirm misses against the database within a small budget
+and `recover` the slugs they find; past the budget such a profile gets a
+404 until the next sync. False positives fall through to the database as
+before. Slugs are never renamed or deleted, so nothing is ever removed.
+Until the first rebuild has finished every slug "might exist".
+
+Sizing: m = -n ln(p) / ln(2)^2 bits and k = m/n ln(2) hashes for n slugs at
+false-positive rate p, i.e. about 1.2 MB and 7 hashes per million slugs at
+1%.
+"""
+import hashlib
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Set
+
+
+def bloom_size(capacity: int, fp_rate: float) -> tuple:
+    """(bits, hashes) for `capacity` keys at `fp_rate`."""
+    bits = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+    return bits, max(1, round(bits / capacity * math.log(2)))
+
+
+class BloomFilter:
+    __slots__ = ("capacity", "num_bits", "num_hashes", "bits", "count")
+
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = capacity
+        self.num_bits, self.num_hashes = bloom_size(capacity, fp_rate)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Double hashing (Kirsch-Mitzenmacher): k positions from one 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str) -> bool:
+        """Set the key's bits; returns False if they were all set already (probably a repeat)."""
+        new = False
+        bits = self.bits
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def estimated_fp_rate(self) -> float:
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class SlugFilter:
+    def __init__(self, capacity: int = 1_000_000, fp_rate: float = 0.01, sync_overlap_seconds: float = 30.0):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.sync_overlap = timedelta(seconds=sync_overlap_seconds)
+        self.bloom = BloomFilter(capacity, fp_rate)
+        self.ready = False
+        self.rebuilding = False
+        self.added_during_rebuild: Set[str] = set()
+        self.watermark: Optional[str] = None  # newest created_at loaded from storage
+        self.passed = 0
+        self.rejected = 0
+        self.recovered = 0
+        self.last_rebuild: Optional[dict] = None
+        self.last_sync: Optional[dict] = None
+
+    def might_exist(self, slug: str) -> bool:
+        if not self.ready:
+            return True
+        if slug in self.bloom:
+            self.passed += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def add(self, slug: str) -> None:
+        self.bloom.add(slug)
+        if self.rebuilding:
+            self.added_during_rebuild.add(slug)
+
+    def recover(self, slug: str) -> None:
+        """Record a rejected slug that storage does have (registered elsewhere since the last sync)."""
+        self.add(slug)
+        self.rejected -= 1
+        self.recovered += 1
+
+    @property
+    def needs_resize(self) -> bool:
+        return self.bloom.count > self.bloom.capacity
+
+    def sync_since(self) -> Optional[str]:
+        """created_at to read new users from, or None before the first rebuild."""
+        if self.watermark is None:
+            return None
+        return (datetime.fromisoformat(self.watermark) - self.sync_overlap).isoformat()
+
+    async def rebuild(self, users, expected: int = 0) -> dict:
+        """
+        Reload from an async iterable of user documents (unique_slug, created_at), sized for
+        at least twice `expected` slugs. Slugs added while it runs are carried over.
+        """
+        started = time.perf_counter()
+        bloom = BloomFilter(max(self.capacity, 2 * expected), self.fp_rate)
+        watermark = None
+        self.rebuilding = True
+        self.added_during_rebuild.clear()
+        try:
+            async for user in users:
+                bloom.add(user["unique_slug"])
+                if watermark is None or user["created_at"] > watermark:
+                    watermark = user["created_at"]
+            for slug in self.added_during_rebuild:
+                bloom.add(slug)
+        finally:
+            self.rebuilding = False
+            self.added_during_rebuild.clear()
+        self.bloom = bloom
+        self.watermark = watermark or self.watermark
+        self.ready = True
+        self.last_rebuild = {
+            "slugs": bloom.count,
+            "seconds": round(time.perf_counter() - started, 3),
+            "finished_at": time.time(),
+        }
+        return self.last_rebuild
+
+    async def sync(self, users) -> dict:
+        """Add slugs from an async iterable of users created since `sync_since()`."""
+        started = time.perf_counter()
+        added = 0
+        async for user in users:
+            added += self.bloom.add(user["unique_slug"])
+            if self.watermark is None or user["created_at"] > self.watermark:
+                self.watermark = user["created_at"]
+        self.last_sync = {"added": added, "seconds": round(time.perf_counter() - started, 4), "finished_at": time.time()}
+        return self.last_sync
+
+    def stats(self) -> dict:
+        lookups = self.passed + self.rejected
+        return {
+            "ready": self.ready,
+            "rebuilding": self.rebuilding,
+            "slugs": self.bloom.count,
+            "capacity": self.bloom.capacity,
+            "bits": self.bloom.num_bits,
+            "hashes": self.bloom.num_hashes,
+            "memory_bytes": len(self.bloom.bits),
+            "target_fp_rate": self.fp_rate,
+            "estimated_fp_rate": round(self.bloom.estimated_fp_rate(), 6),
+            "passed": self.passed,
+            "rejected": self.rejected,
+            "rejected_ratio": round(self.rejected / lookups, 4) if lookups else 0.0,
+            "recovered": self.recovered,
+            "last_rebuild": self.last_rebuild,
+            "last_sync": self.last_sync,
+        }
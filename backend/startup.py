@@ -0,0 +1,77 @@
+"""
+Startup warm-up and readiness.
+
+Importing server.py creates no database client and does no I/O; the
+lifespan handler opens the storage and then runs a `Warmup`: named async
+steps (ping the database, resolve the JWT secret, build indexes, load the
+search index and tech facets, ...) run in order, each timed. A step that
+raises is retried with capped exponential backoff, so a worker started
+before MongoDB is reachable keeps answering liveness probes and becomes
+ready once the database shows up instead of crashing in a restart loop.
+
+Liveness means the process answers HTTP; readiness means every warm-up step
+has finished, and is what a load balancer should route on.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    def __init__(self, retry_initial_seconds: float = 0.5, retry_max_seconds: float = 30.0):
+        self.retry_initial_seconds = retry_initial_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.steps: List[Tuple[str, Callable[[], Awaitable[None]]]] = []
+        self.ready = False
+        self.phase = "pending"
+        self.started_at: Optional[str] = None
+        self.ready_at: Optional[str] = None
+        self.seconds: Optional[float] = None
+        self.step_seconds: Dict[str, float] = {}
+        self.retries = 0
+        self.last_error: Optional[str] = None
+
+    def add(self, name: str, step: Callable[[], Awaitable[None]]) -> None:
+        self.steps.append((name, step))
+
+    async def run(self) -> None:
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        started = time.perf_counter()
+        for name, step in self.steps:
+            self.phase = name
+            step_started = time.perf_counter()
+            delay = self.retry_initial_seconds
+            while True:
+                try:
+                    await step()
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    self.retries += 1
+                    self.last_error = f"{name}: {type(exc).__name__}: {exc}"
+                    logger.warning("Warm-up step %s failed (%s); retrying in %.1f s", name, exc, delay)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.retry_max_seconds)
+            self.step_seconds[name] = round(time.perf_counter() - step_started, 4)
+        self.seconds = round(time.perf_counter() - started, 4)
+        self.phase = "ready"
+        self.ready_at = datetime.now(timezone.utc).isoformat()
+        self.ready = True
+        logger.info("Warm-up finished in %.3f s: %s", self.seconds, self.step_seconds)
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "phase": self.phase,
+            "started_at": self.started_at,
+            "ready_at": self.ready_at,
+            "seconds": self.seconds,
+            "steps": self.step_seconds,
+            "retries": self.retries,
+            "last_error": self.last_error,
+        }
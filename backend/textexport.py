@@ -0,0 +1,222 @@
+"""
+Markdown and plain-text renderings of a portfolio export, sized for LLM context windows.
+
+A document is a sequence of blocks: a header, a heading per section, one
+block per project and one per achievement. With a `max_tokens` budget the
+blocks are planned in priority order: the header, then every project's
+summary (title, description, tech stack, links), then achievements, and
+whatever is left goes to readme_content, newest project first. A readme
+that does not fit is summarized: code blocks, images and HTML are dropped
+and whole paragraphs are kept until the allowance runs out. When items
+have to be left out, the closing note saying so counts against the budget.
+
+`chunk_blocks` packs a document into pieces of at most `chunk_tokens`,
+always splitting between blocks (or paragraphs, for an oversized block),
+so a given portfolio version always yields the same chunks.
+
+Token counts are estimated at CHARS_PER_TOKEN characters per token rather
+than with a model tokenizer, so budgets are approximate.
+"""
+import re
+from typing import Iterator, List, Optional
+
+CHARS_PER_TOKEN = 4
+
+# Readme allowances smaller than this are not worth an excerpt
+MIN_README_TOKENS = 24
+
+CODE_FENCE_RE = re.compile(r"```.*?(```|$)", re.S)
+IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def summarize_readme(readme: str, max_tokens: Optional[int]) -> str:
+    """Return the readme, or an excerpt of whole paragraphs fitting in about max_tokens."""
+    readme = (readme or "").strip()
+    if max_tokens is None or estimate_tokens(readme) <= max_tokens:
+        return readme
+    if max_tokens < MIN_README_TOKENS:
+        return ""
+
+    text = HTML_TAG_RE.sub("", IMAGE_RE.sub("", CODE_FENCE_RE.sub("", readme)))
+    budget = max_tokens * CHARS_PER_TOKEN - 1  # room for the trailing ellipsis
+    kept, used = [], 0
+    for paragraph in PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        cost = len(paragraph) + (2 if kept else 0)
+        if used + cost <= budget:
+            kept.append(paragraph)
+            used += cost
+            continue
+        room = budget - used - (2 if kept else 0)
+        if room >= MIN_README_TOKENS * CHARS_PER_TOKEN // 2:
+            cut = paragraph[:room]
+            space = cut.rfind(" ")
+            kept.append((cut[:space] if space > room // 2 else cut).rstrip() + "…")
+        elif kept:
+            kept[-1] += "…"
+        break
+    return "\n\n".join(kept)
+
+
+def render_header(name: str, profile_url: str, sections: str, style: str) -> str:
+    if style == "markdown":
+        return f"# {name}\n\nPortfolio: {profile_url}\nSections: {sections}\n\n"
+    return f"{name}\nPortfolio: {profile_url}\nSections: {sections}\n\n"
+
+
+def render_heading(title: str, style: str) -> str:
+    return f"## {title}\n\n" if style == "markdown" else f"{title.upper()}\n\n"
+
+
+def render_project(project: dict, readme: str, style: str) -> str:
+    links = [(label, project.get(key)) for label, key in (("Code", "github_link"), ("Demo", "live_demo_link"))]
+    details = []
+    if project.get("tech_stack"):
+        details.append(f"Tech stack: {', '.join(project['tech_stack'])}")
+    details += [f"{label}: {url}" for label, url in links if url]
+    if project.get("created_at"):
+        details.append(f"Created: {project['created_at'][:10]}")
+
+    if style == "markdown":
+        lines = [f"### {project['title']}", "", project["description"], ""]
+        lines += [f"- {detail}" for detail in details]
+        if readme:
+            lines += ["", "#### README", "", readme]
+    else:
+        lines = [f"* {project['title']}", project["description"], *details]
+        if readme:
+            lines += ["README:", readme]
+    return "\n".join(lines) + "\n\n"
+
+
+def render_achievement(achievement: dict, style: str) -> str:
+    date = f" ({achievement['date']})" if achievement.get("date") else ""
+    prefix = "### " if style == "markdown" else "* "
+    lines = [f"{prefix}{achievement['title']}{date}", achievement["description"]]
+    if achievement.get("certificate_link"):
+        lines.append(f"{'- ' if style == 'markdown' else ''}Certificate: {achievement['certificate_link']}")
+    return "\n".join(lines) + "\n\n"
+
+
+def omitted_note(omitted: int, max_tokens: int) -> str:
+    return f"[{omitted} more item(s) omitted to fit max_tokens={max_tokens}]\n"
+
+
+def render_document(name: str, profile_url: str, sections: str, content: dict, style: str,
+                    max_tokens: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the export one block at a time. `content` holds export_project/export_achievement
+    dicts under "projects"/"achievements". Readme excerpts are only cut when the block is
+    reached, so the first blocks go out before the rest is rendered.
+    """
+    projects = content.get("projects") or []
+    achievements = content.get("achievements") or []
+    # (kind, item) in document order; kind is "header", "heading", "project" or "achievement"
+    plan = [("header", None)]
+    if projects:
+        plan += [("heading", "Projects")] + [("project", p) for p in projects]
+    if achievements:
+        plan += [("heading", "Achievements")] + [("achievement", a) for a in achievements]
+
+    def render(kind, item, readme=""):
+        if kind == "header":
+            return render_header(name, profile_url, sections, style)
+        if kind == "heading":
+            return render_heading(item, style)
+        if kind == "project":
+            return render_project(item, readme, style)
+        return render_achievement(item, style)
+
+    if max_tokens is None:
+        for kind, item in plan:
+            yield render(kind, item, item.get("readme_content", "") if kind == "project" else "")
+        return
+
+    # Summaries first, in priority order: header, projects, achievements
+    priority = sorted(range(len(plan)), key=lambda i: ("header", "heading", "project", "achievement").index(plan[i][0]))
+    costs = {i: estimate_tokens(render(*plan[i])) for i in range(len(plan))}
+    remaining = max_tokens
+    if sum(costs.values()) > max_tokens:
+        # Something will be left out: keep room for the note saying so, sized for the largest count
+        remaining -= estimate_tokens(omitted_note(len(plan), max_tokens))
+    included = set()
+    for i in priority:
+        if costs[i] > remaining:
+            break
+        included.add(i)
+        remaining -= costs[i]
+    # A section heading is only worth its tokens if something under it made the cut
+    for i, (kind, _) in enumerate(plan):
+        if kind == "heading" and i in included:
+            section = next((j for j in range(i + 1, len(plan)) if plan[j][0] == "heading"), len(plan))
+            if not included.intersection(range(i + 1, section)):
+                included.discard(i)
+                remaining += costs[i]
+    omitted = sum(1 for i, (kind, _) in enumerate(plan) if kind != "heading" and i not in included)
+
+    # Then readmes, newest project first, out of whatever budget is left
+    readme_budgets = {}
+    for i, (kind, item) in enumerate(plan):
+        if kind != "project" or i not in included or remaining < MIN_README_TOKENS:
+            continue
+        wanted = estimate_tokens(item.get("readme_content") or "")
+        if not wanted:
+            continue
+        # A readme adds a heading around the text; keep that inside the allowance too
+        allowance = min(wanted, remaining - 8)
+        if allowance >= MIN_README_TOKENS or allowance == wanted:
+            readme_budgets[i] = allowance
+            remaining -= allowance + 8
+
+    for i, (kind, item) in enumerate(plan):
+        if i not in included:
+            continue
+        readme = summarize_readme(item.get("readme_content", ""), readme_budgets[i]) if i in readme_budgets else ""
+        yield render(kind, item, readme)
+    if omitted:
+        yield omitted_note(omitted, max_tokens)
+
+
+def chunk_blocks(blocks, chunk_tokens: int) -> List[str]:
+    """Pack blocks into pieces of at most chunk_tokens, splitting oversized blocks by paragraph."""
+    limit = chunk_tokens * CHARS_PER_TOKEN
+    pieces: List[str] = []
+    for block in blocks:
+        if len(block) <= limit:
+            pieces.append(block)
+            continue
+        current = ""
+        # Keep each paragraph's separator with it, so the chunks join back into the document
+        paragraphs = block.split("\n\n")
+        for part in [p + "\n\n" for p in paragraphs[:-1]] + [paragraphs[-1]]:
+            while len(part) > limit:
+                if current:
+                    pieces.append(current)
+                    current = ""
+                pieces.append(part[:limit])
+                part = part[limit:]
+            if len(current) + len(part) > limit:
+                pieces.append(current)
+                current = ""
+            current += part
+        if current:
+            pieces.append(current)
+
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > limit:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current or not chunks:
+        chunks.append(current)
+    return chunks
@@ -1,6 +1,7 @@
 import requests
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 class DevFolioAPITester:
@@ -308,6 +309,69 @@ class DevFolioAPITester:
         
         return success1 and success2 and success3 and success4
 
+    def test_pagination(self):
+        """Test cursor pagination on list endpoints"""
+        print("\n" + "="*50)
+        print("TESTING PAGINATION")
+        print("="*50)
+        
+        success1, page = self.run_test(
+            "Projects - First Page",
+            "GET",
+            "/projects?limit=1",
+            200
+        )
+        if success1:
+            success1 = 'items' in page and 'next_cursor' in page and len(page['items']) <= 1
+            if not success1:
+                self.log_test("Projects Page Shape", False, f"Unexpected page: {page}")
+        
+        success2, _ = self.run_test(
+            "Projects - Invalid Cursor",
+            "GET",
+            "/projects?cursor=not-a-cursor",
+            400
+        )
+        
+        success3 = True
+        if self.user_data and 'unique_slug' in self.user_data:
+            success3, page = self.run_test(
+                "Public Profile - First Page",
+                "GET",
+                f"/profile/{self.user_data['unique_slug']}?limit=1",
+                200
+            )
+            if success3:
+                success3 = 'next_cursor' in page
+        
+        return success1 and success2 and success3
+
+    def test_search(self):
+        """Test project search by text and tech tag"""
+        print("\n" + "="*50)
+        print("TESTING SEARCH")
+        print("="*50)
+        
+        success1, results = self.run_test(
+            "Search - Text And Tech",
+            "GET",
+            "/search?q=test&tech=fastapi",
+            200
+        )
+        if success1 and self.project_id:
+            success1 = any(hit['id'] == self.project_id for hit in results.get('results', []))
+            if not success1:
+                self.log_test("Search Finds Project", False, f"{self.project_id} not in results")
+        
+        success2, _ = self.run_test(
+            "Search - Missing Query",
+            "GET",
+            "/search",
+            400
+        )
+        
+        return success1 and success2
+
     def test_public_profile(self):
         """Test public profile endpoint"""
         print("\n" + "="*50)
@@ -405,6 +469,242 @@ class DevFolioAPITester:
         
         return success1 and success2 and success3 and success4
 
+    def test_conditional_requests(self):
+        """Test ETag / If-None-Match handling on public endpoints"""
+        print("\n" + "="*50)
+        print("TESTING CONDITIONAL REQUESTS")
+        print("="*50)
+        
+        if not self.user_data or 'unique_slug' not in self.user_data:
+            self.log_test("Conditional Requests", False, "No user slug available")
+            return False
+        
+        slug = self.user_data['unique_slug']
+        all_success = True
+        
+        for endpoint in (f"/export/{slug}", f"/profile/{slug}"):
+            url = f"{self.base_url}{endpoint}"
+            try:
+                first = requests.get(url, timeout=10)
+                etag = first.headers.get('ETag')
+                if first.status_code != 200 or not etag or not first.headers.get('Last-Modified'):
+                    self.log_test(f"Validators - {endpoint}", False, f"status {first.status_code}, ETag {etag}")
+                    all_success = False
+                    continue
+                self.log_test(f"Validators - {endpoint}", True)
+                
+                second = requests.get(url, headers={'If-None-Match': etag}, timeout=10)
+                success = second.status_code == 304 and not second.content
+                self.log_test(
+                    f"If-None-Match 304 - {endpoint}",
+                    success,
+                    f"Expected empty 304, got {second.status_code} ({len(second.content)} bytes)"
+                )
+                all_success = all_success and success
+            except requests.RequestException as e:
+                self.log_test(f"Conditional Requests - {endpoint}", False, f"Request failed: {str(e)}")
+                all_success = False
+        
+        return all_success
+
+    def test_if_match_updates(self):
+        """Test If-Match preconditions on item updates"""
+        print("\n" + "="*50)
+        print("TESTING IF-MATCH UPDATES")
+        print("="*50)
+        
+        success, project = self.run_test(
+            "If-Match - Create Project",
+            "POST",
+            "/projects",
+            200,
+            {"title": "Versioned Project", "description": "Original description"}
+        )
+        if not success or 'id' not in project:
+            return False
+        
+        project_id = project['id']
+        version = project.get('version', 0)
+        
+        success1, _ = self.run_test(
+            "If-Match - Stale Version",
+            "PUT",
+            f"/projects/{project_id}",
+            412,
+            {"description": "Lost update"},
+            headers={'If-Match': f'"{version + 1}"'}
+        )
+        _, current = self.run_test(
+            "If-Match - Read After 412",
+            "GET",
+            f"/projects/{project_id}",
+            200
+        )
+        if current.get('description') != "Original description" or current.get('version') != version:
+            self.log_test("If-Match - 412 Leaves Project Unchanged", False, f"Project changed: {current}")
+            success1 = False
+        
+        success2, updated = self.run_test(
+            "If-Match - Matching Version",
+            "PUT",
+            f"/projects/{project_id}",
+            200,
+            {"description": "Checked update"},
+            headers={'If-Match': f'"{version}"'}
+        )
+        if success2 and updated.get('version') != version + 1:
+            self.log_test("If-Match - New Version Returned", False, f"Expected version {version + 1}, got {updated.get('version')}")
+            success2 = False
+        
+        success3, updated = self.run_test(
+            "If-Match - Missing Header",
+            "PUT",
+            f"/projects/{project_id}",
+            200,
+            {"description": "Unconditional update"}
+        )
+        if success3 and updated.get('version') != version + 2:
+            self.log_test("If-Match - Unconditional Update Applied", False, f"Expected version {version + 2}, got {updated.get('version')}")
+            success3 = False
+        
+        self.run_test("If-Match - Cleanup", "DELETE", f"/projects/{project_id}", 200)
+        return success1 and success2 and success3
+
+    def test_bulk_operations(self):
+        """Test bulk create/update/delete with per-item results"""
+        print("\n" + "="*50)
+        print("TESTING BULK OPERATIONS")
+        print("="*50)
+        
+        def bulk(name, operations, ordered=True):
+            success, response = self.run_test(
+                name, "POST", "/projects/bulk", 200, {"operations": operations, "ordered": ordered}
+            )
+            return [r['status'] if r['status'] != 'error' else r.get('error') for r in response.get('results', [])]
+        
+        def check(name, statuses, expected):
+            success = statuses == expected
+            self.log_test(f"{name} - Results", success, f"Expected {expected}, got {statuses}")
+            return success
+        
+        created = self.run_test("Bulk - Seed", "POST", "/projects/bulk", 200, {"operations": [
+            {"op": "create", "data": {"title": "Bulk A", "description": "d"}},
+            {"op": "create", "data": {"title": "Bulk B", "description": "d"}}
+        ]})[1].get('results', [])
+        if len(created) != 2:
+            return False
+        a_id, b_id = created[0]['id'], created[1]['id']
+        
+        success1 = check("Bulk - Mixed Batch", bulk("Bulk - Mixed Batch", [
+            {"op": "create", "data": {"title": "Bulk C", "description": "d"}},
+            {"op": "update", "id": a_id, "version": 1, "data": {"description": "updated"}},
+            {"op": "delete", "id": b_id}
+        ]), ["ok", "ok", "ok"])
+        
+        success2 = check("Bulk - Stale Version", bulk("Bulk - Stale Version", [
+            {"op": "update", "id": a_id, "version": 1, "data": {"description": "lost update"}}
+        ]), ["version conflict"])
+        _, project = self.run_test("Bulk - Read After Conflict", "GET", f"/projects/{a_id}", 200)
+        if project.get('description') != "updated" or project.get('version') != 2:
+            self.log_test("Bulk - Conflict Leaves Project Unchanged", False, f"Project changed: {project}")
+            success2 = False
+        
+        success3 = check("Bulk - Missing Id", bulk("Bulk - Missing Id", [
+            {"op": "update", "id": b_id, "data": {"description": "gone"}},
+            {"op": "delete", "id": "no-such-project"}
+        ], ordered=False), ["not found", "not found"])
+        
+        success4 = check("Bulk - Duplicate Id", bulk("Bulk - Duplicate Id", [
+            {"op": "update", "id": a_id, "data": {"description": "first"}},
+            {"op": "update", "id": a_id, "data": {"description": "second"}}
+        ], ordered=False), ["ok", "duplicate id in batch"])
+        
+        failing_first = [
+            {"op": "delete", "id": "no-such-project"},
+            {"op": "create", "data": {"title": "Bulk D", "description": "d"}}
+        ]
+        success5 = check("Bulk - Ordered Stops", bulk("Bulk - Ordered Stops", failing_first), ["not found", "skipped"])
+        success6 = check(
+            "Bulk - Unordered Continues",
+            bulk("Bulk - Unordered Continues", failing_first, ordered=False),
+            ["not found", "ok"]
+        )
+        
+        _, remaining = self.run_test("Bulk - List For Cleanup", "GET", "/projects", 200)
+        leftovers = [p['id'] for p in remaining if p['title'].startswith("Bulk ")]
+        if leftovers:
+            bulk("Bulk - Cleanup", [{"op": "delete", "id": project_id} for project_id in leftovers])
+        
+        return success1 and success2 and success3 and success4 and success5 and success6
+
+    def test_change_feed(self):
+        """Test the export change feed: cursor continuity, tombstones and concurrent writes"""
+        print("\n" + "="*50)
+        print("TESTING CHANGE FEED")
+        print("="*50)
+        
+        if not self.user_data or 'unique_slug' not in self.user_data:
+            self.log_test("Change Feed", False, "No user slug available")
+            return False
+        
+        slug = self.user_data['unique_slug']
+        
+        def drain(name, token, limit=2):
+            """Follow next_token until has_more is false; return (changes, final token)"""
+            changes = []
+            while True:
+                success, page = self.run_test(name, "GET", f"/export/{slug}/changes?since={token}&limit={limit}", 200)
+                if not success:
+                    return changes, token
+                changes.extend(page['changes'])
+                token = page['next_token']
+                if not page['has_more']:
+                    return changes, token
+        
+        success, snapshot = self.run_test("Change Feed - Snapshot", "GET", f"/export/{slug}/changes", 200)
+        if not success:
+            return False
+        token = snapshot['next_token']
+        
+        created = []
+        for i in range(3):
+            _, project = self.run_test(f"Change Feed - Create {i}", "POST", "/projects",
+                                       200, {"title": f"Feed {i}", "description": "d"})
+            created.append(project.get('id'))
+        changes, token = drain("Change Feed - After Creates", token)
+        success1 = [(c['op'], c['id']) for c in changes] == [("created", project_id) for project_id in created]
+        self.log_test("Change Feed - Creates In Order", success1, f"Got {changes}")
+        
+        self.run_test("Change Feed - Update", "PUT", f"/projects/{created[0]}", 200, {"description": "edited"})
+        self.run_test("Change Feed - Delete", "DELETE", f"/projects/{created[1]}", 200)
+        changes, token = drain("Change Feed - After Update/Delete", token)
+        success2 = [(c['op'], c['id']) for c in changes] == [("updated", created[0]), ("deleted", created[1])]
+        self.log_test("Change Feed - Update Then Tombstone", success2, f"Got {changes}")
+        
+        _, page = self.run_test("Change Feed - Caught Up", "GET", f"/export/{slug}/changes?since={token}", 200)
+        success3 = page.get('changes') == [] and page.get('next_token') == token
+        self.log_test("Change Feed - No Repeats When Caught Up", success3, f"Got {page}")
+        
+        # Concurrent writes: every change shows up exactly once, however the pages are cut
+        headers = {'Content-Type': 'application/json', 'Authorization': f'Bearer {self.token}'}
+        def create(i):
+            response = requests.post(f"{self.base_url}/projects", json={"title": f"Feed concurrent {i}", "description": "d"},
+                                     headers=headers, timeout=10)
+            return response.json().get('id') if response.status_code == 200 else None
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            concurrent_ids = list(pool.map(create, range(16)))
+        changes, token = drain("Change Feed - After Concurrent Writes", token, limit=3)
+        seen = [c['id'] for c in changes]
+        success4 = None not in concurrent_ids and sorted(seen) == sorted(concurrent_ids)
+        self.log_test("Change Feed - No Gaps Or Duplicates", success4,
+                      f"Wrote {len(concurrent_ids)}, feed returned {len(seen)} ({len(set(seen))} distinct)")
+        
+        for project_id in [created[0], created[2], *concurrent_ids]:
+            if project_id:
+                self.run_test("Change Feed - Cleanup", "DELETE", f"/projects/{project_id}", 200)
+        
+        return success1 and success2 and success3 and success4
+
     def test_delete_operations(self):
         """Test delete operations (cleanup)"""
         print("\n" + "="*50)
@@ -451,8 +751,14 @@ class DevFolioAPITester:
         me_success = self.test_auth_me()
         projects_success = self.test_projects_crud()
         achievements_success = self.test_achievements_crud()
+        pagination_success = self.test_pagination()
+        search_success = self.test_search()
         profile_success = self.test_public_profile()
         export_success = self.test_ai_export()
+        conditional_success = self.test_conditional_requests()
+        if_match_success = self.test_if_match_updates()
+        bulk_success = self.test_bulk_operations()
+        change_feed_success = self.test_change_feed()
         delete_success = self.test_delete_operations()
         
         return self.get_results()
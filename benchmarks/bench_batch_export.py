@@ -0,0 +1,79 @@
+"""
+N single /export/{slug} calls vs. one POST /export/batch for the same slugs.
+
+Seeds N users with a few projects and achievements each, then exports all of
+them both ways with the response cache cleared before each run, and prints
+one JSON object per batch size.
+
+    python benchmarks/bench_batch_export.py --profiles 100 200 500
+    python benchmarks/bench_batch_export.py --profiles 100 --in-memory   # mongomock-motor
+"""
+import argparse
+import asyncio
+import json
+
+from harness import Timer, api_client, drop_database, load_app, register_user
+
+
+async def seed(api, profiles: int, projects: int, achievements: int) -> list:
+    slugs = []
+    for n in range(profiles):
+        headers, user = await register_user(api, name=f"Bench User {n}")
+        operations = [{"op": "create", "data": {
+            "title": f"Project {i}",
+            "description": "Benchmark project " * 5,
+            "readme_content": "Lorem ipsum dolor sit amet. " * 40,
+            "tech_stack": ["Python", "FastAPI"],
+        }} for i in range(projects)]
+        if operations:
+            (await api.post("/projects/bulk", json={"operations": operations}, headers=headers)).raise_for_status()
+        operations = [{"op": "create", "data": {
+            "title": f"Achievement {i}", "description": "Benchmark achievement", "date": "2025-01-01",
+        }} for i in range(achievements)]
+        if operations:
+            (await api.post("/achievements/bulk", json={"operations": operations}, headers=headers)).raise_for_status()
+        slugs.append(user["unique_slug"])
+    return slugs
+
+
+async def main(args):
+    server = load_app(in_memory=args.in_memory)
+    async with api_client(server) as api:
+        slugs = await seed(api, max(args.profiles), args.projects, args.achievements)
+        for profiles in args.profiles:
+            batch_slugs = slugs[:profiles]
+
+            server.profile_cache.clear()
+            with Timer() as single:
+                for slug in batch_slugs:
+                    (await api.get(f"/export/{slug}")).raise_for_status()
+
+            server.profile_cache.clear()
+            with Timer() as batched:
+                lines = 0
+                async with api.stream("POST", "/export/batch", json={"slugs": batch_slugs}) as response:
+                    response.raise_for_status()
+                    async for _ in response.aiter_lines():
+                        lines += 1
+            assert lines == profiles + 1
+
+            print(json.dumps({
+                "profiles": profiles,
+                "projects_per_profile": args.projects,
+                "achievements_per_profile": args.achievements,
+                "single_s": round(single.seconds, 4),
+                "batch_s": round(batched.seconds, 4),
+                "single_queries": profiles * 3,
+                "batch_queries": 3,
+                "speedup": round(single.seconds / batched.seconds, 2),
+            }))
+    await drop_database(server)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--projects", type=int, default=5)
+    parser.add_argument("--achievements", type=int, default=3)
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,99 @@
+"""
+Bulk vs. per-item write throughput for projects and achievements.
+
+Creates N items one POST at a time, then N items with a single
+/projects/bulk (or /achievements/bulk) call, and the same for updates and
+deletes, printing one JSON object per phase.
+
+    python benchmarks/bench_bulk.py --items 200
+    python benchmarks/bench_bulk.py --items 200 --in-memory   # mongomock-motor
+"""
+import argparse
+import asyncio
+import json
+
+from harness import Timer, api_client, drop_database, load_app, register_user
+
+
+def sample_item(kind: str, i: int) -> dict:
+    if kind == "projects":
+        return {
+            "title": f"Project {i}",
+            "description": "Benchmark project " * 5,
+            "readme_content": "# Readme\n" + "Lorem ipsum dolor sit amet. " * 40,
+            "tech_stack": ["Python", "FastAPI", "MongoDB"],
+        }
+    return {"title": f"Achievement {i}", "description": "Benchmark achievement", "date": "2025-01-01"}
+
+
+async def per_item(api, headers, kind, items):
+    ids = []
+    with Timer() as create:
+        for i in range(items):
+            response = await api.post(f"/{kind}", json=sample_item(kind, i), headers=headers)
+            ids.append(response.json()["id"])
+    with Timer() as update:
+        for item_id in ids:
+            await api.put(f"/{kind}/{item_id}", json={"title": "Updated"}, headers=headers)
+    with Timer() as delete:
+        for item_id in ids:
+            await api.delete(f"/{kind}/{item_id}", headers=headers)
+    return {"create": create.seconds, "update": update.seconds, "delete": delete.seconds}
+
+
+async def bulk(api, headers, kind, items, batch_size, ordered):
+    async def run(operations):
+        results = []
+        for start in range(0, len(operations), batch_size):
+            response = await api.post(
+                f"/{kind}/bulk",
+                json={"operations": operations[start:start + batch_size], "ordered": ordered},
+                headers=headers,
+            )
+            response.raise_for_status()
+            results.extend(response.json()["results"])
+        return results
+
+    with Timer() as create:
+        results = await run([{"op": "create", "data": sample_item(kind, i)} for i in range(items)])
+    ids = [r["id"] for r in results]
+    with Timer() as update:
+        await run([{"op": "update", "id": item_id, "data": {"title": "Updated"}} for item_id in ids])
+    with Timer() as delete:
+        await run([{"op": "delete", "id": item_id} for item_id in ids])
+    return {"create": create.seconds, "update": update.seconds, "delete": delete.seconds}
+
+
+async def main(args):
+    server = load_app(in_memory=args.in_memory)
+    async with api_client(server) as api:
+        headers, _ = await register_user(api)
+        for kind in args.kinds:
+            timings = {
+                "per_item": await per_item(api, headers, kind, args.items),
+                "bulk": await bulk(api, headers, kind, args.items, args.batch_size, not args.unordered),
+            }
+            for phase in ("create", "update", "delete"):
+                single, batched = timings["per_item"][phase], timings["bulk"][phase]
+                print(json.dumps({
+                    "collection": kind,
+                    "phase": phase,
+                    "items": args.items,
+                    "batch_size": args.batch_size,
+                    "per_item_s": round(single, 4),
+                    "bulk_s": round(batched, 4),
+                    "per_item_items_per_sec": round(args.items / single, 1),
+                    "bulk_items_per_sec": round(args.items / batched, 1),
+                    "speedup": round(single / batched, 2),
+                }))
+    await drop_database(server)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--kinds", nargs="+", default=["projects", "achievements"])
+    parser.add_argument("--unordered", action="store_true")
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    asyncio.run(main(parser.parse_args()))
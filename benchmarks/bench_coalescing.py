@@ -0,0 +1,90 @@
+"""
+Request coalescing and rate limiting on the public endpoints.
+
+Registers a user with some projects, then fires bursts of --concurrency
+identical profile requests at a cold cache (the user's cache entries are
+invalidated before each burst, as a write would). With coalescing on, the
+burst should cost one user read; with it off, every request reads. Reports
+user reads per burst and burst latency for both, plus the cost of one
+rate limiter acquire. Prints one JSON object.
+
+The in-process engines answer without yielding, so no two requests ever
+overlap; --read-latency-ms adds a simulated round trip to each user read
+to stand in for a real database.
+
+    python benchmarks/bench_coalescing.py --storage memory --read-latency-ms 2
+    python benchmarks/bench_coalescing.py --concurrency 50 --bursts 20   # MONGO_URL
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from harness import api_client, drop_database, load_app, percentile, register_user
+
+
+async def run_bursts(server, api, slug: str, user_id: str, args) -> dict:
+    reads = {"count": 0}
+    get_by_slug = server.storage.public_reads.users.get_by_slug
+
+    async def counted(*a, **kw):
+        reads["count"] += 1
+        if args.read_latency_ms:
+            await asyncio.sleep(args.read_latency_ms / 1000)
+        return await get_by_slug(*a, **kw)
+
+    server.storage.public_reads.users.get_by_slug = counted
+    latencies = []
+    try:
+        for _ in range(args.bursts):
+            server.profile_cache.bump(user_id)
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(api.get(f"/profile/{slug}") for _ in range(args.concurrency)))
+            latencies.append(time.perf_counter() - started)
+            assert all(response.status_code == 200 for response in responses)
+    finally:
+        server.storage.public_reads.users.get_by_slug = get_by_slug
+    return {
+        "user_reads_per_burst": round(reads["count"] / args.bursts, 2),
+        "burst_p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "burst_p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+    }
+
+
+def limiter_cost(iterations: int = 200_000) -> float:
+    from ratelimit import RateLimit, RateLimiter
+
+    limiter = RateLimiter({"bench": RateLimit(1e9, 1e9)})
+    started = time.perf_counter()
+    for i in range(iterations):
+        limiter.acquire("bench", f"ip:10.0.{i % 256}.{i % 200}")
+    return round((time.perf_counter() - started) / iterations * 1e6, 3)
+
+
+async def main(args) -> dict:
+    server = load_app(in_memory=args.in_memory, storage=args.storage)
+    result = {"concurrency": args.concurrency, "bursts": args.bursts}
+    async with api_client(server) as api:
+        headers, user = await register_user(api)
+        for i in range(args.projects):
+            response = await api.post("/projects", headers=headers, json={
+                "title": f"Project {i}", "description": "Benchmark project", "tech_stack": ["python", "react"],
+            })
+            response.raise_for_status()
+        for mode in ("on", "off"):
+            server.PUBLIC_COALESCING = mode
+            result[f"coalescing_{mode}"] = await run_bursts(server, api, user["unique_slug"], user["id"], args)
+    result["rate_limiter_acquire_us"] = limiter_cost()
+    await drop_database(server)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--read-latency-ms", type=float, default=0.0, help="simulated round trip per user read")
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    parser.add_argument("--storage", choices=["mongo", "memory"], help="storage engine (default: STORAGE_BACKEND or mongo)")
+    print(json.dumps(asyncio.run(main(parser.parse_args())), indent=2))
@@ -0,0 +1,299 @@
+"""
+Offline load test: concurrent mixed traffic against the in-process app.
+
+Seeds synthetic users (each with projects and achievements) through the
+public API, then runs `--concurrency` workers that issue `--requests`
+requests drawn from a weighted mix of operations:
+
+    login            POST /auth/login
+    list_projects    GET  /projects
+    create_project   POST /projects
+    update_project   PUT  /projects/{project_id}
+    delete_project   DELETE /projects/{project_id}
+    public_profile   GET  /profile/{slug}
+    export           GET  /export/{slug}
+
+Each worker writes only to its own share of the users (given --users >=
+--concurrency), so concurrent writes never race each other, and draws operations from its own seeded RNG, so a
+given --seed replays the same request sequence per worker.
+
+The result is one JSON document (stdout, and --output if given) with the
+configuration, throughput, p50/p95/p99 per operation and overall, and per
+route DB commands, DB time and connection pool wait per request. DB
+numbers come from the PyMongo command and pool listeners (see
+backend/instrumentation.py) and are only available against a real MongoDB; with --in-memory (mongomock-motor) or
+--storage memory (the app's in-memory engine, no Motor at all) they are
+null. Comparing a --storage memory run with a MongoDB run separates
+framework and handler overhead from database time.
+
+    python benchmarks/bench_load.py --users 200 --concurrency 32 --requests 20000
+    python benchmarks/bench_load.py --in-memory --users 50 --output results.json
+    python benchmarks/bench_load.py --storage memory --users 200 --concurrency 32
+    python benchmarks/bench_load.py --mix public_profile=60,export=30,update_project=10
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from collections import defaultdict
+
+from harness import BACKEND_DIR, BENCH_PASSWORD, Timer, api_client, drop_database, load_app, percentile, register_user
+
+DEFAULT_MIX = "login=2,list_projects=15,create_project=8,update_project=10,delete_project=5,public_profile=35,export=25"
+TECH = ["Python", "FastAPI", "React", "TypeScript", "Node.js", "MongoDB", "PostgreSQL", "Docker", "Go", "Rust"]
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise SystemExit(f"unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def project_data(rng: random.Random, n: int) -> dict:
+    return {
+        "title": f"Project {n}",
+        "description": "Synthetic load-test project " * rng.randint(1, 4),
+        "readme_content": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * rng.randint(5, 60),
+        "tech_stack": rng.sample(TECH, rng.randint(1, 4)),
+        "github_link": f"https://github.com/example/project-{n}",
+    }
+
+
+async def seed_user(api, rng: random.Random, n: int, projects: int, achievements: int) -> dict:
+    headers, user = await register_user(api, name=f"Load User {n}")
+    operations = [{"op": "create", "data": project_data(rng, i)} for i in range(projects)]
+    project_ids = []
+    if operations:
+        response = await api.post("/projects/bulk", json={"operations": operations}, headers=headers)
+        response.raise_for_status()
+        project_ids = [result["id"] for result in response.json()["results"]]
+    operations = [{"op": "create", "data": {
+        "title": f"Achievement {i}", "description": "Synthetic load-test achievement", "date": "2025-01-01",
+    }} for i in range(achievements)]
+    if operations:
+        (await api.post("/achievements/bulk", json={"operations": operations}, headers=headers)).raise_for_status()
+    return {"headers": headers, "email": user["email"], "slug": user["unique_slug"], "project_ids": project_ids}
+
+
+async def seed(api, args) -> list:
+    rng = random.Random(args.seed)
+    limit = asyncio.Semaphore(args.seed_concurrency)
+    rngs = [random.Random(rng.random()) for _ in range(args.users)]
+
+    async def one(n):
+        async with limit:
+            return await seed_user(api, rngs[n], n, args.projects, args.achievements)
+
+    return await asyncio.gather(*(one(n) for n in range(args.users)))
+
+
+# Each operation takes (api, rng, user it may write to, any user to read) and returns the response
+async def op_login(api, rng, own, other):
+    return await api.post("/auth/login", json={"email": other["email"], "password": BENCH_PASSWORD})
+
+
+async def op_list_projects(api, rng, own, other):
+    return await api.get("/projects", headers=own["headers"])
+
+
+async def op_create_project(api, rng, own, other):
+    response = await api.post("/projects", json=project_data(rng, rng.randrange(10 ** 6)), headers=own["headers"])
+    if response.status_code == 200:
+        own["project_ids"].append(response.json()["id"])
+    return response
+
+
+async def op_update_project(api, rng, own, other):
+    if not own["project_ids"]:
+        return await op_create_project(api, rng, own, other)
+    project_id = rng.choice(own["project_ids"])
+    return await api.put(f"/projects/{project_id}", json={"description": f"Updated {rng.random()}"},
+                         headers=own["headers"])
+
+
+async def op_delete_project(api, rng, own, other):
+    if len(own["project_ids"]) <= 1:
+        return await op_create_project(api, rng, own, other)
+    project_id = own["project_ids"].pop(rng.randrange(len(own["project_ids"])))
+    return await api.delete(f"/projects/{project_id}", headers=own["headers"])
+
+
+async def op_public_profile(api, rng, own, other):
+    return await api.get(f"/profile/{other['slug']}")
+
+
+async def op_export(api, rng, own, other):
+    return await api.get(f"/export/{other['slug']}")
+
+
+OPERATIONS = {
+    "login": op_login,
+    "list_projects": op_list_projects,
+    "create_project": op_create_project,
+    "update_project": op_update_project,
+    "delete_project": op_delete_project,
+    "public_profile": op_public_profile,
+    "export": op_export,
+}
+
+
+async def run_workers(api, users: list, mix: dict, args, requests: int, seed_offset: int) -> list:
+    names, weights = list(mix), list(mix.values())
+    per_worker = [requests // args.concurrency + (i < requests % args.concurrency) for i in range(args.concurrency)]
+    samples = []  # (operation, seconds, status)
+
+    async def worker(index: int):
+        rng = random.Random(args.seed * 1000 + seed_offset + index)
+        own_users = users[index::args.concurrency] or users
+        for _ in range(per_worker[index]):
+            name = rng.choices(names, weights)[0]
+            own, other = rng.choice(own_users), rng.choice(users)
+            started = time.perf_counter()
+            try:
+                status = (await OPERATIONS[name](api, rng, own, other)).status_code
+            except Exception:
+                status = 0
+            samples.append((name, time.perf_counter() - started, status))
+
+    await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+    return samples
+
+
+def latency_summary(latencies: list, seconds: float) -> dict:
+    return {
+        "count": len(latencies),
+        "throughput_rps": round(len(latencies) / seconds, 1) if seconds else None,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def route_counters(instrumentation) -> dict:
+    """Requests, DB commands and DB seconds so far, per route template."""
+    routes = defaultdict(lambda: {"requests": 0, "db_ops": 0.0, "db_seconds": 0.0, "pool_wait_seconds": 0.0})
+    for (route, _, _), counter in instrumentation.http_requests_total.counters.items():
+        routes[route]["requests"] += counter.value
+    for (route,), counter in instrumentation.request_db_operations.counters.items():
+        routes[route]["db_ops"] += counter.value
+    for (route,), counter in instrumentation.request_db_seconds.counters.items():
+        routes[route]["db_seconds"] += counter.value
+    for (route,), counter in instrumentation.request_pool_wait_seconds.counters.items():
+        routes[route]["pool_wait_seconds"] += counter.value
+    return routes
+
+
+def route_report(before: dict, after: dict, measured: bool) -> dict:
+    report = {}
+    for route, totals in sorted(after.items()):
+        previous = before.get(route, {"requests": 0, "db_ops": 0.0, "db_seconds": 0.0, "pool_wait_seconds": 0.0})
+        requests = totals["requests"] - previous["requests"]
+        if not requests:
+            continue
+        db_ops = totals["db_ops"] - previous["db_ops"]
+        db_seconds = totals["db_seconds"] - previous["db_seconds"]
+        pool_wait = totals["pool_wait_seconds"] - previous["pool_wait_seconds"]
+        report[route] = {
+            "requests": int(requests),
+            "db_ops_per_request": round(db_ops / requests, 2) if measured else None,
+            "db_ms_per_request": round(db_seconds / requests * 1000, 3) if measured else None,
+            "pool_wait_ms_per_request": round(pool_wait / requests * 1000, 3) if measured else None,
+        }
+    return report
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+async def main(args):
+    mix = parse_mix(args.mix)
+    server = load_app(in_memory=args.in_memory, storage=args.storage)
+    measured = server.STORAGE_BACKEND != "memory" and not args.in_memory
+    import instrumentation
+
+    async with api_client(server) as api:
+        with Timer() as seeding:
+            users = await seed(api, args)
+        if args.warmup:
+            await run_workers(api, users, mix, args, args.warmup, seed_offset=500)
+
+        before = route_counters(instrumentation)
+        with Timer() as run:
+            samples = await run_workers(api, users, mix, args, args.requests, seed_offset=0)
+        after = route_counters(instrumentation)
+    if not args.keep_database:
+        await drop_database(server)
+
+    by_operation = defaultdict(list)
+    errors = defaultdict(int)
+    for name, seconds, status in samples:
+        by_operation[name].append(seconds)
+        if not 200 <= status < 400:
+            errors[name] += 1
+
+    result = {
+        "benchmark": "load",
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - run.seconds)),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "database": "memory" if server.STORAGE_BACKEND == "memory" else "mongomock" if args.in_memory else "mongodb",
+        "config": {
+            "users": args.users,
+            "projects_per_user": args.projects,
+            "achievements_per_user": args.achievements,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "mix": mix,
+        },
+        "seed_seconds": round(seeding.seconds, 3),
+        "seconds": round(run.seconds, 3),
+        "total": {**latency_summary([s for _, s, _ in samples], run.seconds), "errors": sum(errors.values())},
+        "operations": {
+            name: {**latency_summary(by_operation[name], run.seconds), "errors": errors[name]}
+            for name in mix if by_operation[name]
+        },
+        "db_ops_measured": measured,
+        "routes": route_report(before, after, measured=measured),
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--projects", type=int, default=8, help="projects seeded per user")
+    parser.add_argument("--achievements", type=int, default=4, help="achievements seeded per user")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200, help="unrecorded requests before the run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="comma-separated operation=weight pairs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--seed-concurrency", type=int, default=8, help="users registered at once while seeding")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    parser.add_argument("--keep-database", action="store_true", help="do not drop the benchmark database")
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    parser.add_argument("--storage", choices=["mongo", "memory"], help="storage engine (default: STORAGE_BACKEND or mongo)")
+    args = parser.parse_args()
+    if args.concurrency < 1 or args.users < 1:
+        parser.error("--users and --concurrency must be at least 1")
+    asyncio.run(main(args))
@@ -0,0 +1,104 @@
+"""
+Password hashing benchmark: login throughput vs. latency of concurrent reads.
+
+Runs a stream of concurrent logins (scrypt verify) next to a simulated read
+workload on the same event loop, once with hashing inline on the loop (what
+server.py used to do) and once through the PasswordHasher thread pool, and
+prints one JSON object per mode.
+
+    python benchmarks/bench_password_hashing.py --duration 5 --login-concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from passwords import PasswordHasher  # noqa: E402
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def reader(stop_at, latencies, interval):
+    """Simulates a cheap read handler: yield to the loop, do a little JSON work."""
+    payload = {"title": "Project", "tech_stack": ["Python", "FastAPI"] * 5, "description": "x" * 500}
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        await asyncio.sleep(0)
+        json.dumps(payload)
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+
+
+async def login_worker(stop_at, hasher, stored, inline, counter):
+    while time.perf_counter() < stop_at:
+        if inline:
+            ok = hasher.verify_sync("correct horse battery staple", stored)
+            await asyncio.sleep(0)
+        else:
+            ok = await hasher.verify("correct horse battery staple", stored)
+        assert ok
+        counter[0] += 1
+
+
+async def run(mode, args):
+    hasher = PasswordHasher(
+        n=args.n, workers=args.workers, max_concurrency=args.max_concurrency, queue_timeout=60
+    )
+    stored = hasher.hash_sync("correct horse battery staple")
+    latencies, logins = [], [0]
+    started = time.perf_counter()
+    stop_at = started + args.duration
+
+    tasks = [reader(stop_at, latencies, args.read_interval) for _ in range(args.readers)]
+    tasks += [
+        login_worker(stop_at, hasher, stored, mode == "inline", logins)
+        for _ in range(args.login_concurrency)
+    ]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    hasher.shutdown()
+
+    return {
+        "mode": mode,
+        "scrypt_n": args.n,
+        "workers": args.workers if mode == "pool" else 0,
+        "login_concurrency": args.login_concurrency,
+        "duration_s": round(elapsed, 3),
+        "logins": logins[0],
+        "logins_per_sec": round(logins[0] / elapsed, 2),
+        "reads": len(latencies),
+        "read_p50_ms": round(statistics.median(latencies) * 1000, 3) if latencies else 0.0,
+        "read_p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "read_max_ms": round(max(latencies) * 1000, 3) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["inline", "pool", "both"], default="both")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per mode")
+    parser.add_argument("--n", type=int, default=2 ** 14, help="scrypt cost parameter")
+    parser.add_argument("--workers", type=int, default=4, help="hashing thread pool size")
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--login-concurrency", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=20, help="concurrent simulated read clients")
+    parser.add_argument("--read-interval", type=float, default=0.002, help="pause between reads per client")
+    args = parser.parse_args()
+
+    modes = ["inline", "pool"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        print(json.dumps(asyncio.run(run(mode, args))))
+
+
+if __name__ == "__main__":
+    main()
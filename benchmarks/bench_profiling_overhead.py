@@ -0,0 +1,93 @@
+"""
+Cost of the request profiling hook when it is off, armed elsewhere, and capturing.
+
+Two measurements, printed as one JSON object each:
+
+- "dispatch": ProfilingMiddleware around a no-op ASGI app vs. the bare app,
+  in nanoseconds per call, with no rule armed and with a rule for another
+  route. This isolates the per-request cost the hook adds when idle.
+- "request": p50/p99 of GET /api/health through the full app (httpx over
+  ASGI, no network) with profiling off, armed for another route, and
+  capturing every request in each mode.
+
+    python benchmarks/bench_profiling_overhead.py --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from harness import api_client, load_app, percentile
+
+
+async def noop_app(scope, receive, send):
+    pass
+
+
+async def time_dispatch(app, calls: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/api/health"}
+    started = time.perf_counter_ns()
+    for _ in range(calls):
+        await app(scope, None, None)
+    return (time.perf_counter_ns() - started) / calls
+
+
+async def time_requests(api, count: int) -> list:
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        (await api.get("/health")).raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def main(args):
+    server = load_app(in_memory=True)
+    from profiling import ProfilingMiddleware, RequestProfiler
+
+    profiler = RequestProfiler()
+    wrapped = ProfilingMiddleware(noop_app, profiler)
+    bare_ns = min([await time_dispatch(noop_app, args.calls) for _ in range(5)])
+    idle_ns = min([await time_dispatch(wrapped, args.calls) for _ in range(5)])
+    profiler.arm(server.make_profile_rule(server.ProfilingRuleRequest(route="/api/export/{slug}")))
+    elsewhere_ns = min([await time_dispatch(wrapped, args.calls) for _ in range(5)])
+    print(json.dumps({
+        "phase": "dispatch",
+        "bare_ns": round(bare_ns, 1),
+        "off_overhead_ns": round(idle_ns - bare_ns, 1),
+        "armed_elsewhere_overhead_ns": round(elsewhere_ns - bare_ns, 1),
+    }))
+
+    rules = {
+        "off": None,
+        "armed_elsewhere": server.ProfilingRuleRequest(route="/api/export/{slug}"),
+        "cprofile": server.ProfilingRuleRequest(route="/api/health"),
+        "sample": server.ProfilingRuleRequest(route="/api/health", mode="sample"),
+    }
+    async with api_client(server) as api:
+        await time_requests(api, 200)  # warm up
+        baseline = None
+        for name, spec in rules.items():
+            server.request_profiler.disarm()
+            if spec is not None:
+                server.request_profiler.arm(server.make_profile_rule(spec))
+            latencies = await time_requests(api, args.requests)
+            p50 = statistics.median(latencies)
+            baseline = baseline or p50
+            print(json.dumps({
+                "phase": "request",
+                "profiling": name,
+                "requests": args.requests,
+                "p50_us": round(p50 * 1e6, 1),
+                "p99_us": round(percentile(latencies, 0.99) * 1e6, 1),
+                "p50_vs_off": round(p50 / baseline, 3),
+            }))
+        server.request_profiler.disarm()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--calls", type=int, default=200000, help="middleware calls per dispatch timing")
+    asyncio.run(main(parser.parse_args()))
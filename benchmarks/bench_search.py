@@ -0,0 +1,115 @@
+"""
+Search index build time and query latency over a synthetic corpus.
+
+Builds a SearchIndex from N generated projects (no database involved), then
+runs each query shape repeatedly and prints one JSON object per shape with
+p50/p99 latency and the number of matches. Text is drawn from a Zipf-like
+vocabulary of 20k filler terms with the topical words used by the queries
+spread through its middle ranks; "worst_case" queries the single most
+frequent term, which appears in nearly every project.
+
+    python benchmarks/bench_search.py --projects 100000 --repeat 200
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+
+from harness import BACKEND_DIR, Timer, percentile
+
+sys.path.insert(0, BACKEND_DIR)
+
+from search import SearchIndex  # noqa: E402
+
+TECH = ["Python", "FastAPI", "Django", "React", "Node.js", "TypeScript", "Go", "Rust", "MongoDB",
+        "PostgreSQL", "Redis", "Docker", "Kubernetes", "AWS", "TensorFlow", "PyTorch", "Vue.js", "Java"]
+COMMON_WORDS = ("api service dashboard realtime chat machine learning model pipeline data analytics "
+                "mobile app web portfolio game engine compiler search index cache queue stream graph "
+                "payment auth blog scraper bot monitoring cli tool library framework plugin").split()
+VOCABULARY = [f"term{i}" for i in range(20000)]
+for rank, word in enumerate(COMMON_WORDS):
+    VOCABULARY.insert(100 + 20 * rank, word)
+CUM_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+QUERIES = {
+    "one_term": {"query": "chat"},
+    "three_terms": {"query": "realtime data pipeline"},
+    "rare_terms": {"query": "term4000 term12000"},
+    "worst_case": {"query": "term0"},
+    "term_and_tech": {"query": "dashboard", "tech": ["react"]},
+    "tech_only": {"tech": ["python", "postgres"]},
+    "deep_page": {"query": "api service", "offset": 500},
+}
+
+
+def sample_project(rng: random.Random, i: int) -> dict:
+    def words(n):
+        return " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=n))
+    return {
+        "id": f"p{i}",
+        "user_id": f"u{i // 10}",
+        "title": words(3).title(),
+        "description": words(20),
+        "readme_content": words(rng.randint(50, 300)),
+        "tech_stack": rng.sample(TECH, rng.randint(2, 5)),
+        "created_at": f"2025-01-01T00:00:{i:09d}",
+        "version": 1,
+    }
+
+
+async def replay(projects: list):
+    for project in projects:
+        yield project
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    projects = [sample_project(rng, i) for i in range(args.projects)]
+    index = SearchIndex()
+    with Timer() as build:
+        asyncio.run(index.rebuild(replay(projects)))
+    print(json.dumps({
+        "phase": "build",
+        "projects": args.projects,
+        "seconds": round(build.seconds, 3),
+        "terms": len(index.postings),
+        "tech_tags": len(index.tag_postings),
+    }))
+
+    update = sample_project(rng, 0)
+    with Timer() as reindex:
+        for i in range(args.repeat):
+            index.add({**update, "version": i + 2})
+    print(json.dumps({"phase": "update", "us_per_add": round(reindex.seconds / args.repeat * 1e6, 1)}))
+
+    for name, params in QUERIES.items():
+        latencies, total = [], 0
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            total, _ = index.search(
+                params.get("query", ""), params.get("tech", ()), limit=args.limit, offset=params.get("offset", 0)
+            )
+            latencies.append(time.perf_counter() - started)
+        print(json.dumps({
+            "phase": "query",
+            "shape": name,
+            "projects": args.projects,
+            "matches": total,
+            "p50_ms": round(statistics.median(latencies) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        }))
+
+
+if __name__ == "__main__":
+    main()
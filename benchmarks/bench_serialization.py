@@ -0,0 +1,99 @@
+"""
+Serialization cost per response of N projects, for each rendering path.
+
+Paths:
+  validated/stdlib    response_model validation + JSONResponse (FastAPI default)
+  validated/orjson    response_model validation + ORJSONResponse (FAST_JSON)
+  encoded/stdlib      jsonable_encoder + JSONResponse (routes without a response_model)
+  trusted/stdlib      raw documents straight into JSONResponse (TRUSTED_OUTPUT)
+  trusted/orjson      raw documents straight into ORJSONResponse (TRUSTED_OUTPUT + FAST_JSON)
+
+    python benchmarks/bench_serialization.py --projects 100 --repeat 200
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from starlette.responses import JSONResponse
+
+from harness import load_app
+
+
+def sample_projects(count: int, readme_bytes: int) -> list:
+    now = "2025-01-01T00:00:00+00:00"
+    return [{
+        "id": str(uuid.uuid4()),
+        "user_id": "bench-user",
+        "title": f"Project {i}",
+        "description": "A project used to measure serialization cost. " * 3,
+        "readme_content": ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 64)[:readme_bytes],
+        "tech_stack": ["Python", "FastAPI", "MongoDB", "React"],
+        "github_link": "https://github.com/example/project",
+        "live_demo_link": "https://example.com",
+        "created_at": now,
+        "updated_at": now,
+        "version": 1,
+    } for i in range(count)]
+
+
+async def measure(render, docs, repeat: int) -> dict:
+    size = len(await render(docs))
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await render(docs)
+    per_call = (time.perf_counter() - started) / repeat
+    return {"us_per_response": round(per_call * 1e6, 1), "bytes": size}
+
+
+async def main(args):
+    server = load_app()
+    field = create_response_field(name="Response", type_=List[server.ProjectResponse], mode="serialization")
+
+    def validated(response_class):
+        async def render(docs):
+            content = await serialize_response(field=field, response_content=docs)
+            return response_class(content).body
+        return render
+
+    async def encoded(docs):
+        return JSONResponse(jsonable_encoder(docs)).body
+
+    def trusted(response_class):
+        async def render(docs):
+            return response_class(docs).body
+        return render
+
+    paths = {
+        "validated/stdlib": validated(JSONResponse),
+        "validated/orjson": validated(ORJSONResponse),
+        "encoded/stdlib": encoded,
+        "trusted/stdlib": trusted(JSONResponse),
+        "trusted/orjson": trusted(ORJSONResponse),
+    }
+    docs = sample_projects(args.projects, args.readme_bytes)
+    baseline = None
+    for name, render in paths.items():
+        result = await measure(render, docs, args.repeat)
+        baseline = baseline or result["us_per_response"]
+        print(json.dumps({
+            "path": name,
+            "projects": args.projects,
+            "readme_bytes": args.readme_bytes,
+            **result,
+            "speedup_vs_default": round(baseline / result["us_per_response"], 2),
+        }))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--readme-bytes", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,110 @@
+"""
+Slug filter (Bloom filter) false-positive rate, memory and speed.
+
+Fills a filter with N slugs shaped like the app's ("ann-dev-1a2b3c4d"),
+probes N slugs that were never added and reports the measured
+false-positive rate next to the target, the filter's size (and per million
+slugs), and add/lookup cost. A Python set of the same slugs is measured
+for comparison. Prints one JSON object per (N, target rate).
+
+With --app it also times 404s for unknown slugs through the in-process
+app with the filter loaded and with it disabled.
+
+    python benchmarks/bench_slug_filter.py --slugs 100000 1000000 --fp-rate 0.01 0.001
+    python benchmarks/bench_slug_filter.py --slugs 100000 --app --in-memory
+"""
+import argparse
+import asyncio
+import json
+import secrets
+import sys
+import time
+
+from harness import BACKEND_DIR, api_client, drop_database, load_app, percentile, register_user
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from slugs import BloomFilter  # noqa: E402
+
+
+def make_slugs(count: int, prefix: str) -> list:
+    return [f"{prefix}-dev-{secrets.token_hex(4)}" for _ in range(count)]
+
+
+def deep_set_size(values: set) -> int:
+    return sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+
+
+def measure_filter(count: int, fp_rate: float) -> dict:
+    known, unknown = make_slugs(count, "known"), make_slugs(count, "probe")
+    bloom = BloomFilter(count, fp_rate)
+
+    started = time.perf_counter()
+    for slug in known:
+        bloom.add(slug)
+    add_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    false_positives = sum(slug in bloom for slug in unknown)
+    lookup_seconds = time.perf_counter() - started
+    assert all(slug in bloom for slug in known[:1000])
+
+    memory = len(bloom.bits)
+    return {
+        "slugs": count,
+        "target_fp_rate": fp_rate,
+        "measured_fp_rate": round(false_positives / count, 6),
+        "estimated_fp_rate": round(bloom.estimated_fp_rate(), 6),
+        "bits": bloom.num_bits,
+        "hashes": bloom.num_hashes,
+        "memory_bytes": memory,
+        "memory_mb_per_million": round(memory / count * 1_000_000 / 2 ** 20, 3),
+        "python_set_mb_per_million": round(deep_set_size(set(known)) / count * 1_000_000 / 2 ** 20, 1),
+        "add_us": round(add_seconds / count * 1e6, 3),
+        "lookup_us": round(lookup_seconds / count * 1e6, 3),
+    }
+
+
+async def measure_app(args) -> dict:
+    server = load_app(in_memory=args.in_memory, storage=args.storage)
+    probes = make_slugs(args.requests, "probe")
+    result = {}
+    async with api_client(server) as api:
+        for _ in range(args.users):
+            await register_user(api)
+        await server.rebuild_slug_filter()
+        for label, enabled in (("filter_on", True), ("filter_off", False)):
+            server.slug_filter.ready = enabled
+            latencies = []
+            for slug in probes:
+                started = time.perf_counter()
+                response = await api.get(f"/profile/{slug}")
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 404
+            result[label] = {
+                "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+            }
+    await drop_database(server)
+    return {"app_unknown_slug_404": result, "users": args.users, "requests": args.requests}
+
+
+def main(args):
+    for count in args.slugs:
+        for fp_rate in args.fp_rate:
+            print(json.dumps(measure_filter(count, fp_rate)))
+    if args.app:
+        print(json.dumps(asyncio.run(measure_app(args))))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slugs", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--fp-rate", type=float, nargs="+", default=[0.01, 0.001])
+    parser.add_argument("--app", action="store_true", help="also time unknown-slug 404s through the app")
+    parser.add_argument("--users", type=int, default=50, help="users registered for --app")
+    parser.add_argument("--requests", type=int, default=2000, help="unknown-slug requests per --app run")
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    parser.add_argument("--storage", choices=["mongo", "memory"], help="storage engine (default: STORAGE_BACKEND or mongo)")
+    main(parser.parse_args())
@@ -0,0 +1,88 @@
+"""
+Cold start: import time, startup (lifespan) time and first-request latencies.
+
+Every run is a fresh interpreter, so imports and lazily initialised state
+are really cold. A run imports the app, enters its lifespan, waits until the
+warm-up reports ready (if the app has one), then times the first request of
+each kind: /api/health, register, a public profile and a markdown export
+(which streams). Prints one JSON object with the median over --runs.
+
+    python benchmarks/bench_startup.py --storage memory --runs 7
+    python benchmarks/bench_startup.py --in-memory              # mongomock-motor
+    python benchmarks/bench_startup.py                          # MONGO_URL
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+async def child(args) -> dict:
+    started = time.perf_counter()
+    from harness import api_client, drop_database, load_app
+
+    server = load_app(in_memory=args.in_memory, storage=args.storage)
+    result = {"import_ms": (time.perf_counter() - started) * 1000}
+
+    async with server.app.router.lifespan_context(server.app):
+        result["startup_ms"] = (time.perf_counter() - started) * 1000 - result["import_ms"]
+        warmup = getattr(server, "warmup", None)
+        while warmup is not None and not warmup.ready:
+            await asyncio.sleep(0.001)
+        result["ready_ms"] = (time.perf_counter() - started) * 1000
+
+        async with api_client(server) as api:
+            async def first(name, request):
+                began = time.perf_counter()
+                response = await request
+                response.raise_for_status()
+                result[f"first_{name}_ms"] = (time.perf_counter() - began) * 1000
+                return response
+
+            await first("health", api.get("/health"))
+            body = (await first("register", api.post("/auth/register", json={
+                "email": "startup@example.com", "name": "Startup Bench", "password": "benchmark-password",
+            }))).json()
+            slug = body["user"]["unique_slug"]
+            await first("profile", api.get(f"/profile/{slug}"))
+            await first("markdown_export", api.get(f"/export/{slug}", params={"format": "markdown"}))
+        result["first_requests_done_ms"] = (time.perf_counter() - started) * 1000
+    await drop_database(server)
+    return result
+
+
+def run_child(args) -> dict:
+    command = [sys.executable, os.path.abspath(__file__), "--child"]
+    if args.in_memory:
+        command.append("--in-memory")
+    if args.storage:
+        command += ["--storage", args.storage]
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(args):
+    runs = [run_child(args) for _ in range(args.runs)]
+    print(json.dumps({
+        "benchmark": "startup",
+        "runs": args.runs,
+        "database": args.storage or ("mongomock" if args.in_memory else "mongodb"),
+        "median": {key: round(statistics.median(run[key] for run in runs), 2) for key in runs[0]},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    parser.add_argument("--storage", choices=["mongo", "memory"], help="storage engine (default: STORAGE_BACKEND or mongo)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(asyncio.run(child(args))))
+    else:
+        main(args)
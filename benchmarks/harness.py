@@ -0,0 +1,90 @@
+"""
+Shared helpers for the in-process API benchmarks.
+
+`load_app` imports backend/server.py with a benchmark database and returns
+the module; `api_client` wraps it in an httpx AsyncClient over ASGI so no
+network or uvicorn is involved. Benchmarks need `httpx`, plus either a
+reachable MongoDB (MONGO_URL) or, with `in_memory=True`, `mongomock-motor`.
+With `storage="memory"` the app uses its own in-memory storage engine
+instead of Motor, which leaves only framework and handler time.
+"""
+import logging
+import os
+import sys
+import time
+import uuid
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+BENCH_PASSWORD = "benchmark-password"
+
+
+def load_app(in_memory: bool = False, db_name: str = None, storage: str = None):
+    """Import the server module pointed at a throwaway database."""
+    if storage:
+        os.environ["STORAGE_BACKEND"] = storage
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ["DB_NAME"] = db_name or f"devfolio_bench_{uuid.uuid4().hex[:8]}"
+    os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+    # Benchmarks hammer the public endpoints from one address; don't let the rate limits skew them
+    os.environ.setdefault("RATE_LIMITS", "")
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+    import server
+
+    # server.py configures INFO logging; per-request client logs would swamp the output
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if in_memory and server.STORAGE_BACKEND != "memory":
+        from mongomock_motor import AsyncMongoMockClient
+        from repositories import MotorStorage
+
+        server.client = AsyncMongoMockClient()
+        server.db = server.client[os.environ["DB_NAME"]]
+        server.storage = MotorStorage(server.db)
+    # The app normally opens its storage on startup; benchmarks drive it without the lifespan
+    server.open_storage()
+    return server
+
+
+def api_client(server):
+    import httpx
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=server.app),
+        base_url="http://bench/api",
+        timeout=60,
+    )
+
+
+async def drop_database(server):
+    if server.STORAGE_BACKEND == "memory":
+        return
+    await server.client.drop_database(os.environ["DB_NAME"])
+
+
+async def register_user(api, name: str = "Bench User") -> tuple:
+    """Register a fresh user; returns (auth headers, user dict)."""
+    response = await api.post("/auth/register", json={
+        "email": f"bench-{uuid.uuid4().hex[:12]}@example.com",
+        "name": name,
+        "password": BENCH_PASSWORD,
+    })
+    response.raise_for_status()
+    body = response.json()
+    return {"Authorization": f"Bearer {body['access_token']}"}, body["user"]
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Timer:
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.started
@@ -98,7 +98,7 @@ export default function AchievementsPage() {
         await axios.put(
           `${API_URL}/achievements/${editingAchievement.id}`,
           formData,
-          { headers: getAuthHeaders() }
+          { headers: { ...getAuthHeaders(), 'If-Match': `"${editingAchievement.version || 0}"` } }
         );
         toast.success('Achievement updated!');
       } else {
@@ -112,7 +112,13 @@ export default function AchievementsPage() {
       setModalOpen(false);
       fetchAchievements();
     } catch (error) {
-      toast.error('Failed to save achievement');
+      if (error.response?.status === 412) {
+        toast.error('This achievement was changed elsewhere. Reload and try again.');
+        setModalOpen(false);
+        fetchAchievements();
+      } else {
+        toast.error('Failed to save achievement');
+      }
     } finally {
       setSaving(false);
     }
@@ -106,7 +106,7 @@ export default function ProjectsPage() {
         await axios.put(
           `${API_URL}/projects/${editingProject.id}`,
           formData,
-          { headers: getAuthHeaders() }
+          { headers: { ...getAuthHeaders(), 'If-Match': `"${editingProject.version || 0}"` } }
         );
         toast.success('Project updated!');
       } else {
@@ -120,7 +120,13 @@ export default function ProjectsPage() {
       setModalOpen(false);
       fetchProjects();
     } catch (error) {
-      toast.error('Failed to save project');
+      if (error.response?.status === 412) {
+        toast.error('This project was changed elsewhere. Reload and try again.');
+        setModalOpen(false);
+        fetchProjects();
+      } else {
+        toast.error('Failed to save project');
+      }
     } finally {
       setSaving(false);
     }
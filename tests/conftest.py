@@ -0,0 +1,66 @@
+"""
+Shared pytest setup: the backend modules are imported from backend/, and the app runs on
+the in-memory storage engine, so the suite needs no MongoDB server.
+"""
+import os
+import sys
+import time
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "devfolio_test")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("PROFILING_ADMIN_TOKEN", "test-admin-token")
+# Every TestClient request comes from one address; tests that need limits install their own
+os.environ.setdefault("RATE_LIMITS", "")
+
+
+@pytest.fixture(scope="session")
+def client():
+    """A TestClient with the app started (lifespan run) once for the whole session."""
+    from fastapi.testclient import TestClient
+    import server
+    
+    with TestClient(server.app) as test_client:
+        while not server.warmup.ready:
+            time.sleep(0.01)
+        yield test_client
+
+
+@pytest.fixture
+def register(client):
+    """Register a fresh user; returns (auth headers, user)."""
+    def register_user(name: str = "Test User"):
+        email = f"user{time.time_ns()}@example.com"
+        response = client.post("/api/auth/register", json={"email": email, "name": name, "password": "testpass123"})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        return {"Authorization": f"Bearer {body['access_token']}"}, body["user"]
+    return register_user
+
+
+@pytest.fixture
+def portfolio(client, register):
+    """Register a user and give them projects and achievements; returns (auth headers, user)."""
+    def make_portfolio(projects: int = 3, achievements: int = 2, readme: str = "Some notes. " * 40):
+        headers, user = register()
+        for n in range(projects):
+            response = client.post("/api/projects", headers=headers, json={
+                "title": f"Project {n}",
+                "description": f"Description of project {n}",
+                "readme_content": readme,
+                "tech_stack": ["Python", "FastAPI"] if n % 2 == 0 else ["React"],
+            })
+            assert response.status_code == 200, response.text
+        for n in range(achievements):
+            response = client.post("/api/achievements", headers=headers, json={
+                "title": f"Award {n}", "description": f"Won award {n}", "date": f"2024-0{n + 1}-01"
+            })
+            assert response.status_code == 200, response.text
+        return headers, user
+    return make_portfolio
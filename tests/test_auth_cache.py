@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import cache
+import server
+from cache import SingleFlight, TTLCache
+
+
+@pytest.fixture
+def auth_cache(monkeypatch):
+    fresh = TTLCache(max_entries=100, ttl_seconds=30)
+    monkeypatch.setattr(server, "auth_user_cache", fresh)
+    monkeypatch.setattr(server, "auth_user_lookups", SingleFlight())
+    return fresh
+
+
+@pytest.fixture
+def user_reads(monkeypatch):
+    """Counts (and slows down) the user-document reads load_auth_user makes."""
+    calls = []
+    get = server.storage.users.get
+    
+    async def slow_get(user_id, projection):
+        calls.append(user_id)
+        await asyncio.sleep(0.05)
+        return await get(user_id, projection)
+    
+    monkeypatch.setattr(server.storage.users, "get", slow_get)
+    return calls
+
+
+def test_authenticated_requests_hit_the_cache(client, register, auth_cache, user_reads):
+    headers, user = register()
+    
+    for _ in range(5):
+        response = client.get("/api/auth/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["unique_slug"] == user["unique_slug"]
+    
+    assert user_reads == [user["id"]]
+    stats = auth_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (4, 1, 0.8)
+
+
+def test_concurrent_misses_share_one_read(register, auth_cache, user_reads):
+    _, user = register()
+    
+    async def load_many():
+        return await asyncio.gather(*(server.load_auth_user(user["id"]) for _ in range(10)))
+    
+    loaded = asyncio.run(load_many())
+    assert user_reads == [user["id"]]
+    assert all(doc == loaded[0] for doc in loaded) and loaded[0]["id"] == user["id"]
+    assert server.auth_user_lookups.stats() == {"in_flight": 0, "calls": 1, "coalesced": 9}
+    
+    assert asyncio.run(server.load_auth_user(user["id"])) == loaded[0]
+    assert user_reads == [user["id"]]
+
+
+def test_cached_user_expires_after_the_ttl(register, auth_cache, user_reads, monkeypatch):
+    _, user = register()
+    now = [1000.0]
+    # Only the cache's clock: the event loop keeps using the real one
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    
+    asyncio.run(server.load_auth_user(user["id"]))
+    now[0] += 29
+    asyncio.run(server.load_auth_user(user["id"]))
+    assert len(user_reads) == 1
+    
+    now[0] += 2
+    asyncio.run(server.load_auth_user(user["id"]))
+    assert len(user_reads) == 2
+    assert auth_cache.stats()["expirations"] == 1
+
+
+def test_unknown_users_are_not_cached(auth_cache, user_reads):
+    assert asyncio.run(server.load_auth_user("missing")) is None
+    assert asyncio.run(server.load_auth_user("missing")) is None
+    assert len(user_reads) == 2
+    assert auth_cache.stats()["entries"] == 0
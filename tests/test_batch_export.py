@@ -0,0 +1,59 @@
+import json
+
+import server
+
+
+def batch(client, slugs, sections="all"):
+    response = client.post("/api/export/batch", json={"slugs": slugs, "sections": sections})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return response, [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_exports_each_portfolio_and_reports_missing_slugs(client, portfolio):
+    _, ann = portfolio(projects=2, achievements=1)
+    _, bob = portfolio(projects=1, achievements=0)
+    slugs = [ann["unique_slug"], "missing-one", bob["unique_slug"], ann["unique_slug"], "missing-two"]
+    
+    response, records = batch(client, slugs)
+    
+    assert response.headers["x-export-missing"] == "2"
+    assert [r for r in records if r["type"] == "missing"] == [
+        {"type": "missing", "slug": "missing-one"}, {"type": "missing", "slug": "missing-two"}
+    ]
+    exports = {r["slug"]: r for r in records if r["type"] == "export"}
+    assert set(exports) == {ann["unique_slug"], bob["unique_slug"]}
+    assert [p["title"] for p in exports[ann["unique_slug"]]["projects"]] == ["Project 1", "Project 0"]
+    assert exports[ann["unique_slug"]]["metadata"]["total_achievements"] == 1
+    assert exports[bob["unique_slug"]]["metadata"]["total_projects"] == 1
+    assert records[-1] == {
+        "type": "summary", "requested": 4, "exported": 2, "missing": ["missing-one", "missing-two"]
+    }
+
+
+def test_batch_records_match_the_single_export(client, portfolio):
+    _, user = portfolio()
+    
+    _, records = batch(client, [user["unique_slug"]], sections="projects")
+    single = client.get(f"/api/export/{user['unique_slug']}", params={"sections": "projects"}).json()
+    record = records[0]
+    
+    assert record["type"] == "export" and "achievements" not in record
+    # Same shape and items; the batch lists them newest first, the unpaginated export in natural order
+    for body in (record, single):
+        body["metadata"].pop("exported_at")
+        body["projects"].sort(key=lambda p: p["created_at"])
+    assert {k: v for k, v in record.items() if k not in ("type", "slug")} == single
+
+
+def test_all_missing_batch(client):
+    response, records = batch(client, ["nobody-here", "nor-here"])
+    
+    assert response.headers["x-export-missing"] == "2"
+    assert records[-1] == {"type": "summary", "requested": 2, "exported": 0, "missing": ["nobody-here", "nor-here"]}
+
+
+def test_batch_size_is_bounded(client):
+    too_many = [f"slug-{n}" for n in range(server.BATCH_EXPORT_MAX_SLUGS + 1)]
+    assert client.post("/api/export/batch", json={"slugs": too_many}).status_code == 422
+    assert client.post("/api/export/batch", json={"slugs": []}).status_code == 422
@@ -0,0 +1,94 @@
+import server
+
+
+def bulk(client, headers, operations, ordered=True, collection="projects"):
+    response = client.post(f"/api/{collection}/bulk", headers=headers, json={"operations": operations, "ordered": ordered})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def titles(client, headers, collection="projects"):
+    return sorted(item["title"] for item in client.get(f"/api/{collection}", headers=headers).json())
+
+
+def test_mixed_batch_applies_every_operation(client, portfolio):
+    headers, _ = portfolio(projects=2, achievements=0)
+    first, second = client.get("/api/projects", headers=headers).json()
+    
+    result = bulk(client, headers, [
+        {"op": "create", "data": {"title": "New", "description": "d"}},
+        {"op": "update", "id": first["id"], "version": first["version"], "data": {"title": "Updated"}},
+        {"op": "delete", "id": second["id"]},
+    ])
+    
+    assert (result["created"], result["updated"], result["deleted"], result["failed"], result["skipped"]) == (1, 1, 1, 0, 0)
+    assert [r["status"] for r in result["results"]] == ["ok", "ok", "ok"]
+    assert result["results"][1]["version"] == first["version"] + 1
+    assert titles(client, headers) == ["New", "Updated"]
+    created = client.get(f"/api/projects/{result['results'][0]['id']}", headers=headers).json()
+    assert created["version"] == 1
+
+
+def test_ordered_batch_stops_at_the_first_invalid_item(client, portfolio):
+    headers, _ = portfolio(projects=1, achievements=0)
+    
+    result = bulk(client, headers, [
+        {"op": "create", "data": {"title": "Kept", "description": "d"}},
+        {"op": "create", "data": {"title": "No description"}},
+        {"op": "create", "data": {"title": "Skipped", "description": "d"}},
+    ])
+    
+    assert [r["status"] for r in result["results"]] == ["ok", "error", "skipped"]
+    assert "description" in result["results"][1]["error"]
+    assert (result["created"], result["failed"], result["skipped"]) == (1, 1, 1)
+    assert titles(client, headers) == ["Kept", "Project 0"]
+
+
+def test_unordered_batch_reports_failures_per_item(client, portfolio):
+    headers, _ = portfolio(projects=1, achievements=0)
+    project = client.get("/api/projects", headers=headers).json()[0]
+    
+    result = bulk(client, headers, [
+        {"op": "update", "id": project["id"], "version": project["version"] + 5, "data": {"title": "Stale"}},
+        {"op": "delete", "id": "missing"},
+        {"op": "update", "data": {"title": "No id"}},
+        {"op": "create", "data": {"title": "Made it", "description": "d"}},
+        {"op": "update", "id": project["id"], "data": {"title": "Twice"}},
+    ], ordered=False)
+    
+    assert [r.get("error") for r in result["results"]] == [
+        "version conflict", "not found", "id is required", None, "duplicate id in batch"
+    ]
+    assert (result["created"], result["failed"]) == (1, 4)
+    assert titles(client, headers) == ["Made it", "Project 0"]
+
+
+def test_other_users_items_are_not_found(client, portfolio, register):
+    owner_headers, _ = portfolio(projects=1, achievements=0)
+    project = client.get("/api/projects", headers=owner_headers).json()[0]
+    headers, _ = register()
+    
+    result = bulk(client, headers, [{"op": "delete", "id": project["id"]}], collection="projects")
+    assert result["results"][0]["error"] == "not found"
+    assert titles(client, owner_headers) == ["Project 0"]
+
+
+def test_achievement_batches_and_public_view(client, portfolio):
+    headers, user = portfolio(projects=0, achievements=1)
+    
+    result = bulk(client, headers, [
+        {"op": "create", "data": {"title": f"Award {n}", "description": "d", "date": "2024-05-01"}} for n in (7, 8)
+    ], collection="achievements")
+    assert result["created"] == 2
+    
+    profile = client.get(f"/api/profile/{user['unique_slug']}").json()
+    assert sorted(a["title"] for a in profile["achievements"]) == ["Award 0", "Award 7", "Award 8"]
+
+
+def test_batch_size_is_bounded(client, register):
+    headers, _ = register()
+    
+    too_many = [{"op": "delete", "id": str(n)} for n in range(server.BULK_MAX_OPERATIONS + 1)]
+    response = client.post("/api/projects/bulk", headers=headers, json={"operations": too_many})
+    assert response.status_code == 422
+    assert client.post("/api/projects/bulk", headers=headers, json={"operations": []}).status_code == 422
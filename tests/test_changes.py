@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import server
+
+
+def changes(client, slug, since=None):
+    response = client.get(f"/api/export/{slug}/changes", params={"since": since} if since else {})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def pending(user_id: str) -> list:
+    user = asyncio.run(server.storage.users.get(user_id, {"_id": 0, "changes_pending": 1}))
+    return user.get("changes_pending", [])
+
+
+def test_abandoned_reservation_holds_the_feed_until_it_settles(client, portfolio, monkeypatch):
+    headers, user = portfolio(projects=1, achievements=0)
+    slug = user["unique_slug"]
+    start = changes(client, slug)["next_token"]
+    
+    # A writer reserves a number and dies before writing or releasing it
+    dead_seq = asyncio.run(server.allocate_change_seqs(user["id"]))
+    response = client.post("/api/projects", headers=headers, json={"title": "After", "description": "d"})
+    assert response.status_code == 200
+    
+    held = changes(client, slug, start)
+    assert held["changes"] == [] and server.decode_change_token(held["next_token"]) == dead_seq - 1
+    
+    # Once the reservation is older than the settle window the feed moves past it...
+    monkeypatch.setattr(server, "CHANGE_FEED_SETTLE_SECONDS", 0)
+    settled = changes(client, slug, start)
+    assert [c["item"]["title"] for c in settled["changes"]] == ["After"]
+    assert server.decode_change_token(settled["next_token"]) == dead_seq + 1
+    assert [p["seq"] for p in pending(user["id"])] == [dead_seq]
+    
+    # ...and the user's next write drops it from changes_pending
+    response = client.post("/api/projects", headers=headers, json={"title": "Later", "description": "d"})
+    assert response.status_code == 200
+    assert pending(user["id"]) == []
+
+
+def test_recent_reservations_survive_a_reclaim(client, register):
+    _, user = register()
+    recent = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+    stale = (datetime.now(timezone.utc) - timedelta(seconds=server.CHANGE_FEED_SETTLE_SECONDS + 60)).isoformat()
+    asyncio.run(server.storage.users.reserve_change_seqs(user["id"], 1, stale))
+    in_flight = asyncio.run(server.storage.users.reserve_change_seqs(user["id"], 1, recent))
+    
+    latest = asyncio.run(server.allocate_change_seqs(user["id"]))
+    assert [p["seq"] for p in pending(user["id"])] == [in_flight, latest]
+
+
+def test_snapshot_then_created_updated_and_deleted(client, portfolio):
+    headers, user = portfolio(projects=2, achievements=1)
+    slug = user["unique_slug"]
+    
+    snapshot = changes(client, slug)
+    assert snapshot["since"] is None and not snapshot["has_more"]
+    assert sorted(c["item"]["title"] for c in snapshot["changes"]) == ["Award 0", "Project 0", "Project 1"]
+    assert {c["op"] for c in snapshot["changes"]} == {"created"}
+    
+    first, second = client.get("/api/projects", headers=headers).json()
+    client.put(f"/api/projects/{first['id']}", headers=headers, json={"title": "Edited"})
+    client.delete(f"/api/projects/{second['id']}", headers=headers)
+    made = client.post("/api/achievements", headers=headers, json={"title": "New", "description": "d", "date": "2024-06-01"}).json()
+    
+    delta = changes(client, slug, snapshot["next_token"])
+    assert [(c["type"], c["op"], c["id"]) for c in delta["changes"]] == [
+        ("project", "updated", first["id"]),
+        ("project", "deleted", second["id"]),
+        ("achievement", "created", made["id"]),
+    ]
+    assert delta["changes"][0]["item"]["title"] == "Edited"
+    assert changes(client, slug, delta["next_token"])["changes"] == []
+
+
+def test_feed_pages_with_has_more(client, portfolio):
+    headers, user = portfolio(projects=0, achievements=0)
+    slug = user["unique_slug"]
+    start = changes(client, slug)["next_token"]
+    for n in range(5):
+        client.post("/api/projects", headers=headers, json={"title": f"P{n}", "description": "d"})
+    
+    seen, token = [], start
+    while True:
+        response = client.get(f"/api/export/{slug}/changes", params={"since": token, "limit": 2})
+        page = response.json()
+        seen.append([c["item"]["title"] for c in page["changes"]])
+        token = page["next_token"]
+        if not page["has_more"]:
+            break
+    assert seen == [["P0", "P1"], ["P2", "P3"], ["P4"]]
+
+
+def test_feed_rejects_bad_tokens_and_unknown_slugs(client, register):
+    _, user = register()
+    
+    for token in ("garbage!", server.encode_cursor({"seq": -1}), server.encode_cursor([1])):
+        response = client.get(f"/api/export/{user['unique_slug']}/changes", params={"since": token})
+        assert response.status_code == 400
+    assert client.get("/api/export/no-such-slug-anywhere/changes").status_code == 404
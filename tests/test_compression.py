@@ -0,0 +1,89 @@
+import gzip
+
+import pytest
+
+import compression
+import server
+from compression import Compressor, base_etag, negotiate_encoding, representation_etag
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("*;q=0.1, gzip;q=0", None),
+    ("GZIP", "gzip"),
+    ("gzip;q=bogus", None),
+])
+def test_negotiate_encoding_without_brotli(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert negotiate_encoding(header) == expected
+
+
+def test_brotli_is_preferred_when_available(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+    assert negotiate_encoding("gzip, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0.5") == "gzip"
+
+
+def test_representation_etags_map_back_to_the_base():
+    assert representation_etag('"abc"', None) == '"abc"'
+    assert representation_etag('"abc"', "gzip") == '"abc-gzip"'
+    assert base_etag('"abc-gzip"') == base_etag('"abc-br"') == base_etag('"abc"') == '"abc"'
+
+
+def test_streamed_and_one_shot_gzip_decode_to_the_same_body():
+    compressor = Compressor()
+    pieces = [f"block {n}\n".encode() * 50 for n in range(20)]
+    body = b"".join(pieces)
+    
+    streamed = b"".join(compressor.compress_stream(pieces, "gzip"))
+    assert gzip.decompress(streamed) == gzip.decompress(compressor.compress(body, "gzip")) == body
+    assert compressor.stats()["encodings"]["gzip"]["compressions"] == 2
+
+
+def get(client, path, accept):
+    return client.get(path, headers={"Accept-Encoding": accept})
+
+
+@pytest.mark.parametrize("path", ["/api/profile/{slug}", "/api/export/{slug}"])
+def test_public_json_is_compressed_when_accepted(client, portfolio, path):
+    _, user = portfolio()
+    path = path.format(slug=user["unique_slug"])
+    
+    plain = get(client, path, "identity")
+    packed = get(client, path, "gzip")
+    
+    assert plain.headers["vary"] == packed.headers["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in plain.headers
+    assert packed.headers["content-encoding"] == "gzip"
+    assert packed.headers["etag"] == representation_etag(plain.headers["etag"], "gzip")
+    assert int(packed.headers["content-length"]) < len(plain.content)
+    assert packed.json() == plain.json()
+
+
+def test_compressed_bodies_are_reused_from_the_cache(client, portfolio):
+    _, user = portfolio()
+    path = f"/api/profile/{user['unique_slug']}"
+    
+    def counters():
+        return client.get("/api/stats/compression").json()["encodings"].get("gzip", {})
+    
+    get(client, path, "gzip")
+    before = counters()
+    get(client, path, "gzip")
+    after = counters()
+    assert after["compressions"] == before["compressions"]
+    assert after["cached_responses"] == before["cached_responses"] + 1
+
+
+def test_small_bodies_are_not_compressed(client, portfolio):
+    _, user = portfolio(projects=0, achievements=0)
+    
+    response = get(client, f"/api/profile/{user['unique_slug']}", "gzip")
+    assert len(response.content) < server.COMPRESSION_MIN_BYTES
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
@@ -0,0 +1,73 @@
+import pytest
+
+PUBLIC_PATHS = ["/api/profile/{slug}", "/api/export/{slug}", "/api/export/{slug}?format=ndjson"]
+
+
+def get(client, path, slug, **headers):
+    return client.get(path.format(slug=slug), headers={"Accept-Encoding": "identity", **headers})
+
+
+@pytest.mark.parametrize("path", PUBLIC_PATHS)
+def test_if_none_match_answers_304(client, portfolio, path):
+    _, user = portfolio()
+    first = get(client, path, user["unique_slug"])
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "no-cache"
+    assert first.headers["last-modified"].endswith(" GMT")
+    
+    for tag in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        again = get(client, path, user["unique_slug"], **{"If-None-Match": tag})
+        assert again.status_code == 304, tag
+        assert again.content == b""
+        assert again.headers["etag"] == etag
+    
+    assert get(client, path, user["unique_slug"], **{"If-None-Match": '"other"'}).status_code == 200
+
+
+@pytest.mark.parametrize("path", PUBLIC_PATHS)
+def test_if_modified_since(client, portfolio, path):
+    _, user = portfolio()
+    last_modified = get(client, path, user["unique_slug"]).headers["last-modified"]
+    
+    assert get(client, path, user["unique_slug"], **{"If-Modified-Since": last_modified}).status_code == 304
+    earlier = "Mon, 01 Jan 2001 00:00:00 GMT"
+    assert get(client, path, user["unique_slug"], **{"If-Modified-Since": earlier}).status_code == 200
+    assert get(client, path, user["unique_slug"], **{"If-Modified-Since": "not a date"}).status_code == 200
+    # If-None-Match wins over If-Modified-Since
+    assert get(client, path, user["unique_slug"], **{
+        "If-None-Match": '"other"', "If-Modified-Since": last_modified
+    }).status_code == 200
+
+
+def test_writes_change_the_etag(client, portfolio):
+    headers, user = portfolio(projects=1)
+    slug = user["unique_slug"]
+    etag = get(client, "/api/profile/{slug}", slug).headers["etag"]
+    
+    project = client.get("/api/projects", headers=headers).json()[0]
+    response = client.put(f"/api/projects/{project['id']}", headers=headers, json={"title": "Renamed"})
+    assert response.status_code == 200
+    
+    after = get(client, "/api/profile/{slug}", slug, **{"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["etag"] != etag
+    assert [p["title"] for p in after.json()["projects"]] == ["Renamed"]
+
+
+def test_each_representation_has_its_own_etag(client, portfolio):
+    _, user = portfolio()
+    slug = user["unique_slug"]
+    
+    etags = {
+        get(client, path, slug).headers["etag"]
+        for path in (
+            "/api/profile/{slug}", "/api/export/{slug}", "/api/export/{slug}?sections=projects",
+            "/api/export/{slug}?format=ndjson", "/api/export/{slug}?format=markdown",
+        )
+    }
+    assert len(etags) == 5
+
+
+def test_unknown_profile_is_a_404(client):
+    assert client.get("/api/profile/no-such-slug-anywhere").status_code == 404
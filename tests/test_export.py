@@ -0,0 +1,129 @@
+import gzip
+import json
+
+import pytest
+
+import server
+
+
+def text_export(client, slug, headers=None, **params):
+    return client.get(f"/api/export/{slug}", params={"format": "markdown", **params}, headers=headers or {})
+
+
+@pytest.mark.parametrize("accept", ["gzip", "identity"])
+def test_text_export_miss_and_hit_send_the_same_representation(client, portfolio, accept):
+    _, user = portfolio()
+    headers = {"Accept-Encoding": accept}
+    
+    miss = text_export(client, user["unique_slug"], headers)
+    hit = text_export(client, user["unique_slug"], headers)
+    
+    assert miss.status_code == hit.status_code == 200
+    assert miss.headers["etag"] == hit.headers["etag"]
+    assert miss.headers.get("content-encoding") == hit.headers.get("content-encoding")
+    assert miss.headers["vary"] == hit.headers["vary"] == "Accept-Encoding"
+    assert miss.content == hit.content
+    if accept == "gzip":
+        assert miss.headers["content-encoding"] == "gzip"
+        assert miss.headers["etag"].endswith('-gzip"')
+    else:
+        assert "content-encoding" not in miss.headers
+
+
+def test_streamed_gzip_body_is_a_valid_gzip_stream(client, portfolio):
+    _, user = portfolio()
+    identity = text_export(client, user["unique_slug"], {"Accept-Encoding": "identity"}, sections="projects")
+    
+    server.profile_cache.clear()
+    raw = client.stream("GET", f"/api/export/{user['unique_slug']}",
+                        params={"format": "markdown", "sections": "projects"}, headers={"Accept-Encoding": "gzip"})
+    with raw as response:
+        body = b"".join(response.iter_raw())
+    assert gzip.decompress(body).decode() == identity.text
+
+
+@pytest.mark.parametrize("accept", ["gzip", "identity"])
+def test_text_export_revalidates_with_the_first_etag(client, portfolio, accept):
+    _, user = portfolio()
+    headers = {"Accept-Encoding": accept}
+    first = text_export(client, user["unique_slug"], headers)
+    
+    again = text_export(client, user["unique_slug"], {**headers, "If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+    assert again.content == b""
+    
+    # Also when the cached entry is gone and the request is a miss again
+    server.profile_cache.clear()
+    again = text_export(client, user["unique_slug"], {**headers, "If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_short_text_export_is_sent_whole(client, portfolio):
+    _, user = portfolio(projects=0, achievements=1)
+    
+    miss = text_export(client, user["unique_slug"], {"Accept-Encoding": "gzip"})
+    hit = text_export(client, user["unique_slug"], {"Accept-Encoding": "gzip"})
+    
+    assert len(miss.content) < server.COMPRESSION_MIN_BYTES
+    assert "content-encoding" not in miss.headers
+    assert miss.headers["content-length"] == str(len(miss.content))
+    assert (miss.headers["etag"], miss.content) == (hit.headers["etag"], hit.content)
+
+
+def streamed_records(client, slug, format, **params):
+    response = client.get(f"/api/export/{slug}", params={"format": format, **params})
+    assert response.status_code == 200, response.text
+    if format == "ndjson":
+        assert response.headers["content-type"] == "application/x-ndjson"
+        return [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"] == "application/json"
+    return response.json()
+
+
+def test_ndjson_and_json_array_stream_the_same_records_newest_first(client, portfolio):
+    _, user = portfolio(projects=4, achievements=3)
+    slug = user["unique_slug"]
+    
+    ndjson = streamed_records(client, slug, "ndjson")
+    array = streamed_records(client, slug, "json-array")
+    
+    assert [r["type"] for r in ndjson] == ["metadata"] + ["project"] * 4 + ["achievement"] * 3 + ["summary"]
+    assert [r["title"] for r in ndjson if r["type"] == "project"] == [f"Project {n}" for n in (3, 2, 1, 0)]
+    assert [r["title"] for r in ndjson if r["type"] == "achievement"] == ["Award 2", "Award 1", "Award 0"]
+    assert ndjson[-1] == {"type": "summary", "total_projects": 4, "total_achievements": 3}
+    
+    def without_metadata(records):
+        return [r for r in records if r["type"] != "metadata"]
+    
+    assert without_metadata(ndjson) == without_metadata(array)
+    assert array[0]["metadata"]["format"] == "json-array"
+
+
+def test_streamed_export_honours_sections(client, portfolio):
+    _, user = portfolio(projects=2, achievements=2)
+    
+    records = streamed_records(client, user["unique_slug"], "ndjson", sections="achievements")
+    assert [r["type"] for r in records] == ["metadata", "achievement", "achievement", "summary"]
+    assert records[-1] == {"type": "summary", "total_achievements": 2}
+
+
+def test_empty_portfolio_streams_an_empty_array(client, portfolio):
+    _, user = portfolio(projects=0, achievements=0)
+    
+    records = streamed_records(client, user["unique_slug"], "json-array")
+    assert [r["type"] for r in records] == ["metadata", "summary"]
+
+
+@pytest.mark.parametrize("params", [
+    {"format": "xml"},
+    {"format": "ndjson", "chunk": 0},
+    {"format": "json", "chunk": 1},
+    {"format": "json-array", "max_tokens": 500},
+    {"format": "ndjson", "limit": 5},
+    {"format": "markdown", "cursor": "abc"},
+])
+def test_export_rejects_unknown_formats_and_stray_parameters(client, portfolio, params):
+    _, user = portfolio(projects=1, achievements=0)
+    
+    response = client.get(f"/api/export/{user['unique_slug']}", params=params)
+    assert response.status_code == 400, response.text
@@ -0,0 +1,80 @@
+import asyncio
+import uuid
+
+from facets import TechFacets
+
+
+def project(project_id, user_id, tech, version=1):
+    return {"id": project_id, "user_id": user_id, "tech_stack": tech, "version": version}
+
+
+def test_counts_follow_set_and_remove():
+    facets = TechFacets()
+    facets.set_project(project("p1", "ann", ["Python", "node.js"]))
+    facets.set_project(project("p2", "ann", ["python"]))
+    facets.set_project(project("p3", "bob", ["Python"]))
+    assert facets.tag_counts("PYTHON") == {"tag": "python", "portfolios": 2, "projects": 3}
+    assert facets.user_histogram("ann") == [{"tag": "python", "projects": 2}, {"tag": "nodejs", "projects": 1}]
+    
+    facets.set_project(project("p2", "ann", ["Go"], version=2))
+    facets.remove_project("p3")
+    assert facets.tag_counts("python") == {"tag": "python", "portfolios": 1, "projects": 1}
+    assert [t["tag"] for t in facets.top(10)] == ["python", "nodejs", "go"]
+    
+    # An older version arriving late does not roll the counts back
+    facets.set_project(project("p2", "ann", ["Python"], version=1))
+    assert facets.tag_counts("go")["projects"] == 1
+
+
+def test_reconcile_replays_writes_made_during_the_scan():
+    facets = TechFacets()
+    facets.set_project(project("p1", "ann", ["Rust"]))
+    
+    async def scan():
+        yield project("p1", "ann", ["Rust"])
+        # Counted while the scan runs: an update the scan already read past, and a delete
+        facets.set_project(project("p1", "ann", ["Zig"], version=2))
+        facets.set_project(project("p2", "bob", ["Rust"]))
+        facets.remove_project("p2")
+        yield project("p2", "bob", ["Rust"])
+    
+    report = asyncio.run(facets.reconcile(scan()))
+    assert report["replayed"] == 3
+    assert facets.tag_counts("rust") == {"tag": "rust", "portfolios": 0, "projects": 0}
+    assert facets.tag_counts("zig") == {"tag": "zig", "portfolios": 1, "projects": 1}
+
+
+def tech_stats(client, **params):
+    response = client.get("/api/stats/tech", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_stats_tech_follows_project_writes(client, register):
+    tag = f"zq{uuid.uuid4().hex[:10]}"
+    ann_headers, ann = register()
+    bob_headers, _ = register()
+    
+    def create(headers, tech):
+        return client.post("/api/projects", headers=headers, json={"title": "t", "description": "d", "tech_stack": tech}).json()
+    
+    first = create(ann_headers, [tag, "Python"])
+    second = create(ann_headers, [tag.upper()])
+    bobs = create(bob_headers, [tag])
+    assert tech_stats(client, tag=tag) == {"tag": tag, "portfolios": 2, "projects": 3}
+    assert {"tag": tag, "projects": 2} in tech_stats(client, slug=ann["unique_slug"])["tags"]
+    
+    client.put(f"/api/projects/{first['id']}", headers=ann_headers, json={"tech_stack": ["Python"]})
+    assert tech_stats(client, tag=tag) == {"tag": tag, "portfolios": 2, "projects": 2}
+    client.delete(f"/api/projects/{second['id']}", headers=ann_headers)
+    assert tech_stats(client, tag=tag) == {"tag": tag, "portfolios": 1, "projects": 1}
+    
+    client.post("/api/projects/bulk", headers=bob_headers, json={"operations": [
+        {"op": "update", "id": bobs["id"], "data": {"tech_stack": ["Go"]}},
+    ]})
+    assert tech_stats(client, tag=tag) == {"tag": tag, "portfolios": 0, "projects": 0}
+    assert tag not in [t["tag"] for t in tech_stats(client, k=100, by="projects")["top"]]
+
+
+def test_stats_tech_unknown_slug_is_a_404(client):
+    assert client.get("/api/stats/tech", params={"slug": "no-such-slug-anywhere"}).status_code == 404
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+ITEMS = {
+    "projects": {"title": "Versioned", "description": "Original"},
+    "achievements": {"title": "Versioned", "description": "Original", "date": "2024-01-01"},
+}
+
+
+@pytest.fixture(params=sorted(ITEMS))
+def item(request, client, register):
+    """Create one project or achievement; returns (collection URL, auth headers, created item)."""
+    headers, _ = register()
+    url = f"/api/{request.param}"
+    response = client.post(url, headers=headers, json=ITEMS[request.param])
+    assert response.status_code == 200, response.text
+    return url, headers, response.json()
+
+
+def test_update_returns_the_post_image_and_its_etag(client, item):
+    url, headers, created = item
+    
+    response = client.put(f"{url}/{created['id']}", headers=headers, json={"description": "Changed"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["description"] == "Changed" and body["title"] == "Versioned"
+    assert body["version"] == created["version"] + 1
+    assert response.headers["etag"] == f'"{body["version"]}"'
+    assert client.get(f"{url}/{created['id']}", headers=headers).headers["etag"] == response.headers["etag"]
+
+
+def test_if_match_guards_against_lost_updates(client, item):
+    url, headers, created = item
+    path = f"{url}/{created['id']}"
+    version = created["version"]
+    
+    stale = client.put(path, headers={**headers, "If-Match": f'"{version + 1}"'}, json={"description": "Lost"})
+    assert stale.status_code == 412
+    assert client.get(path, headers=headers).json()["description"] == "Original"
+    
+    for if_match in (f'"{version}"', f'W/"{version + 1}"', f'"7", "{version + 2}"', "*"):
+        response = client.put(path, headers={**headers, "If-Match": if_match}, json={"description": if_match})
+        assert response.status_code == 200, if_match
+    assert client.get(path, headers=headers).json()["version"] == version + 4
+
+
+def test_missing_or_foreign_items_are_404_not_412(client, item, register):
+    url, headers, created = item
+    other_headers, _ = register()
+    
+    assert client.put(f"{url}/missing", headers={**headers, "If-Match": '"1"'}, json={"title": "x"}).status_code == 404
+    response = client.put(f"{url}/{created['id']}", headers={**other_headers, "If-Match": '"1"'}, json={"title": "x"})
+    assert response.status_code == 404
+    assert client.get(f"{url}/{created['id']}", headers=headers).json()["title"] == "Versioned"
+
+
+def test_concurrent_conditional_updates_let_exactly_one_through(client, item):
+    url, headers, created = item
+    path = f"{url}/{created['id']}"
+    if_match = {**headers, "If-Match": f'"{created["version"]}"'}
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(
+            lambda n: client.put(path, headers=if_match, json={"description": f"Writer {n}"}).status_code, range(8)
+        ))
+    
+    assert sorted(statuses) == [200] + [412] * 7
+    assert client.get(path, headers=headers).json()["version"] == created["version"] + 1
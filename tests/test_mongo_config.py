@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from pymongo.read_preferences import Primary, SecondaryPreferred
+
+import repositories
+from repositories import MemoryStorage, MotorStorage, make_read_preference
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(repositories.__file__))
+
+
+def test_make_read_preference():
+    assert make_read_preference("primary") == Primary()
+    secondary = make_read_preference("secondaryPreferred", 120)
+    assert isinstance(secondary, SecondaryPreferred) and secondary.max_staleness == 120
+    assert make_read_preference("nearest").max_staleness == -1
+    with pytest.raises(ValueError, match="unknown read preference"):
+        make_read_preference("secondary_preferred")
+
+
+def test_only_non_primary_preferences_get_a_separate_public_storage():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient()["devfolio_config_test"]
+    
+    for preference in (None, Primary()):
+        storage = MotorStorage(db, preference)
+        assert storage.public_reads is storage
+    routed = MotorStorage(db, make_read_preference("secondaryPreferred"))
+    assert isinstance(routed.public_reads, MotorStorage) and routed.public_reads is not routed
+    memory = MemoryStorage()
+    assert memory.public_reads is memory
+
+
+def import_settings(**env) -> dict:
+    """Import server in a fresh interpreter with `env` and report the parsed Mongo settings."""
+    script = (
+        "import json, server\n"
+        "pref = server.PUBLIC_READ_PREFERENCE\n"
+        "print(json.dumps({'options': server.MONGO_CLIENT_OPTIONS, 'mode': pref.mongos_mode,"
+        " 'max_staleness': pref.max_staleness}))"
+    )
+    clean = {k: v for k, v in os.environ.items() if not k.startswith(("MONGO_", "PUBLIC_READ_"))}
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, env={**clean, "MONGO_URL": "mongodb://localhost", **env},
+        capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_unset_settings_keep_driver_defaults():
+    settings = import_settings()
+    assert settings == {"options": {}, "mode": "secondaryPreferred", "max_staleness": -1}
+
+
+def test_settings_are_parsed_from_the_environment():
+    settings = import_settings(
+        MONGO_MAX_POOL_SIZE="50",
+        MONGO_MIN_POOL_SIZE="5",
+        MONGO_WAIT_QUEUE_TIMEOUT_MS="250",
+        MONGO_COMPRESSORS="zstd,zlib",
+        MONGO_SOCKET_TIMEOUT_MS="",
+        PUBLIC_READ_PREFERENCE="nearest",
+        PUBLIC_READ_MAX_STALENESS_SECONDS="90",
+    )
+    assert settings == {
+        "options": {"maxPoolSize": 50, "minPoolSize": 5, "waitQueueTimeoutMS": 250, "compressors": "zstd,zlib"},
+        "mode": "nearest",
+        "max_staleness": 90,
+    }
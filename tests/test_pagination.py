@@ -0,0 +1,72 @@
+import pytest
+
+import server
+
+
+def walk(client, path, headers=None, **params):
+    pages, cursor = [], None
+    while True:
+        response = client.get(path, headers=headers or {}, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        pages.append(body)
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("collection, prefix", [("projects", "Project"), ("achievements", "Award")])
+def test_owner_lists_walk_newest_first(client, portfolio, collection, prefix):
+    headers, _ = portfolio(projects=5, achievements=5)
+    
+    pages = walk(client, f"/api/{collection}", headers, limit=2)
+    assert [[item["title"] for item in page["items"]] for page in pages] == [
+        [f"{prefix} 4", f"{prefix} 3"], [f"{prefix} 2", f"{prefix} 1"], [f"{prefix} 0"]
+    ]
+    
+    # Without limit/cursor the plain list is unchanged
+    plain = client.get(f"/api/{collection}", headers=headers).json()
+    assert [item["title"] for item in plain] == [f"{prefix} {n}" for n in (4, 3, 2, 1, 0)]
+
+
+def test_exact_multiple_of_the_page_size_ends_with_no_cursor(client, portfolio):
+    headers, _ = portfolio(projects=4, achievements=0)
+    
+    pages = walk(client, "/api/projects", headers, limit=2)
+    assert [len(page["items"]) for page in pages] == [2, 2]
+
+
+def test_pages_only_show_the_owners_items(client, portfolio):
+    headers, _ = portfolio(projects=2, achievements=0)
+    portfolio(projects=3, achievements=0)
+    
+    pages = walk(client, "/api/projects", headers, limit=10)
+    assert len(pages) == 1 and len(pages[0]["items"]) == 2
+
+
+def test_public_profile_pages_each_section(client, portfolio):
+    _, user = portfolio(projects=3, achievements=1)
+    
+    pages = walk(client, f"/api/profile/{user['unique_slug']}", limit=2)
+    assert [([p["title"] for p in page["projects"]], [a["title"] for a in page["achievements"]]) for page in pages] == [
+        (["Project 2", "Project 1"], ["Award 0"]),
+        (["Project 0"], []),
+    ]
+    
+    export_pages = walk(client, f"/api/export/{user['unique_slug']}", limit=2, sections="projects")
+    assert [[p["title"] for p in page["projects"]] for page in export_pages] == [["Project 2", "Project 1"], ["Project 0"]]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", server.encode_cursor({"x": 1}), server.encode_cursor([1, 2])])
+def test_invalid_cursors_are_rejected(client, portfolio, cursor):
+    headers, user = portfolio(projects=1, achievements=0)
+    
+    assert client.get("/api/projects", headers=headers, params={"cursor": cursor}).status_code == 400
+    assert client.get(f"/api/profile/{user['unique_slug']}", params={"cursor": cursor}).status_code == 400
+
+
+def test_page_size_is_bounded(client, register):
+    headers, _ = register()
+    
+    assert client.get("/api/projects", headers=headers, params={"limit": 0}).status_code == 422
+    assert client.get("/api/projects", headers=headers, params={"limit": server.MAX_PAGE_SIZE + 1}).status_code == 422
@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+
+import pytest
+
+import server
+from passwords import HasherBusy, PasswordHasher
+
+
+def cheap_hasher(**kwargs) -> PasswordHasher:
+    return PasswordHasher(n=2 ** 4, r=8, p=1, workers=2, **kwargs)
+
+
+def test_scrypt_round_trip_and_wrong_password():
+    hasher = cheap_hasher()
+    
+    async def check():
+        stored = await hasher.hash("correct horse")
+        return stored, await hasher.verify("correct horse", stored), await hasher.verify("battery staple", stored)
+    
+    try:
+        stored, right, wrong = asyncio.run(check())
+    finally:
+        hasher.shutdown()
+    assert stored.startswith("scrypt$16$8$1$")
+    assert right and not wrong
+    assert not hasher.needs_rehash(stored)
+    # Salted: the same password hashes differently each time
+    assert hasher.hash_sync("correct horse") != stored
+
+
+def test_saturated_hasher_raises_busy():
+    hasher = cheap_hasher(max_concurrency=1, queue_timeout=0.05)
+    
+    async def check():
+        await hasher.hash("warm up")
+        await hasher._slots.acquire()
+        try:
+            with pytest.raises(HasherBusy):
+                await hasher.verify("pw", hasher.dummy_hash)
+        finally:
+            hasher._slots.release()
+        return await hasher.verify("pw", hasher.dummy_hash)
+    
+    try:
+        assert asyncio.run(check()) is False
+    finally:
+        hasher.shutdown()
+    assert hasher.rejected == 1
+    assert hasher.in_flight == 0
+
+
+def login(client, email, password):
+    return client.post("/api/auth/login", json={"email": email, "password": password})
+
+
+def test_legacy_sha256_hash_is_upgraded_on_login(client, register):
+    _, user = register()
+    current = asyncio.run(server.storage.users.get(user["id"], {"_id": 0, "password_hash": 1}))["password_hash"]
+    legacy = hashlib.sha256(b"testpass123").hexdigest()
+    asyncio.run(server.storage.users.replace_password_hash(user["id"], current, legacy))
+    
+    assert login(client, user["email"], "wrongpass").status_code == 401
+    assert asyncio.run(server.storage.users.get(user["id"], {"_id": 0, "password_hash": 1}))["password_hash"] == legacy
+    
+    assert login(client, user["email"], "testpass123").status_code == 200
+    upgraded = asyncio.run(server.storage.users.get(user["id"], {"_id": 0, "password_hash": 1}))["password_hash"]
+    assert upgraded.startswith("scrypt$") and not server.password_hasher.needs_rehash(upgraded)
+    assert login(client, user["email"], "testpass123").status_code == 200
+
+
+def test_unknown_email_checks_the_dummy_hash(client, register, monkeypatch):
+    _, user = register()
+    checked = []
+    verify_sync = server.password_hasher.verify_sync
+    
+    def recording_verify(password, stored):
+        checked.append(stored)
+        return verify_sync(password, stored)
+    
+    monkeypatch.setattr(server.password_hasher, "verify_sync", recording_verify)
+    unknown = login(client, "nobody@example.com", "testpass123")
+    wrong = login(client, user["email"], "wrongpass")
+    
+    assert unknown.status_code == wrong.status_code == 401
+    assert unknown.json() == wrong.json()
+    assert checked[0] == server.password_hasher.dummy_hash
+    assert checked[1] != server.password_hasher.dummy_hash
+
+
+def test_login_answers_503_when_the_hasher_is_saturated(client, register, monkeypatch):
+    _, user = register()
+    # No free slots at all: every hash waits out the queue timeout
+    busy = cheap_hasher(max_concurrency=0, queue_timeout=0.01)
+    monkeypatch.setattr(server, "password_hasher", busy)
+    
+    try:
+        response = login(client, user["email"], "testpass123")
+    finally:
+        busy.shutdown()
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert busy.rejected == 1
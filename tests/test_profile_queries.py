@@ -0,0 +1,60 @@
+"""
+The 'aggregate' ($lookup) and 'sequential' read paths must produce the same responses.
+"""
+import pytest
+
+import server
+
+
+def fetch(client, path, slug, **params):
+    server.profile_cache.clear()
+    response = client.get(path.format(slug=slug), params=params)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    body.get("metadata", {}).pop("exported_at", None)
+    return body, response.headers["etag"]
+
+
+@pytest.mark.parametrize("path", ["/api/profile/{slug}", "/api/export/{slug}"])
+@pytest.mark.parametrize("params", [{}, {"sections": "projects"}, {"sections": "achievements"}, {"limit": 2}])
+def test_aggregate_and_sequential_paths_agree(client, portfolio, monkeypatch, path, params):
+    _, user = portfolio(projects=3, achievements=3)
+    
+    monkeypatch.setattr(server, "PROFILE_QUERY_MODE", "sequential")
+    sequential = fetch(client, path, user["unique_slug"], **params)
+    monkeypatch.setattr(server, "PROFILE_QUERY_MODE", "aggregate")
+    aggregate = fetch(client, path, user["unique_slug"], **params)
+    
+    assert aggregate == sequential
+
+
+def test_aggregate_path_follows_cursors(client, portfolio, monkeypatch):
+    _, user = portfolio(projects=3, achievements=1)
+    
+    def walk(mode):
+        monkeypatch.setattr(server, "PROFILE_QUERY_MODE", mode)
+        pages, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            body, _ = fetch(client, "/api/profile/{slug}", user["unique_slug"], **params)
+            pages.append(([p["title"] for p in body["projects"]], [a["title"] for a in body["achievements"]]))
+            cursor = body["next_cursor"]
+            if not cursor:
+                return pages
+    
+    assert walk("aggregate") == walk("sequential") == [
+        (["Project 2", "Project 1"], ["Award 0"]),
+        (["Project 0"], []),
+    ]
+
+
+def test_query_latency_is_recorded_per_path(client, portfolio, monkeypatch):
+    _, user = portfolio()
+    
+    def count(key):
+        return client.get("/api/stats/profile-queries").json()["latency"].get(key, {}).get("count", 0)
+    
+    before = count("profile/aggregate")
+    monkeypatch.setattr(server, "PROFILE_QUERY_MODE", "aggregate")
+    fetch(client, "/api/profile/{slug}", user["unique_slug"])
+    assert count("profile/aggregate") == before + 1
@@ -0,0 +1,48 @@
+import pytest
+
+
+@pytest.fixture
+def admin(client):
+    import server
+
+    headers = {"X-Admin-Token": server.PROFILING_ADMIN_TOKEN}
+    yield headers
+    client.delete("/api/admin/profiling", headers=headers)
+
+
+def profiled_paths(client, admin) -> list:
+    return [(p["method"], p["path"]) for p in client.get("/api/admin/profiling", headers=admin).json()["profiles"]]
+
+
+def test_slug_rule_does_not_capture_the_batch_route(client, register, admin):
+    _, user = register()
+    slug = user["unique_slug"]
+    before = profiled_paths(client, admin)
+    armed = client.put("/api/admin/profiling", json={"route": "/api/export/{slug}"}, headers=admin)
+    assert armed.status_code == 200
+    
+    assert client.post("/api/export/batch", json={"slugs": [slug]}).status_code == 200
+    assert profiled_paths(client, admin) == before
+    
+    assert client.get(f"/api/export/{slug}").status_code == 200
+    assert profiled_paths(client, admin) == [("GET", f"/api/export/{slug}"), *before]
+
+
+def test_rule_narrowed_to_a_slug(client, register, admin):
+    _, first = register()
+    _, second = register()
+    before = profiled_paths(client, admin)
+    client.put("/api/admin/profiling", json={"route": "/api/profile/{slug}", "slug": second["unique_slug"], "limit": 1},
+               headers=admin)
+    
+    client.get(f"/api/profile/{first['unique_slug']}")
+    client.get(f"/api/profile/{second['unique_slug']}")
+    client.get(f"/api/profile/{second['unique_slug']}")
+    assert profiled_paths(client, admin) == [("GET", f"/api/profile/{second['unique_slug']}"), *before]
+    # The limit disarmed the rule after its one capture
+    assert client.get("/api/admin/profiling", headers=admin).json()["rule"] is None
+
+
+def test_unknown_route_is_rejected(client, admin):
+    response = client.put("/api/admin/profiling", json={"route": "/api/nowhere/{slug}"}, headers=admin)
+    assert response.status_code == 400
@@ -0,0 +1,112 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import ratelimit
+from ratelimit import RateLimit, RateLimiter, parse_limits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", fake)
+    return fake
+
+
+def test_parse_limits():
+    assert parse_limits("profile=20/60, export=0.5/3,,batch=2") == {
+        "profile": RateLimit(20.0, 60.0),
+        "export": RateLimit(0.5, 3.0),
+        "batch": RateLimit(2.0, 2.0),
+    }
+    assert parse_limits("") == {}
+
+
+@pytest.mark.parametrize("spec", ["profile=0/10", "profile=-1/10", "profile=0", "profile=5/0", "profile=0.5"])
+def test_parse_limits_rejects_limits_that_refuse_everything(spec):
+    with pytest.raises(ValueError):
+        parse_limits(spec)
+
+
+def test_bucket_refills_over_time(clock):
+    limiter = RateLimiter({"profile": RateLimit(2.0, 3.0)})
+    assert [limiter.acquire("profile", "ip:a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("profile", "ip:a") == pytest.approx(0.5)
+    # Other clients and other limits have buckets of their own
+    assert limiter.acquire("profile", "ip:b") == 0.0
+    assert limiter.acquire("export", "ip:a") == 0.0
+    
+    clock.now += 0.5
+    assert limiter.acquire("profile", "ip:a") == 0.0
+    assert limiter.acquire("profile", "ip:a") == pytest.approx(0.5)
+    
+    # Refills stop at the burst size
+    clock.now += 60
+    assert [limiter.acquire("profile", "ip:a") for _ in range(4)][-1] == pytest.approx(0.5)
+    assert (limiter.allowed, limiter.limited) == (8, 3)
+
+
+def test_api_keys_get_their_own_larger_bucket(clock):
+    limiter = RateLimiter({"profile": RateLimit(1.0, 1.0)}, api_keys=["secret"], api_key_factor=3)
+    assert limiter.client_key("10.0.0.1", "wrong") == ("ip:10.0.0.1", False)
+    client, keyed = limiter.client_key("10.0.0.1", "secret")
+    assert [limiter.acquire("profile", client, keyed) for _ in range(4)] == [0.0, 0.0, 0.0, pytest.approx(1 / 3)]
+
+
+def test_retry_after_rounds_up_to_whole_seconds():
+    assert RateLimiter.retry_after(0.01) == "1"
+    assert RateLimiter.retry_after(1.2) == "2"
+
+
+def test_public_profile_refuses_with_429_and_retry_after(client, register, monkeypatch):
+    import server
+    
+    _, user = register()
+    monkeypatch.setattr(server, "rate_limiter", RateLimiter({"profile": RateLimit(0.25, 2.0)}))
+    url = f"/api/profile/{user['unique_slug']}"
+    assert [client.get(url).status_code for _ in range(2)] == [200, 200]
+    refused = client.get(url)
+    assert refused.status_code == 429
+    assert refused.headers["Retry-After"] == "4"
+    # Limits are per endpoint
+    assert client.get(f"/api/export/{user['unique_slug']}").status_code == 200
+
+
+def test_identical_concurrent_reads_share_one_storage_call(client, register, monkeypatch):
+    import server
+    
+    headers, user = register()
+    client.post("/api/projects", json={"title": "Shared", "description": "d"}, headers=headers)
+    reads = server.storage.public_reads
+    calls = []
+    
+    def slowed(read):
+        async def wrapper(slug, projection, *args):
+            if projection is server.PUBLIC_USER_FIELDS:
+                calls.append(slug)
+                # Hold the read open so every request arrives while it is in flight
+                await asyncio.sleep(0.3)
+            return await read(slug, projection, *args)
+        return wrapper
+    
+    monkeypatch.setattr(reads.users, "get_by_slug", slowed(reads.users.get_by_slug))
+    monkeypatch.setattr(reads, "load_user_with_items", slowed(reads.load_user_with_items))
+    coalesced = server.coalesced_requests.labels("profile").value
+    
+    url = f"/api/profile/{user['unique_slug']}"
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(lambda _: client.get(url), range(8)))
+    
+    assert [r.status_code for r in responses] == [200] * 8
+    assert len({r.content for r in responses}) == 1
+    assert calls == [user["unique_slug"]]
+    assert server.coalesced_requests.labels("profile").value == coalesced + 7
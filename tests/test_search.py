@@ -0,0 +1,115 @@
+import uuid
+
+import pytest
+
+from search import SearchIndex, normalize_tech, tokenize
+
+
+def project(project_id, title="", description="", readme="", tech=(), created_at="2024-01-01", user_id="u1"):
+    return {
+        "id": project_id, "user_id": user_id, "title": title, "description": description,
+        "readme_content": readme, "tech_stack": list(tech), "created_at": created_at, "version": 1
+    }
+
+
+def ids(hits):
+    return [hit["id"] for hit in hits]
+
+
+def test_tokenize_and_tech_aliases():
+    assert tokenize("The C++ and C# parser, in Rust!") == ["c++", "c#", "parser", "rust"]
+    assert normalize_tech("Node.js") == normalize_tech("node") == normalize_tech("NodeJS") == "nodejs"
+    assert normalize_tech("  React.js ") == "react"
+    assert normalize_tech("K8s") == "kubernetes"
+
+
+def test_title_matches_outrank_readme_matches():
+    index = SearchIndex()
+    index.add(project("readme", title="Dashboard", readme="a small compiler inside"))
+    index.add(project("title", title="Compiler", readme="parses things"))
+    index.add(project("other", title="Unrelated"))
+    
+    total, hits = index.search("compiler")
+    assert total == 2
+    assert ids(hits) == ["title", "readme"]
+    assert hits[0]["score"] > hits[1]["score"] > 0
+
+
+def test_tags_are_required_and_tag_only_search_is_newest_first():
+    index = SearchIndex()
+    index.add(project("old", title="api", tech=["Python", "Node.js"], created_at="2024-01-01"))
+    index.add(project("new", title="api", tech=["python"], created_at="2024-03-01"))
+    index.add(project("js", title="api", tech=["node"], created_at="2024-02-01"))
+    
+    assert ids(index.search(tech=["PYTHON"])[1]) == ["new", "old"]
+    assert ids(index.search(tech=["python", "nodejs"])[1]) == ["old"]
+    assert set(ids(index.search("api", tech=["node.js"])[1])) == {"js", "old"}
+    assert index.search(tech=["cobol"]) == (0, [])
+    assert index.search("") == (0, [])
+
+
+def test_updates_and_removals_replace_postings():
+    index = SearchIndex()
+    index.add(project("p1", title="Alpha"))
+    index.add(project("p1", title="Beta"))
+    
+    assert index.search("alpha") == (0, [])
+    assert ids(index.search("beta")[1]) == ["p1"]
+    index.remove("p1")
+    assert index.search("beta") == (0, [])
+    assert index.stats()["projects"] == 0 and index.stats()["terms"] == 0
+
+
+def test_offset_pages_through_the_ranking():
+    index = SearchIndex()
+    for n in range(5):
+        index.add(project(f"p{n}", title="widget " * (n + 1), readme="filler text " * 5))
+    
+    total, everything = index.search("widget", limit=5)
+    pages = [index.search("widget", limit=2, offset=offset)[1] for offset in (0, 2, 4)]
+    assert total == 5
+    assert sum((ids(page) for page in pages), []) == ids(everything)
+
+
+def search(client, **params):
+    response = client.get("/api/search", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_search_follows_project_writes(client, register):
+    headers, user = register("Search Owner")
+    word = f"zq{uuid.uuid4().hex[:10]}"
+    
+    created = client.post("/api/projects", headers=headers, json={
+        "title": f"The {word} engine", "description": "d", "tech_stack": ["Go"]
+    }).json()
+    body = search(client, q=word)
+    assert body["total"] == 1 and body["index_ready"]
+    assert body["results"][0]["id"] == created["id"]
+    assert body["results"][0]["owner"] == {"name": "Search Owner", "unique_slug": user["unique_slug"]}
+    assert created["id"] in ids(search(client, q=word, tech="golang")["results"])
+    
+    client.put(f"/api/projects/{created['id']}", headers=headers, json={"title": "Renamed"})
+    assert search(client, q=word)["total"] == 0
+    assert created["id"] in ids(search(client, q="renamed", limit=100)["results"])
+    
+    client.delete(f"/api/projects/{created['id']}", headers=headers)
+    assert created["id"] not in ids(search(client, q="renamed", limit=100)["results"])
+
+
+def test_bulk_writes_reach_the_index(client, register):
+    headers, _ = register()
+    word = f"zq{uuid.uuid4().hex[:10]}"
+    
+    response = client.post("/api/projects/bulk", headers=headers, json={"operations": [
+        {"op": "create", "data": {"title": f"{word} one", "description": "d"}},
+        {"op": "create", "data": {"title": f"{word} two", "description": "d"}},
+    ]})
+    assert response.status_code == 200
+    assert search(client, q=word)["total"] == 2
+
+
+@pytest.mark.parametrize("params, status", [({}, 400), ({"q": "  ", "tech": " , "}, 400), ({"q": "x", "limit": 0}, 422)])
+def test_search_rejects_empty_queries(client, params, status):
+    assert client.get("/api/search", params=params).status_code == status
@@ -0,0 +1,84 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+from ratelimit import RateLimit, RateLimiter
+from slugs import BloomFilter, SlugFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    slugs = [f"user-{i}" for i in range(1000)]
+    for slug in slugs:
+        bloom.add(slug)
+    assert all(slug in bloom for slug in slugs)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_slug_filter_lets_everything_through_until_rebuilt():
+    async def users():
+        yield {"unique_slug": "ann", "created_at": "2024-01-01T00:00:00+00:00"}
+    
+    slugs = SlugFilter(capacity=100)
+    assert slugs.might_exist("anything")
+    asyncio.run(slugs.rebuild(users()))
+    assert slugs.might_exist("ann")
+    assert not slugs.might_exist("bob")
+    slugs.recover("bob")
+    assert slugs.might_exist("bob")
+    assert (slugs.passed, slugs.rejected, slugs.recovered) == (2, 0, 1)
+
+
+def insert_user_elsewhere(server) -> str:
+    """Create a user the way another worker would: in storage, but not in this worker's filter."""
+    slug = f"elsewhere-{uuid.uuid4().hex[:8]}"
+    asyncio.run(server.storage.users.insert({
+        "id": str(uuid.uuid4()),
+        "email": f"{slug}@example.com",
+        "name": "Elsewhere",
+        "password_hash": "",
+        "unique_slug": slug,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }))
+    return slug
+
+
+def test_unknown_slug_is_404(client):
+    import server
+    
+    assert server.slug_filter.ready
+    for url in ("/api/profile/no-such-user", "/api/export/no-such-user", "/api/export/no-such-user/changes"):
+        assert client.get(url).status_code == 404
+
+
+def test_newly_registered_slug_is_accepted(client, register):
+    _, user = register("Fresh User")
+    assert client.get(f"/api/profile/{user['unique_slug']}").status_code == 200
+
+
+def test_slug_registered_on_another_worker_is_accepted_before_the_next_sync(client):
+    import server
+    
+    slug = insert_user_elsewhere(server)
+    assert not server.slug_filter.might_exist(slug)
+    recovered = server.slug_filter.recovered
+    
+    assert client.get(f"/api/profile/{slug}").status_code == 200
+    assert server.slug_filter.recovered == recovered + 1
+    # Recovered slugs go into the filter, so later requests skip the lookup
+    assert server.slug_filter.might_exist(slug)
+    
+    other = insert_user_elsewhere(server)
+    response = client.post("/api/export/batch", json={"slugs": [other, "no-such-user"]})
+    assert response.headers["X-Export-Missing"] == "1"
+    assert server.slug_filter.might_exist(other)
+
+
+def test_rejected_slugs_404_without_lookup_once_the_budget_is_spent(client, monkeypatch):
+    import server
+    
+    monkeypatch.setattr(server, "slug_miss_lookups", RateLimiter({"slug_miss": RateLimit(0.001, 1.0)}))
+    assert client.get("/api/profile/no-such-user").status_code == 404
+    slug = insert_user_elsewhere(server)
+    assert client.get(f"/api/profile/{slug}").status_code == 404
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import server
+from startup import Warmup
+
+
+def test_warmup_runs_steps_in_order_and_retries_failures():
+    warmup = Warmup(retry_initial_seconds=0.001, retry_max_seconds=0.002)
+    calls = []
+    
+    async def database():
+        calls.append("database")
+        if calls.count("database") < 3:
+            raise ConnectionError("not up yet")
+    
+    async def indexes():
+        calls.append("indexes")
+    
+    warmup.add("database", database)
+    warmup.add("indexes", indexes)
+    assert warmup.status()["phase"] == "pending" and not warmup.ready
+    
+    asyncio.run(warmup.run())
+    
+    assert calls == ["database", "database", "database", "indexes"]
+    status = warmup.status()
+    assert status["ready"] and status["phase"] == "ready"
+    assert status["retries"] == 2
+    assert status["last_error"] == "database: ConnectionError: not up yet"
+    assert set(status["steps"]) == {"database", "indexes"}
+
+
+def test_readiness_is_503_until_warmup_completes(client, monkeypatch):
+    pending = Warmup()
+    
+    async def step():
+        pass
+    
+    pending.add("search_index", step)
+    monkeypatch.setattr(server, "warmup", pending)
+    
+    ready = client.get("/api/health/ready")
+    assert ready.status_code == 503
+    assert ready.headers["retry-after"] == "1"
+    assert ready.json()["status"] == "warming" and ready.json()["phase"] == "pending"
+    assert client.get("/api/health/live").status_code == 200
+    assert client.get("/api/health").json()["ready"] is False
+    
+    asyncio.run(pending.run())
+    ready = client.get("/api/health/ready")
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready" and ready.json()["steps"].keys() == {"search_index"}
+    assert client.get("/api/health").json()["ready"] is True
+
+
+def test_importing_the_app_does_no_io():
+    script = (
+        "import json, server\n"
+        "print(json.dumps([server.client is None, server.db is None, server.storage is None, server.warmup.ready]))"
+    )
+    env = {**os.environ, "STORAGE_BACKEND": "mongo", "MONGO_URL": "mongodb://unreachable.invalid:1"}
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(server.__file__)),
+        env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == [True, True, True, False]
@@ -0,0 +1,40 @@
+"""
+Operational stats endpoints: open out of the box, behind METRICS_TOKEN once it is set.
+"""
+import pytest
+
+import server
+
+OPERATIONAL_STATS = [
+    "/api/cache/stats",
+    "/api/stats/password-hashing",
+    "/api/stats/search",
+    "/api/stats/slug-filter",
+    "/api/stats/rate-limits",
+    "/api/stats/compression",
+    "/api/stats/profile-queries",
+]
+
+
+@pytest.mark.parametrize("path", OPERATIONAL_STATS)
+def test_stats_open_without_a_token(client, monkeypatch, path):
+    monkeypatch.setattr(server, "METRICS_TOKEN", "")
+    
+    response = client.get(path)
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
+
+
+@pytest.mark.parametrize("path", OPERATIONAL_STATS)
+def test_stats_need_the_bearer_once_a_token_is_set(client, monkeypatch, path):
+    monkeypatch.setattr(server, "METRICS_TOKEN", "scrape-token")
+    
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get(path, headers={"Authorization": "Bearer scrape-token"}).status_code == 200
+
+
+def test_tech_stats_stay_public(client, monkeypatch):
+    monkeypatch.setattr(server, "METRICS_TOKEN", "scrape-token")
+    
+    assert client.get("/api/stats/tech").status_code == 200
@@ -0,0 +1,228 @@
+"""
+The same storage behaviour on both engines: MemoryStorage, and MotorStorage against
+mongomock-motor (skipped when it is not installed).
+"""
+import asyncio
+import uuid
+
+import pytest
+
+from indexes import ensure_indexes
+from repositories import BulkDelete, BulkInsert, BulkUpdate, ItemQuery, MemoryStorage, MotorStorage
+
+
+def item_fields() -> dict:
+    # A fresh dict per call: mongomock rewrites the projections it is given
+    return {"_id": 0, "id": 1, "title": 1, "version": 1}
+
+
+def motor_storage():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient()[f"test_{uuid.uuid4().hex}"]
+    run(ensure_indexes(db))
+    return MotorStorage(db)
+
+
+ENGINES = {"memory": MemoryStorage, "motor": motor_storage}
+
+
+@pytest.fixture(params=sorted(ENGINES))
+def storage(request):
+    return ENGINES[request.param]()
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def collect(cursor) -> list:
+    return [doc async for doc in cursor]
+
+
+def make_user(storage, slug: str = "ann") -> str:
+    user_id = str(uuid.uuid4())
+    run(storage.users.insert({
+        "id": user_id,
+        "email": f"{slug}@example.com",
+        "name": slug.title(),
+        "password_hash": "",
+        "unique_slug": slug,
+        "created_at": "2024-01-01T00:00:00+00:00",
+    }))
+    return user_id
+
+
+def make_item(user_id: str, n: int, **fields) -> dict:
+    timestamp = f"2024-01-{n + 1:02d}T00:00:00+00:00"
+    return {
+        "id": f"item-{n:02d}",
+        "user_id": user_id,
+        "title": f"Item {n}",
+        "created_at": timestamp,
+        "updated_at": timestamp,
+        "version": 1,
+        **fields,
+    }
+
+
+def test_item_crud(storage):
+    user_id = make_user(storage)
+    items = storage.projects
+    run(items.insert(make_item(user_id, 1)))
+    
+    assert run(items.get("item-01", user_id, item_fields())) == {"id": "item-01", "title": "Item 1", "version": 1}
+    assert run(items.get("item-01", "someone-else", item_fields())) is None
+    assert run(items.exists("item-01", user_id))
+    
+    updated = run(items.update("item-01", user_id, {"title": "Renamed"}, None, item_fields()))
+    assert updated == {"id": "item-01", "title": "Renamed", "version": 2}
+    # (mongomock re-applies the version filter to fetch the post-image, so read it back instead)
+    run(items.update("item-01", user_id, {"title": "Checked"}, [2], item_fields()))
+    assert run(items.get("item-01", user_id, item_fields())) == {"id": "item-01", "title": "Checked", "version": 3}
+    # A stale expected version matches nothing and changes nothing
+    assert run(items.update("item-01", user_id, {"title": "Lost"}, [2], item_fields())) is None
+    assert run(items.get("item-01", user_id, item_fields()))["title"] == "Checked"
+    assert run(items.versions(user_id, ["item-01", "missing"])) == {"item-01": 3}
+    
+    assert run(items.delete("item-01", user_id))
+    assert not run(items.delete("item-01", user_id))
+    assert not run(items.exists("item-01", user_id))
+
+
+def test_users_lookups_and_unique_slugs(storage):
+    user_id = make_user(storage, "ann")
+    fields = {"_id": 0, "id": 1, "unique_slug": 1}
+    assert run(storage.users.get_by_slug("ann", fields)) == {"id": user_id, "unique_slug": "ann"}
+    assert run(storage.users.get_by_email("ann@example.com", fields))["id"] == user_id
+    assert run(storage.users.get_by_slug("bob", fields)) is None
+    assert [u["id"] for u in run(storage.users.find_by_slugs(["ann", "bob"], fields))] == [user_id]
+
+
+def test_keyset_pagination_newest_first(storage):
+    user_id = make_user(storage)
+    for n in range(5):
+        run(storage.projects.insert(make_item(user_id, n)))
+    run(storage.projects.insert(make_item("someone-else", 9)))
+    
+    pages, after = [], None
+    while True:
+        page = run(storage.projects.list_for_user(
+            user_id, ItemQuery({"_id": 0, "id": 1, "created_at": 1}, 2, newest_first=True, after=after)
+        ))
+        if not page:
+            break
+        pages.append([item["id"] for item in page])
+        after = [page[-1]["created_at"], page[-1]["id"]]
+    
+    assert pages == [["item-04", "item-03"], ["item-02", "item-01"], ["item-00"]]
+
+
+def test_bulk_write_reports_unmatched_operations(storage):
+    user_id = make_user(storage)
+    items = storage.projects
+    for n in range(3):
+        run(items.insert(make_item(user_id, n)))
+    
+    outcome = run(items.bulk_write([
+        BulkInsert(make_item(user_id, 5)),
+        BulkUpdate("item-00", user_id, [1], {"title": "Updated", "change_seq": 1}),
+        BulkUpdate("item-01", user_id, [7], {"title": "Stale", "change_seq": 2}),
+        BulkUpdate("missing", user_id, None, {"title": "Nobody", "change_seq": 3}),
+        BulkDelete("item-02", user_id, None),
+        BulkDelete("item-01", user_id, [7]),
+    ], ordered=False))
+    
+    assert outcome.errors == []
+    assert outcome.unmatched == {2: "version conflict", 3: "not found", 5: "version conflict"}
+    assert run(items.versions(user_id, ["item-00", "item-01", "item-02", "item-05"])) == {
+        "item-00": 2, "item-01": 1, "item-05": 1
+    }
+    assert run(items.get("item-01", user_id, item_fields()))["title"] == "Item 1"
+
+
+def test_ordered_bulk_write_stops_at_a_write_error(storage):
+    user_id = make_user(storage)
+    run(storage.projects.insert(make_item(user_id, 0)))
+    
+    outcome = run(storage.projects.bulk_write([
+        BulkInsert(make_item(user_id, 1)),
+        BulkInsert(make_item(user_id, 0)),
+        BulkInsert(make_item(user_id, 2)),
+    ], ordered=True))
+    
+    assert [index for index, _ in outcome.errors] == [1]
+    assert set(run(storage.projects.versions(user_id, ["item-00", "item-01", "item-02"]))) == {"item-00", "item-01"}
+
+
+def test_change_feed_reservations_and_cursors(storage):
+    user_id = make_user(storage)
+    users, items = storage.users, storage.projects
+    
+    first = run(users.reserve_change_seqs(user_id, 3, "2024-02-01T00:00:00+00:00"))
+    assert first == 1
+    assert run(users.reserve_change_seqs(user_id, 1, "2024-02-01T00:00:00+00:00")) == 4
+    assert run(users.reserve_change_seqs("missing", 1, "2024-02-01T00:00:00+00:00")) is None
+    user = run(users.get(user_id, {"_id": 0, "change_seq": 1, "changes_pending": 1}))
+    assert user["change_seq"] == 4
+    assert sorted(p["seq"] for p in user["changes_pending"]) == [1, 4]
+    
+    for n, seq in ((0, 1), (1, 2), (2, 3)):
+        run(items.insert(make_item(user_id, n, change_seq=seq)))
+    run(users.release_change_seq(user_id, 1))
+    run(storage.tombstones.insert_many([{
+        "user_id": user_id, "type": "project", "item_id": "gone",
+        "deleted_at": "2024-02-01T00:00:00+00:00", "change_seq": 4
+    }]))
+    run(users.bump_content_version(user_id, "2024-02-01T00:00:00+00:00", release_seq=4))
+    user = run(users.get(user_id, {"_id": 0, "content_version": 1, "changes_pending": 1}))
+    assert user == {"content_version": 1, "changes_pending": []}
+    
+    fields = {"_id": 0, "id": 1, "change_seq": 1}
+    assert [d["id"] for d in run(collect(items.changes_after(user_id, 0, 4, 2, fields)))] == ["item-00", "item-01"]
+    assert [d["id"] for d in run(collect(items.changes_after(user_id, 1, 2, 10, fields)))] == ["item-01"]
+    assert sorted(d["id"] for d in run(collect(items.snapshot(user_id, 2, fields)))) == ["item-00", "item-01"]
+    assert [t["item_id"] for t in run(collect(storage.tombstones.changes_after(user_id, 3, 4, 10)))] == ["gone"]
+    assert run(collect(storage.tombstones.changes_after(user_id, 4, 4, 10))) == []
+
+
+def test_reservation_reclaims_stale_entries(storage):
+    user_id = make_user(storage)
+    users = storage.users
+    
+    # A writer that reserved and died never releases its number
+    assert run(users.reserve_change_seqs(user_id, 1, "2024-02-01T00:00:00+00:00")) == 1
+    assert run(users.reserve_change_seqs(user_id, 2, "2024-02-01T00:05:00+00:00")) == 2
+    assert run(users.reserve_change_seqs(user_id, 1, "2024-02-01T00:10:00+00:00",
+                                         stale_before="2024-02-01T00:04:00+00:00")) == 4
+    
+    user = run(users.get(user_id, {"_id": 0, "change_seq": 1, "changes_pending": 1}))
+    assert user["change_seq"] == 4
+    assert [p["seq"] for p in user["changes_pending"]] == [2, 4]
+
+
+@pytest.mark.parametrize("newest_first, after", [(False, None), (True, None), (True, ["2024-01-03T00:00:00+00:00", "item-02"])])
+def test_joined_read_matches_separate_reads(storage, newest_first, after):
+    if isinstance(storage, MotorStorage):
+        pytest.skip("mongomock does not implement $lookup with let/pipeline")
+    user_id = make_user(storage, "ann")
+    other_id = make_user(storage, "bob")
+    for n in range(4):
+        run(storage.projects.insert(make_item(user_id, n)))
+        run(storage.achievements.insert(make_item(user_id, n)))
+    run(storage.projects.insert(make_item(other_id, 7)))
+    user_fields = {"_id": 0, "id": 1, "name": 1, "unique_slug": 1}
+    
+    def queries():
+        return {
+            collection: ItemQuery({"_id": 0, "id": 1, "title": 1, "created_at": 1}, 3, newest_first=newest_first, after=after)
+            for collection in ("projects", "achievements")
+        }
+    
+    joined = run(storage.load_user_with_items("ann", user_fields, queries()))
+    separate = run(storage.users.get_by_slug("ann", {**user_fields}))
+    for collection, query in queries().items():
+        separate[collection] = run(storage[collection].list_for_user(user_id, query))
+    
+    assert joined == separate
+    assert len(joined["projects"]) == (2 if after else 3)
+    assert run(storage.load_user_with_items("nobody", user_fields, queries())) is None
@@ -0,0 +1,103 @@
+import pytest
+
+from textexport import chunk_blocks, estimate_tokens, render_document, summarize_readme
+
+README = "\n\n".join(
+    [f"Paragraph {n}: " + "a sentence about the project and how it was built. " * 6 for n in range(8)]
+    + ["```python\nprint('code is dropped from excerpts')\n```"]
+)
+
+
+def portfolio(projects: int = 6, achievements: int = 4) -> dict:
+    return {
+        "projects": [
+            {
+                "title": f"Project {n}",
+                "description": f"What project {n} does, in a sentence or two.",
+                "readme_content": README,
+                "tech_stack": ["Python", "FastAPI"],
+                "github_link": f"https://github.com/example/project-{n}",
+                "live_demo_link": "",
+                "created_at": f"2024-01-{n + 1:02d}T00:00:00+00:00",
+            }
+            for n in range(projects)
+        ],
+        "achievements": [
+            {"title": f"Award {n}", "description": "Recognised for something.", "date": "2024-02-01", "certificate_link": ""}
+            for n in range(achievements)
+        ],
+    }
+
+
+def render(style: str = "markdown", max_tokens=None, content=None) -> list:
+    return list(render_document("Ann Dev", "/profile/ann", "all", content or portfolio(), style, max_tokens))
+
+
+@pytest.mark.parametrize("style", ["markdown", "text"])
+@pytest.mark.parametrize("max_tokens", [50, 60, 100, 150, 250, 400, 800, 1500, 3000])
+def test_document_fits_the_budget(style, max_tokens):
+    blocks = render(style, max_tokens)
+    assert estimate_tokens("".join(blocks)) <= max_tokens
+    assert blocks[0].startswith("# Ann Dev" if style == "markdown" else "Ann Dev")
+
+
+def test_omitted_items_are_noted_within_the_budget():
+    blocks = render(max_tokens=100)
+    assert blocks[-1].startswith("[") and "omitted to fit max_tokens=100" in blocks[-1]
+    omitted = int(blocks[-1][1:].split()[0])
+    kept = sum(block.startswith("### ") for block in blocks)
+    assert kept + omitted == 10
+    assert estimate_tokens("".join(blocks)) <= 100
+
+
+def test_no_note_when_everything_fits():
+    full = render()
+    assert render(max_tokens=estimate_tokens("".join(full)) + 200) == full
+    assert not any("omitted" in block for block in full)
+
+
+def test_summaries_come_before_readmes():
+    content = portfolio()
+    bare = {**content, "projects": [{**p, "readme_content": ""} for p in content["projects"]]}
+    summaries = estimate_tokens("".join(render(content=bare)))
+    blocks = render(max_tokens=summaries + 150, content=content)
+    # Every item is listed, and only the newest project's readme got an excerpt
+    assert not any("omitted" in block for block in blocks)
+    readmes = [block for block in blocks if "#### README" in block]
+    assert len(readmes) == 1 and readmes[0].startswith("### Project 0")
+
+
+def test_readme_excerpt_drops_code_and_keeps_whole_paragraphs():
+    excerpt = summarize_readme(README, 120)
+    assert "print(" not in excerpt
+    assert excerpt.startswith("Paragraph 0:")
+    assert excerpt.endswith("…")
+    assert estimate_tokens(excerpt) <= 120
+    assert summarize_readme(README, 10) == ""
+    assert summarize_readme("Short readme.", 10) == "Short readme."
+
+
+@pytest.mark.parametrize("chunk_tokens", [100, 250, 1000])
+def test_chunks_are_deterministic_and_lossless(chunk_tokens):
+    document = render()
+    chunks = chunk_blocks(render(), chunk_tokens)
+    assert chunks == chunk_blocks(iter(render()), chunk_tokens)
+    assert "".join(chunks) == "".join(document)
+    assert all(len(chunk) <= chunk_tokens * 4 for chunk in chunks)
+
+
+def test_chunks_split_between_blocks_when_they_can():
+    blocks = render("text")
+    chunks = chunk_blocks(blocks, 250)
+    boundaries, position = set(), 0
+    for block in blocks:
+        position += len(block)
+        boundaries.add(position)
+    position = 0
+    for chunk in chunks[:-1]:
+        position += len(chunk)
+        assert position in boundaries or max(map(len, blocks)) > 250 * 4
+
+
+def test_empty_document_is_one_chunk():
+    assert chunk_blocks([], 100) == [""]
@@ -0,0 +1,44 @@
+"""
+TRUSTED_OUTPUT skips response_model validation on the authenticated list routes; what it sends
+must be exactly what the validated path sends.
+"""
+import pytest
+
+import server
+
+LIST_ROUTES = {
+    "projects": (server.ProjectResponse, server.ProjectPage),
+    "achievements": (server.AchievementResponse, server.AchievementPage),
+}
+
+
+def validated(model, body):
+    return model.model_validate(body).model_dump(mode="json")
+
+
+@pytest.mark.parametrize("collection", sorted(LIST_ROUTES))
+@pytest.mark.parametrize("params", [{}, {"limit": 2}])
+def test_trusted_lists_match_the_validated_models(client, portfolio, monkeypatch, collection, params):
+    headers, _ = portfolio(projects=3, achievements=3)
+    item_model, page_model = LIST_ROUTES[collection]
+    
+    monkeypatch.setattr(server, "TRUSTED_OUTPUT", False)
+    checked = client.get(f"/api/{collection}", headers=headers, params=params)
+    monkeypatch.setattr(server, "TRUSTED_OUTPUT", True)
+    fast = client.get(f"/api/{collection}", headers=headers, params=params)
+    
+    assert fast.status_code == checked.status_code == 200
+    assert fast.headers["content-type"] == checked.headers["content-type"] == "application/json"
+    assert fast.json() == checked.json()
+    if params:
+        assert fast.json() == validated(page_model, fast.json())
+        assert fast.json()["next_cursor"]
+    else:
+        assert fast.json() == [validated(item_model, item) for item in fast.json()]
+    assert not {"_id", "change_seq", "created_seq"} & set((fast.json()["items"] if params else fast.json())[0])
+
+
+def test_trusted_output_still_requires_auth(client, monkeypatch):
+    monkeypatch.setattr(server, "TRUSTED_OUTPUT", True)
+    
+    assert client.get("/api/projects").status_code in (401, 403)